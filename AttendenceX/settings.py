@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,11 +42,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'home.middleware.PerformanceMiddleware',
+    'home.routers.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'home.roles.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -54,7 +58,7 @@ ROOT_URLCONF = 'AttendenceX.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'home.templating.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -73,10 +77,51 @@ WSGI_APPLICATION = 'AttendenceX.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# WAL lets readers keep going while attendance is being written, and
+# persistent connections avoid reopening the file on every request.
+SQLITE_OPTIONS = {
+    'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+    'transaction_mode': 'IMMEDIATE',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': SQLITE_OPTIONS,
+    }
+}
+
+# Set ATTENDENCEX_DB_PROFILE=replica to send reporting reads to a copy of
+# the database, refreshed with `python manage.py sync_replica`. Writes stay
+# on default; see home/routers.py.
+DB_PROFILE = os.environ.get('ATTENDENCEX_DB_PROFILE', 'single')
+
+if DB_PROFILE == 'replica':
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': Path(os.environ.get('ATTENDENCEX_REPLICA_PATH', BASE_DIR / 'db.replica.sqlite3')),
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'init_command': 'PRAGMA journal_mode=WAL; PRAGMA query_only=1;'},
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['home.routers.PrimaryReplicaRouter']
+
+# How long a user's reads stay on default after they write
+REPLICA_STICKY_SECONDS = 30
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'attendencex',
     }
 }
 
@@ -117,7 +162,27 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# `collectstatic` then `compress_static` fill this for production serving
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Content-hashed file names outside development, so assets can be cached forever
+if not DEBUG:
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+    }
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Low attendance alerts
+# See home/alerts.py and `python manage.py attendance_alerts`
+
+# Percentages below which an alert is raised, per student and subject
+ATTENDANCE_ALERT_THRESHOLDS = [75.0]
+
+# Classes a student must have before a low percentage counts
+ATTENDANCE_ALERT_MIN_CLASSES = 5
@@ -1,9 +1,17 @@
 from django.contrib import admin
-from .models import Teacher, Student, Subject, Attendance, AttendanceSummary
+from .models import Teacher, Student, Subject, Attendance, ArchivedAttendance, AttendanceLedger, AttendanceSummary, DailyRollup, Enrollment, LowAttendanceAlert, SyncReceipt, Term, Watermark
 
 # Register your models here.
 admin.site.register(Teacher)
 admin.site.register(Student)
 admin.site.register(Subject)
+admin.site.register(Term)
+admin.site.register(Enrollment)
 admin.site.register(Attendance)
-admin.site.register(AttendanceSummary)
\ No newline at end of file
+admin.site.register(ArchivedAttendance)
+admin.site.register(AttendanceSummary)
+admin.site.register(AttendanceLedger)
+admin.site.register(SyncReceipt)
+admin.site.register(DailyRollup)
+admin.site.register(Watermark)
+admin.site.register(LowAttendanceAlert)
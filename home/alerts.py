@@ -0,0 +1,88 @@
+from itertools import islice
+
+from django.conf import settings
+
+from .models import AttendanceSummary, LowAttendanceAlert
+from .stats import percentage
+from .watermarks import advance_watermark
+
+
+# ------------------------
+# LOW ATTENDANCE ALERTS
+# ------------------------
+# Every attendance write moves AttendanceSummary.updated_at, so the pairs
+# that changed since the last run come from one indexed range scan. The
+# counters on those summary rows are enough to re-evaluate each pair. A run
+# therefore costs in proportion to the changes since the previous run, not
+# to the size of the history.
+
+WATERMARK = 'alerts'
+
+BATCH_SIZE = 500
+
+
+def evaluate(rows, thresholds, min_classes, now):
+    """Open and resolve alerts for summary rows of
+    ``(student_id, subject_id, total_classes, present_count)``.
+
+    Returns ``(opened, resolved)``.
+    """
+    rows = list(rows)
+    open_alerts = {
+        (alert.student_id, alert.subject_id, alert.threshold): alert.pk
+        for alert in LowAttendanceAlert.objects.filter(
+            resolved_at__isnull=True,
+            student_id__in={row[0] for row in rows},
+            subject_id__in={row[1] for row in rows},
+        ).only('pk', 'student_id', 'subject_id', 'threshold')
+    }
+    new_alerts, recovered = [], []
+    for student_id, subject_id, total, present in rows:
+        current = percentage(present, total)
+        for threshold in thresholds:
+            key = (student_id, subject_id, threshold)
+            below = total >= min_classes and current < threshold
+            if below and key not in open_alerts:
+                new_alerts.append(LowAttendanceAlert(
+                    student_id=student_id,
+                    subject_id=subject_id,
+                    threshold=threshold,
+                    percentage=current,
+                    total_classes=total,
+                    present_count=present,
+                ))
+            elif not below and key in open_alerts:
+                recovered.append(open_alerts[key])
+    LowAttendanceAlert.objects.bulk_create(new_alerts)
+    LowAttendanceAlert.objects.filter(pk__in=recovered).update(resolved_at=now)
+    return len(new_alerts), len(recovered)
+
+
+def run_alerts(thresholds=None, min_classes=None):
+    """Re-evaluate the (student, subject) pairs changed since the last run.
+
+    The first run has no watermark and evaluates every pair once. Returns
+    ``(evaluated, opened, resolved)``.
+    """
+    thresholds = thresholds or settings.ATTENDANCE_ALERT_THRESHOLDS
+    if min_classes is None:
+        min_classes = settings.ATTENDANCE_ALERT_MIN_CLASSES
+    evaluated = opened = resolved = 0
+    with advance_watermark(WATERMARK) as (since, now):
+        changed = AttendanceSummary.objects.all()
+        if since is not None:
+            changed = changed.filter(updated_at__gt=since, updated_at__lte=now)
+        rows = (
+            changed.order_by()
+            .values_list('student_id', 'subject_id', 'total_classes', 'present_count')
+            .iterator(chunk_size=BATCH_SIZE)
+        )
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                break
+            batch_opened, batch_resolved = evaluate(batch, thresholds, min_classes, now)
+            evaluated += len(batch)
+            opened += batch_opened
+            resolved += batch_resolved
+    return evaluated, opened, resolved
@@ -0,0 +1,272 @@
+from collections import namedtuple
+from datetime import date
+from itertools import islice
+
+from .models import Attendance, Student, Subject
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only the risk analytics need it
+    np = None
+
+
+# ------------------------
+# VECTORIZED RISK ANALYTICS
+# ------------------------
+# Attendance for a scope is loaded once into parallel NumPy arrays with
+# students and subjects int-coded, dates as day ordinals and statuses as
+# small ints. Every statistic is then computed by sorting those arrays
+# (argsort) and reducing each group of equal keys with ufunc.reduceat,
+# with no per-student Python loop.
+
+STATUS_CODES = {'Present': 0, 'Absent': 1, 'Late': 2, 'Excused': 3}
+PRESENT, ABSENT, LATE, EXCUSED = range(4)
+
+LOAD_CHUNK_SIZE = 50000
+
+AttendanceArrays = namedtuple(
+    'AttendanceArrays', ['students', 'subjects', 'days', 'status', 'student_ids', 'subject_ids']
+)
+
+
+class AnalyticsUnavailable(RuntimeError):
+    pass
+
+
+def require_numpy():
+    if np is None:
+        raise AnalyticsUnavailable('Risk analytics need NumPy; install it with "pip install numpy"')
+
+
+def scope_queryset(department=None, teacher=None, subject=None, date_from=None, date_to=None):
+    """Attendance in the subjects of a department, a teacher or a single subject code."""
+    rows = Attendance.objects.all()
+    if department:
+        rows = rows.filter(subject_id__in=Subject.objects.filter(teachers__department=department))
+    if teacher:
+        rows = rows.filter(subject_id__in=teacher.subjects.all())
+    if subject:
+        rows = rows.filter(subject__code=subject)
+    if date_from:
+        rows = rows.filter(date__gte=date_from)
+    if date_to:
+        rows = rows.filter(date__lte=date_to)
+    return rows
+
+
+def load_arrays(attendance):
+    """Read an Attendance queryset into an AttendanceArrays of int-coded columns."""
+    require_numpy()
+    student_codes, subject_codes = {}, {}
+    columns = ([], [], [], [])
+    rows = attendance.order_by().values_list('student_id', 'subject_id', 'date', 'status').iterator(
+        chunk_size=LOAD_CHUNK_SIZE
+    )
+    while True:
+        chunk = list(islice(rows, LOAD_CHUNK_SIZE))
+        if not chunk:
+            break
+        students, subjects, dates, statuses = zip(*chunk)
+        n = len(chunk)
+        columns[0].append(np.fromiter(
+            (student_codes.setdefault(s, len(student_codes)) for s in students), dtype=np.int32, count=n
+        ))
+        columns[1].append(np.fromiter(
+            (subject_codes.setdefault(s, len(subject_codes)) for s in subjects), dtype=np.int32, count=n
+        ))
+        columns[2].append(np.fromiter((d.toordinal() for d in dates), dtype=np.int32, count=n))
+        columns[3].append(np.fromiter((STATUS_CODES[s] for s in statuses), dtype=np.int8, count=n))
+
+    students, subjects, days, status = (
+        np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        for parts, dtype in zip(columns, (np.int32, np.int32, np.int32, np.int8))
+    )
+    return AttendanceArrays(students, subjects, days, status, list(student_codes), list(subject_codes))
+
+
+def synthetic_arrays(rows, students=50000, subjects=2000, days=365, seed=42):
+    """Random attendance arrays of the given size, for benchmarking without a database."""
+    require_numpy()
+    rng = np.random.default_rng(seed)
+    return AttendanceArrays(
+        rng.integers(0, students, rows, dtype=np.int32),
+        rng.integers(0, subjects, rows, dtype=np.int32),
+        rng.integers(739000, 739000 + days, rows, dtype=np.int32),
+        rng.choice(4, rows, p=[0.8, 0.12, 0.06, 0.02]).astype(np.int8),
+        [f'R{n:06d}' for n in range(students)],
+        list(range(subjects)),
+    )
+
+
+def _group_starts(sorted_keys):
+    """Offsets where each run of equal values begins in a sorted array."""
+    if not len(sorted_keys):
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+
+
+def _sort_order(arrays, by_subject=False):
+    """Indices ordering sessions by (student, subject, day), or by
+    (student, day, subject) when ``by_subject`` is false.
+
+    The columns are packed into one int64 key so a single argsort replaces
+    a much slower multi-key lexsort.
+    """
+    if not len(arrays.days):
+        return np.empty(0, dtype=np.intp)
+    first_day = arrays.days.min()
+    span = int(arrays.days.max() - first_day) + 1
+    subjects = len(arrays.subject_ids) or 1
+    key = arrays.students.astype(np.int64)
+    if by_subject:
+        key = (key * subjects + arrays.subjects) * span + (arrays.days - first_day)
+    else:
+        key = (key * span + (arrays.days - first_day)) * subjects + arrays.subjects
+    return np.argsort(key)
+
+
+def student_percentages(arrays):
+    """Sessions, present count and attendance percentage per student code."""
+    order = np.argsort(arrays.students)
+    keys = arrays.students[order]
+    starts = _group_starts(keys)
+    if not len(starts):
+        return keys, keys, keys, np.empty(0)
+    totals = np.diff(np.r_[starts, len(keys)])
+    present = np.add.reduceat((arrays.status[order] == PRESENT).astype(np.int64), starts)
+    return keys[starts], totals, present, np.round(present * 100.0 / totals, 1)
+
+
+def absence_streaks(arrays):
+    """Longest and current run of consecutive absences per (student, subject).
+
+    Returns ``(students, subjects, longest, current)`` for every pair with at
+    least one absence; ``current`` is the run still open at the pair's most
+    recent session, or 0.
+    """
+    order = _sort_order(arrays, by_subject=True)
+    pair = arrays.students[order].astype(np.int64) * (len(arrays.subject_ids) or 1) + arrays.subjects[order]
+    absent = arrays.status[order] == ABSENT
+    new_pair = np.r_[True, pair[1:] != pair[:-1]]
+    last_in_pair = np.r_[new_pair[1:], True]
+
+    run_starts = np.flatnonzero(absent & (new_pair | ~np.r_[False, absent[:-1]]))
+    run_ends = np.flatnonzero(absent & (last_in_pair | ~np.r_[absent[1:], False]))
+    lengths = run_ends - run_starts + 1
+
+    run_pairs = pair[run_starts]
+    starts = _group_starts(run_pairs)
+    if not len(starts):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty
+    pairs = run_pairs[starts]
+    longest = np.maximum.reduceat(lengths, starts)
+
+    current = np.zeros(len(pairs), dtype=np.int64)
+    open_runs = last_in_pair[run_ends]
+    current[np.searchsorted(pairs, run_pairs[open_runs])] = lengths[open_runs]
+
+    width = len(arrays.subject_ids) or 1
+    return pairs // width, pairs % width, longest, current
+
+
+def late_trends(arrays, window=10):
+    """Late rate per student overall and over their last ``window`` sessions."""
+    order = _sort_order(arrays)
+    keys = arrays.students[order]
+    starts = _group_starts(keys)
+    if not len(starts):
+        empty = np.empty(0)
+        return keys, empty, empty
+    ends = np.r_[starts[1:], len(keys)]
+    late = np.r_[0, np.cumsum(arrays.status[order] == LATE)]
+    overall = (late[ends] - late[starts]) / (ends - starts)
+    window_starts = np.maximum(ends - window, starts)
+    recent = (late[ends] - late[window_starts]) / (ends - window_starts)
+    return keys[starts], overall, recent
+
+
+def weekly_rates(arrays, status=LATE):
+    """Share of sessions with ``status`` per Monday-aligned week across the scope."""
+    # Ordinal 1 (0001-01-01) is a Monday
+    weeks = (arrays.days.astype(np.int64) - 1) // 7
+    order = np.argsort(weeks)
+    keys = weeks[order]
+    starts = _group_starts(keys)
+    if not len(starts):
+        return keys, np.empty(0)
+    totals = np.diff(np.r_[starts, len(keys)])
+    hits = np.add.reduceat((arrays.status[order] == status).astype(np.int64), starts)
+    return keys[starts] * 7 + 1, hits / totals
+
+
+def risk_report(arrays, threshold=75.0, streak=3, window=10, limit=50):
+    """At-risk students, absence streaks and rising late arrivals for a scope.
+
+    Computation is vectorized; only the flagged rows (at most ``limit`` per
+    section) are turned into dicts, with student names fetched in one query.
+    """
+    require_numpy()
+    student_codes, totals, present, pct = student_percentages(arrays)
+    flagged = np.flatnonzero(pct < threshold)
+    flagged = flagged[np.argsort(pct[flagged], kind='stable')][:limit]
+
+    streak_students, streak_subjects, longest, current = absence_streaks(arrays)
+    long_runs = np.flatnonzero(longest >= streak)
+    long_runs = long_runs[np.lexsort((-current[long_runs], -longest[long_runs]))][:limit]
+
+    late_students, overall, recent = late_trends(arrays, window)
+    rising = np.flatnonzero(recent > overall)
+    rising = rising[np.argsort(overall[rising] - recent[rising], kind='stable')][:limit]
+
+    week_starts, late_rates = weekly_rates(arrays)
+
+    roll = arrays.student_ids
+    rolls = (
+        {roll[code] for code in student_codes[flagged]}
+        | {roll[code] for code in streak_students[long_runs]}
+        | {roll[code] for code in late_students[rising]}
+    )
+    names = dict(Student.objects.filter(pk__in=rolls).values_list('pk', 'name'))
+    subject_codes = dict(
+        Subject.objects.filter(pk__in=[arrays.subject_ids[code] for code in streak_subjects[long_runs]])
+        .values_list('pk', 'code')
+    )
+
+    return {
+        'sessions': int(len(arrays.status)),
+        'students': int(len(student_codes)),
+        'at_risk': [
+            {
+                'roll_number': roll[student_codes[i]],
+                'name': names.get(roll[student_codes[i]]),
+                'total_classes': int(totals[i]),
+                'present_count': int(present[i]),
+                'attendance_percentage': float(pct[i]),
+            }
+            for i in flagged
+        ],
+        'absence_streaks': [
+            {
+                'roll_number': roll[streak_students[i]],
+                'name': names.get(roll[streak_students[i]]),
+                'subject': subject_codes.get(arrays.subject_ids[streak_subjects[i]]),
+                'longest': int(longest[i]),
+                'current': int(current[i]),
+            }
+            for i in long_runs
+        ],
+        'rising_late': [
+            {
+                'roll_number': roll[late_students[i]],
+                'name': names.get(roll[late_students[i]]),
+                'overall_late_rate': round(float(overall[i]) * 100, 1),
+                'recent_late_rate': round(float(recent[i]) * 100, 1),
+            }
+            for i in rising
+        ],
+        'weekly_late_rate': [
+            {'week': date.fromordinal(int(start)), 'late_rate': round(float(rate) * 100, 1)}
+            for start, rate in zip(week_starts, late_rates)
+        ],
+    }
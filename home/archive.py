@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .marking import touch_subjects
+from .models import ArchivedAttendance, Attendance
+from .signals import summary_signals_suppressed
+from .terms import current_term
+
+
+# ------------------------
+# TERM ARCHIVAL
+# ------------------------
+# A closed term's attendance moves from Attendance to ArchivedAttendance in
+# batches, each one an INSERT and a DELETE in one transaction, so the hot
+# table, its indexes and its unique check only grow with the open terms.
+# The rows keep their counters: AttendanceSummary is left as it is and
+# daily rollups of archived dates are counted from both tables (see
+# home.records). The term is marked archived before the first batch, so
+# writes dated in it are refused from then on.
+
+# Rows moved per transaction; keeps the DELETE ... IN well under SQLite's
+# bound-parameter limit
+ARCHIVE_BATCH_SIZE = 500
+
+ARCHIVED_FIELDS = ('id', 'student_id', 'subject_id', 'type', 'date', 'status', 'marked_by_id', 'updated_at')
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def check_archivable(term):
+    """Only terms that ended before the current one started can be archived."""
+    if term.end_date is None:
+        raise ArchiveError(f'{term} has no end date')
+    current = current_term()
+    if current is not None and term.end_date >= current.start_date:
+        raise ArchiveError(f'{term} did not end before the current term ({current}) started')
+
+
+def term_attendance(term):
+    return Attendance.objects.filter(date__gte=term.start_date, date__lte=term.end_date)
+
+
+def archive_term(term, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move the attendance dated in ``term`` to ArchivedAttendance.
+
+    Safe to run again after an interruption; returns the number of rows moved.
+    """
+    check_archivable(term)
+    if term.archived_at is None:
+        term.archived_at = timezone.now()
+        term.save(update_fields=['archived_at', 'updated_at'])
+
+    rows = term_attendance(term).order_by('pk')
+    moved = 0
+    subject_ids = set()
+    while True:
+        with transaction.atomic():
+            batch = list(rows.values(*ARCHIVED_FIELDS)[:batch_size])
+            if not batch:
+                break
+            ArchivedAttendance.objects.bulk_create(
+                [ArchivedAttendance(term=term, **row) for row in batch],
+                batch_size=batch_size,
+            )
+            with summary_signals_suppressed():
+                Attendance.objects.filter(pk__in=[row['id'] for row in batch]).delete()
+        moved += len(batch)
+        subject_ids.update(row['subject_id'] for row in batch)
+    if subject_ids:
+        # Recent records on the teacher dashboards may have moved
+        touch_subjects(subject_ids)
+    return moved
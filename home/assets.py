@@ -0,0 +1,172 @@
+import gzip
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only gzip variants are built
+    brotli = None
+
+
+# ------------------------
+# PRECOMPRESSED STATIC ASSETS
+# ------------------------
+# `collectstatic` copies the page bundles into STATIC_ROOT under
+# content-hashed names, `compress_static` writes a .gz (and .br) file next
+# to each one, and serve() answers with the smallest variant the client
+# accepts. A hashed name changes whenever the file does, so those responses
+# can be cached by the browser for a year without revalidating.
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.html')
+
+# Best first; the suffix is appended to the file name
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# ManifestStaticFilesStorage inserts 12 hex digits of the file's MD5
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+
+HASHED_MAX_AGE = 365 * 24 * 60 * 60
+PLAIN_MAX_AGE = 5 * 60
+
+STATIC_TAG = re.compile(r"""\{%\s*static\s+['"]([^'"]+)['"]\s*%\}""")
+
+
+def available_encodings():
+    return [encoding for encoding, _ in ENCODINGS if encoding != 'br' or brotli is not None]
+
+
+def compress_bytes(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    # A fixed mtime keeps the output identical between builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_file(path, force=False):
+    """Write the compressed variants of ``path``; returns ``{encoding: size}``.
+
+    Variants no smaller than the original are removed rather than kept.
+    """
+    path = Path(path)
+    data = None
+    sizes = {}
+    for encoding, suffix in ENCODINGS:
+        target = path.with_name(path.name + suffix)
+        if encoding not in available_encodings():
+            continue
+        if not force and target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+            sizes[encoding] = target.stat().st_size
+            continue
+        if data is None:
+            data = path.read_bytes()
+        compressed = compress_bytes(data, encoding)
+        if len(compressed) >= len(data):
+            target.unlink(missing_ok=True)
+            continue
+        target.write_bytes(compressed)
+        sizes[encoding] = len(compressed)
+    return sizes
+
+
+def compressible_files(root, min_size=0):
+    for path in sorted(Path(root).rglob('*')):
+        if path.is_file() and path.suffix in COMPRESSIBLE_EXTENSIONS and path.stat().st_size >= min_size:
+            yield path
+
+
+def accepted_encodings(header):
+    """Encodings named in an Accept-Encoding header with a non-zero q-value."""
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            accepted.add(name.strip().lower())
+    if '*' in accepted:
+        accepted.update(encoding for encoding, _ in ENCODINGS)
+    return accepted
+
+
+def serve(request, path):
+    """Serve a file from STATIC_ROOT, precompressed when the client allows it."""
+    try:
+        fullpath = Path(safe_join(settings.STATIC_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404('Invalid static path')
+    if not fullpath.is_file():
+        raise Http404('Static file not found')
+
+    stat = fullpath.stat()
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    served, encoding = fullpath, None
+    compressible = fullpath.suffix in COMPRESSIBLE_EXTENSIONS
+    if compressible:
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        for name, suffix in ENCODINGS:
+            variant = fullpath.with_name(fullpath.name + suffix)
+            if name in accepted and variant.is_file():
+                served, encoding = variant, name
+                break
+
+    content_type, _ = mimetypes.guess_type(fullpath.name)
+    response = FileResponse(served.open('rb'), content_type=content_type or 'application/octet-stream')
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if compressible:
+        patch_vary_headers(response, ['Accept-Encoding'])
+    if HASHED_NAME.search(fullpath.name):
+        patch_cache_control(response, public=True, max_age=HASHED_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=PLAIN_MAX_AGE)
+    return response
+
+
+def collected_path(name):
+    """Where the collected (and, with the manifest storage, hashed) copy of ``name`` is."""
+    stored_name = getattr(staticfiles_storage, 'stored_name', None)
+    return Path(settings.STATIC_ROOT) / (stored_name(name) if stored_name else name)
+
+
+def page_report(template_dir):
+    """Bytes each page template costs with its assets inlined versus linked.
+
+    One row per template: the template's own size, the raw size of the
+    bundles it links and the size of each compressed variant of them.
+    """
+    rows = []
+    for template in sorted(Path(template_dir).glob('*.html')):
+        source = template.read_text()
+        row = {'page': template.name, 'html': len(source.encode()), 'assets': 0}
+        row.update((encoding, 0) for encoding in available_encodings())
+        for name in STATIC_TAG.findall(source):
+            path = collected_path(name)
+            if not path.is_file():
+                continue
+            size = path.stat().st_size
+            row['assets'] += size
+            for encoding, suffix in ENCODINGS:
+                if encoding in row:
+                    variant = path.with_name(path.name + suffix)
+                    row[encoding] += variant.stat().st_size if variant.is_file() else size
+        rows.append(row)
+    return rows
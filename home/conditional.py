@@ -0,0 +1,113 @@
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date, quote_etag
+
+from .models import Attendance
+from .routers import pin_to_primary
+from .terms import current_term
+
+
+# ------------------------
+# DASHBOARD VERSIONS
+# ------------------------
+# A dashboard's version comes from the same query that loads the teacher or
+# student profile: the latest change to the teacher's subjects (attendance
+# and enrollment writes move it), or to the student's summary rows and
+# attendance rows, so edits that leave the counters alone count too. The
+# current term and the teacher's or student's own profile fields are mixed
+# in too.
+# Unchanged dashboards answer 304, and the expensive template fragments
+# are cached under the version, so they are rebuilt only after a change.
+# Fragments are built from the primary: the version is read there, and a
+# lagging replica would cache stale data under it.
+
+# Bump when the dashboard templates change so browsers drop old copies
+TEMPLATE_VERSION = 1
+
+FRAGMENT_TIMEOUT = 60 * 60
+
+
+class DashboardVersion:
+    def __init__(self, role, pk, changed_at, *parts):
+        self.changed_at = changed_at
+        raw = '|'.join(str(part) for part in (TEMPLATE_VERSION, role, pk, changed_at, *parts))
+        self.key = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+    @property
+    def etag(self):
+        return quote_etag(self.key)
+
+    @property
+    def last_modified(self):
+        if self.changed_at is None:
+            return None
+        return timegm(self.changed_at.utctimetuple())
+
+
+def teacher_with_version(teachers):
+    """Annotate a Teacher queryset with what its dashboard version is built from."""
+    return teachers.select_related('user').annotate(
+        subjects_changed_at=Max('subjects__updated_at'),
+        subject_count=Count('subjects'),
+    )
+
+
+def teacher_version(teacher):
+    term = current_term()
+    user = teacher.user
+    # The profile is shown outside the cached fragments, so editing it changes the version
+    return DashboardVersion(
+        'teacher', teacher.pk, teacher.subjects_changed_at, teacher.subject_count, term and term.pk,
+        teacher.updated_at, teacher.name, teacher.department, user.username, user.first_name, user.last_name,
+    )
+
+
+def student_with_version(students):
+    """Annotate a Student queryset with what its dashboard version is built from."""
+    # A subquery, so the summary rows are not joined against every attendance row
+    latest_record = Attendance.objects.filter(student=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]
+    return students.select_related('user').annotate(
+        summary_changed_at=Max('attendancesummary__updated_at'),
+        records_changed_at=Subquery(latest_record),
+    )
+
+
+def student_version(student):
+    changed_at = max(filter(None, (student.summary_changed_at, student.records_changed_at)), default=None)
+    # The profile fields are shown on the page, so editing them changes the version
+    return DashboardVersion(
+        'student', student.pk, changed_at, student.records_changed_at,
+        student.name, student.course, student.year, student.branch,
+    )
+
+
+def not_modified(request, version):
+    """A 304 response when the client already has this version, else None."""
+    return get_conditional_response(request, etag=version.etag, last_modified=version.last_modified)
+
+
+def add_validators(response, version):
+    response['ETag'] = version.etag
+    if version.last_modified is not None:
+        response['Last-Modified'] = http_date(version.last_modified)
+    # Let browsers keep a copy but revalidate it on every view
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def lazy_context(build, keys):
+    """Context entries computed on first use, all from a single ``build()`` call.
+
+    Fragments served from the cache never read them, so a cached dashboard
+    runs none of the queries behind them.
+    """
+    def build_on_primary():
+        with pin_to_primary():
+            return build()
+
+    data = SimpleLazyObject(build_on_primary)
+    return {key: SimpleLazyObject(lambda key=key: data[key]) for key in keys}
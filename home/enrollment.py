@@ -0,0 +1,59 @@
+from django.utils import timezone
+
+from .models import Enrollment, Student, Subject, Teacher
+from .terms import current_term
+
+
+# ------------------------
+# ENROLLMENT
+# ------------------------
+# A subject's roster is the students enrolled in it for the current term
+# (see home.roster). Bulk enrollment skips model signals, so it invalidates
+# the affected rosters and dashboard versions itself.
+
+ENROLL_BATCH_SIZE = 5000
+
+
+def enrollment_changed(subject_ids):
+    """Invalidate the rosters and dashboard versions of the given subjects."""
+    subject_ids = set(subject_ids)
+    if not subject_ids:
+        return
+    now = timezone.now()
+    Subject.objects.filter(pk__in=subject_ids).update(updated_at=now, roster_changed_at=now)
+
+
+def enroll(pairs, term=None):
+    """Enroll ``(roll_number, subject_id)`` pairs in ``term``, the current one by default.
+
+    Existing enrollments are left alone. Returns the number of pairs given.
+    """
+    term = term or current_term()
+    pairs = list(pairs)
+    Enrollment.objects.bulk_create(
+        [Enrollment(student_id=roll_number, subject_id=subject_id, term=term) for roll_number, subject_id in pairs],
+        ignore_conflicts=True,
+        batch_size=ENROLL_BATCH_SIZE,
+    )
+    # bulk_create skips the Enrollment signals
+    enrollment_changed(subject_id for _, subject_id in pairs)
+    return len(pairs)
+
+
+def teacher_subject_pairs(roll_numbers):
+    """``(roll_number, subject_id)`` for every subject taught by each student's teacher.
+
+    This is how rosters were implied before enrollments existed; imports of
+    students without explicit subjects still enroll them this way.
+    """
+    teachers = dict(Student.objects.filter(pk__in=roll_numbers).values_list('pk', 'teacher_id'))
+    subjects = {}
+    for teacher_id, subject_id in Teacher.subjects.through.objects.filter(
+        teacher_id__in=set(teachers.values())
+    ).values_list('teacher_id', 'subject_id'):
+        subjects.setdefault(teacher_id, []).append(subject_id)
+    return [
+        (roll_number, subject_id)
+        for roll_number, teacher_id in teachers.items()
+        for subject_id in subjects.get(teacher_id, ())
+    ]
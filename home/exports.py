@@ -0,0 +1,115 @@
+import csv
+import json
+from itertools import islice
+from operator import itemgetter
+
+from django.utils.dateparse import parse_date
+
+from .records import merge_sorted, sources
+
+
+# ------------------------
+# STREAMING ATTENDANCE EXPORT
+# ------------------------
+# Rows are read with values_list(...).iterator() so joins are resolved in
+# SQL and only one chunk is held in memory, whatever the size of the export.
+# Archived terms are read from ArchivedAttendance and merged in on the id.
+
+EXPORT_FIELDS = (
+    ('date', 'date'),
+    ('roll_number', 'student_id'),
+    ('student_name', 'student__name'),
+    ('subject_code', 'subject__code'),
+    ('subject_name', 'subject__name'),
+    ('status', 'status'),
+    ('session_type', 'type'),
+    ('marked_by', 'marked_by_id'),
+)
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+CHUNK_SIZE = 2000
+
+
+class ExportError(ValueError):
+    pass
+
+
+def export_rows(subject=None, teacher=None, student=None, date_from=None, date_to=None):
+    """Filtered attendance rows as tuples in EXPORT_FIELDS order.
+
+    ``subject`` is a subject code, ``teacher`` the employee_id of the teacher
+    who marked the record and ``student`` a roll number. Dates may be ISO
+    strings or date objects.
+    """
+    filters = {}
+    if subject:
+        filters['subject__code'] = subject
+    if teacher:
+        try:
+            filters['marked_by_id'] = int(teacher)
+        except ValueError:
+            raise ExportError(f'Invalid teacher: {teacher}')
+    if student:
+        filters['student_id'] = student
+    if date_from:
+        date_from = filters['date__gte'] = _as_date(date_from, 'date_from')
+    if date_to:
+        filters['date__lte'] = _as_date(date_to, 'date_to')
+    lookups = ('pk',) + tuple(lookup for _, lookup in EXPORT_FIELDS)
+    streams = [
+        model.objects.filter(**filters).order_by('pk').values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+        for model in sources(date_from or None)
+    ]
+    return (row[1:] for row in merge_sorted(streams, key=itemgetter(0)))
+
+
+def _as_date(value, name):
+    if isinstance(value, str):
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ExportError(f'Invalid {name}: {value}')
+        return parsed
+    return value
+
+
+def _chunks(rows):
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _Echo:
+    """File-like object whose write() hands back the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_FIELDS])
+    for chunk in _chunks(rows):
+        yield ''.join(writer.writerow(row) for row in chunk)
+
+
+def jsonl_stream(rows):
+    names = [name for name, _ in EXPORT_FIELDS]
+    for chunk in _chunks(rows):
+        yield ''.join(json.dumps(dict(zip(names, row)), default=str) + '\n' for row in chunk)
+
+
+def export_stream(export_format, rows):
+    """Encoded chunks of the export in ``export_format`` (csv or jsonl)."""
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f'Unsupported format: {export_format}')
+    stream = csv_stream(rows) if export_format == 'csv' else jsonl_stream(rows)
+    return (chunk.encode('utf-8') for chunk in stream)
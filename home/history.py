@@ -0,0 +1,121 @@
+from datetime import date
+from operator import itemgetter
+
+from asgiref.sync import sync_to_async
+
+from .models import ArchivedAttendance, Attendance
+from .records import merge_sorted, reaches_archive
+
+
+# ------------------------
+# KEYSET-PAGINATED HISTORY
+# ------------------------
+# Pages are ordered on (date, id) descending and continue from a cursor
+# naming the last row seen, so every page is an index seek on
+# (student, date, id) no matter how deep it is. There is no OFFSET.
+# Archived rows keep their ids, so a page that reaches back into an
+# archived term merges a second, identical seek on ArchivedAttendance.
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class HistoryError(ValueError):
+    pass
+
+
+def encode_cursor(on_date, pk):
+    return f'{on_date.isoformat()}.{pk}'
+
+
+def decode_cursor(cursor):
+    try:
+        on_date, pk = cursor.split('.')
+        return date.fromisoformat(on_date), int(pk)
+    except ValueError:
+        raise HistoryError(f'Invalid cursor: {cursor}')
+
+
+def _parse_date(value, name):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HistoryError(f'Invalid {name}: {value}')
+
+
+def history_queryset(student, cursor=None, subject=None, status=None, date_from=None, date_to=None, model=Attendance):
+    """A student's filtered attendance, newest first, starting after ``cursor``.
+
+    ``model`` is Attendance or ArchivedAttendance.
+    """
+    rows = model.objects.filter(student=student)
+    if subject:
+        rows = rows.filter(subject__code=subject)
+    if status:
+        rows = rows.filter(status=status)
+    if date_from:
+        rows = rows.filter(date__gte=_parse_date(date_from, 'date_from'))
+    if date_to:
+        rows = rows.filter(date__lte=_parse_date(date_to, 'date_to'))
+    if cursor:
+        last_date, last_pk = decode_cursor(cursor)
+        # date <= last_date keeps this a range seek on the index
+        rows = rows.filter(date__lte=last_date).exclude(date=last_date, pk__gte=last_pk)
+    return rows.order_by('-date', '-pk').values('pk', 'date', 'status', 'subject__code', 'subject__name')
+
+
+def history_page(student, cursor=None, limit=PAGE_SIZE, **filters):
+    """One page of a student's attendance, newest first.
+
+    Returns ``(rows, next_cursor)``; rows are compact dicts with the subject
+    already joined and ``next_cursor`` is None on the last page.
+    """
+    limit = _clamp(limit)
+    # Fetch one extra row to learn whether another page exists
+    page = list(history_queryset(student, cursor, **filters)[:limit + 1])
+    if _needs_archive(page, limit):
+        archived = list(history_queryset(student, cursor, model=ArchivedAttendance, **filters)[:limit + 1])
+        page = _merge(page, archived, limit)
+    return _page_result(page, limit)
+
+
+async def ahistory_page(student, cursor=None, limit=PAGE_SIZE, **filters):
+    """Async variant of history_page."""
+    limit = _clamp(limit)
+    page = [row async for row in history_queryset(student, cursor, **filters)[:limit + 1]]
+    if await sync_to_async(_needs_archive)(page, limit):
+        archived = [
+            row async for row in history_queryset(student, cursor, model=ArchivedAttendance, **filters)[:limit + 1]
+        ]
+        page = _merge(page, archived, limit)
+    return _page_result(page, limit)
+
+
+def _clamp(limit):
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _needs_archive(page, limit):
+    # A full page whose last row is newer than every archived row is complete
+    return reaches_archive(page[limit]['date'] if len(page) > limit else None)
+
+
+def _merge(page, archived, limit):
+    return list(merge_sorted([page, archived], key=itemgetter('date', 'pk'), reverse=True))[:limit + 1]
+
+
+def _page_result(page, limit):
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1]['date'], page[-1]['pk'])
+    return [
+        {
+            'id': row['pk'],
+            'date': row['date'],
+            'subject': row['subject__name'],
+            'code': row['subject__code'],
+            'status': row['status'],
+        }
+        for row in page
+    ], next_cursor
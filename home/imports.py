@@ -0,0 +1,282 @@
+import csv
+import json
+import os
+import time
+from datetime import date
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .marking import STATUS_VALUES, upsert_attendance
+from .enrollment import enroll, enrollment_changed, teacher_subject_pairs
+from .models import Attendance, Enrollment, Student, Subject, Teacher
+from .terms import is_archived
+
+
+# ------------------------
+# STREAMING CSV IMPORTS
+# ------------------------
+# The input file is read as a stream and written in chunks, one transaction
+# per chunk. Foreign keys resolve through lookup dicts built once up front.
+# Rows that fail validation go to a reject file with the reason. After each
+# committed chunk the row offset is saved to a checkpoint file, so an
+# interrupted import can resume where it stopped.
+
+
+class RowError(ValueError):
+    pass
+
+
+class CsvImporter:
+    required_columns = ()
+
+    def __init__(self, path, chunk_size=5000, rejects_path=None, checkpoint_path=None, resume=False, stdout=None):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.rejects_path = Path(rejects_path or f'{path}.rejects.csv')
+        self.checkpoint_path = Path(checkpoint_path or f'{path}.checkpoint')
+        self.resume = resume
+        self.stdout = stdout
+        self.imported = 0
+        self.rejected = 0
+
+    def prepare(self):
+        """Build the lookup dicts used by parse()."""
+
+    def parse(self, row):
+        """Validate one CSV row and return the value handed to write()."""
+        raise NotImplementedError
+
+    def write(self, items):
+        """Persist one chunk of parsed rows; runs inside a transaction."""
+        raise NotImplementedError
+
+    def run(self):
+        started = time.perf_counter()
+        skip = self.load_checkpoint() if self.resume else 0
+        self.prepare()
+
+        with open(self.path, newline='', encoding='utf-8') as source:
+            reader = csv.DictReader(source)
+            missing = set(self.required_columns) - set(reader.fieldnames or ())
+            if missing:
+                raise RowError(f'Missing columns: {", ".join(sorted(missing))}')
+
+            for _ in islice(reader, skip):
+                pass
+            offset = skip
+
+            with open(self.rejects_path, 'a' if skip else 'w', newline='', encoding='utf-8') as rejects_file:
+                rejects = csv.writer(rejects_file)
+                if not skip:
+                    rejects.writerow(['line'] + list(reader.fieldnames) + ['error'])
+
+                while True:
+                    rows = list(islice(reader, self.chunk_size))
+                    if not rows:
+                        break
+                    items, rejected = [], []
+                    for line, row in enumerate(rows, start=offset + 2):
+                        try:
+                            items.append(self.parse(row))
+                        except RowError as e:
+                            rejected.append([line] + [row.get(name) for name in reader.fieldnames] + [str(e)])
+                    with transaction.atomic():
+                        self.write(items)
+                    # Rejects and the checkpoint only move forward once the chunk is committed
+                    rejects.writerows(rejected)
+                    rejects_file.flush()
+                    offset += len(rows)
+                    self.imported += len(items)
+                    self.rejected += len(rejected)
+                    self.save_checkpoint(offset)
+                    self.progress(offset - skip, started)
+
+        self.elapsed = time.perf_counter() - started
+        self.checkpoint_path.unlink(missing_ok=True)
+        return self.imported, self.rejected
+
+    def progress(self, rows, started):
+        if self.stdout is not None:
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'  {rows:,} rows read ({rows / elapsed:,.0f} rows/sec)')
+
+    def load_checkpoint(self):
+        try:
+            return json.loads(self.checkpoint_path.read_text())['rows']
+        except FileNotFoundError:
+            return 0
+
+    def save_checkpoint(self, rows):
+        # Write-then-rename so a crash never leaves a truncated checkpoint
+        tmp = self.checkpoint_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'path': str(self.path), 'rows': rows}))
+        os.replace(tmp, self.checkpoint_path)
+
+
+class RosterImporter(CsvImporter):
+    """Students with their User accounts and teacher assignments.
+
+    Columns: roll_number, username, name, course, year, and optionally
+    branch, email, teacher (employee_id) and subjects, the codes of the
+    subjects to enroll the student in this term separated by ``;``. With no
+    subjects the student is enrolled in every subject of their teacher.
+    """
+
+    required_columns = ('roll_number', 'username', 'name', 'course', 'year')
+
+    def __init__(self, path, password=None, **kwargs):
+        super().__init__(path, **kwargs)
+        # Hashing is deliberately slow, so every imported user shares one hash
+        self.password = make_password(password)
+
+    def prepare(self):
+        self.teacher_ids = set(Teacher.objects.values_list('pk', flat=True))
+        self.subject_ids = dict(Subject.objects.values_list('code', 'pk'))
+        # Every account, with the student it belongs to if any; teacher and
+        # admin accounts map to None and are never taken over by an import
+        self.user_rolls = dict(User.objects.values_list('username', 'student__roll_number'))
+        self.roll_users = {roll: username for username, roll in self.user_rolls.items() if roll is not None}
+        self.seen_rolls = set()
+        self.seen_usernames = set()
+
+    def parse(self, row):
+        roll_number = (row.get('roll_number') or '').strip()
+        username = (row.get('username') or '').strip()
+        name = (row.get('name') or '').strip()
+        if not roll_number or not username or not name:
+            raise RowError('roll_number, username and name are required')
+        if roll_number in self.seen_rolls:
+            raise RowError(f'Duplicate roll_number {roll_number}')
+        if username in self.seen_usernames:
+            raise RowError(f'Duplicate username {username}')
+        if username in self.user_rolls and self.user_rolls[username] != roll_number:
+            owner = self.user_rolls[username]
+            raise RowError(f'Username {username} belongs to {f"student {owner}" if owner else "another account"}')
+        if self.roll_users.get(roll_number, username) != username:
+            raise RowError(f'Student {roll_number} already has username {self.roll_users[roll_number]}')
+        try:
+            year = int(row['year'])
+        except (TypeError, ValueError):
+            raise RowError(f'Invalid year: {row.get("year")}')
+        teacher_id = None
+        if row.get('teacher'):
+            try:
+                teacher_id = int(row['teacher'])
+            except ValueError:
+                teacher_id = None
+            if teacher_id not in self.teacher_ids:
+                raise RowError(f'Unknown teacher: {row["teacher"]}')
+        codes = [code.strip() for code in (row.get('subjects') or '').split(';') if code.strip()]
+        unknown = [code for code in codes if code not in self.subject_ids]
+        if unknown:
+            raise RowError(f'Unknown subject: {unknown[0]}')
+        self.seen_rolls.add(roll_number)
+        self.seen_usernames.add(username)
+
+        first_name, _, last_name = name.partition(' ')
+        user = User(
+            username=username,
+            first_name=first_name,
+            last_name=last_name,
+            email=(row.get('email') or '').strip(),
+            password=self.password,
+        )
+        student = Student(
+            roll_number=roll_number,
+            name=name,
+            course=(row.get('course') or '').strip(),
+            year=year,
+            branch=(row.get('branch') or '').strip() or None,
+            teacher_id=teacher_id,
+        )
+        student._import_subjects = [self.subject_ids[code] for code in codes]
+        return user, student
+
+    def write(self, items):
+        if not items:
+            return
+        User.objects.bulk_create(
+            [user for user, _ in items],
+            update_conflicts=True,
+            unique_fields=['username'],
+            update_fields=['first_name', 'last_name', 'email'],
+        )
+        user_ids = dict(
+            User.objects.filter(username__in=[user.username for user, _ in items]).values_list('username', 'pk')
+        )
+        students = []
+        for user, student in items:
+            student.user_id = user_ids[user.username]
+            students.append(student)
+
+        Student.objects.bulk_create(
+            students,
+            update_conflicts=True,
+            unique_fields=['roll_number'],
+            update_fields=['name', 'course', 'year', 'branch', 'teacher'],
+        )
+        pairs = [
+            (student.roll_number, subject_id) for student in students for subject_id in student._import_subjects
+        ]
+        pairs.extend(teacher_subject_pairs(
+            [student.roll_number for student in students if not student._import_subjects]
+        ))
+        enroll(pairs)
+        # bulk_create skips the Student signals, so rosters the students were
+        # already on, which may show their old names, are invalidated here
+        enrolled = set(Enrollment.objects.filter(student__in=students).values_list('subject_id', flat=True))
+        enrollment_changed(enrolled - {subject_id for _, subject_id in pairs})
+
+
+class AttendanceImporter(CsvImporter):
+    """Historical attendance, upserted on (student, subject, date).
+
+    Columns: roll_number, subject_code, date, status and optionally
+    marked_by (employee_id).
+    """
+
+    required_columns = ('roll_number', 'subject_code', 'date', 'status')
+
+    def prepare(self):
+        self.students = set(Student.objects.values_list('pk', flat=True))
+        self.subjects = dict(Subject.objects.values_list('code', 'pk'))
+        self.teacher_ids = set(Teacher.objects.values_list('pk', flat=True))
+
+    def parse(self, row):
+        roll_number = (row.get('roll_number') or '').strip()
+        if roll_number not in self.students:
+            raise RowError(f'Unknown student: {roll_number}')
+        subject_id = self.subjects.get((row.get('subject_code') or '').strip())
+        if subject_id is None:
+            raise RowError(f'Unknown subject: {row.get("subject_code")}')
+        try:
+            on_date = date.fromisoformat((row.get('date') or '').strip())
+        except ValueError:
+            raise RowError(f'Invalid date: {row.get("date")}')
+        if is_archived(on_date):
+            raise RowError(f'{on_date} belongs to an archived term')
+        status = (row.get('status') or '').strip().capitalize()
+        if status not in STATUS_VALUES:
+            raise RowError(f'Invalid status: {row.get("status")}')
+        marked_by_id = None
+        if row.get('marked_by'):
+            try:
+                marked_by_id = int(row['marked_by'])
+            except ValueError:
+                marked_by_id = None
+            if marked_by_id not in self.teacher_ids:
+                raise RowError(f'Unknown teacher: {row["marked_by"]}')
+        return Attendance(
+            student_id=roll_number,
+            subject_id=subject_id,
+            date=on_date,
+            status=status,
+            marked_by_id=marked_by_id,
+        )
+
+    def write(self, items):
+        upsert_attendance(items)
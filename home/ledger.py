@@ -0,0 +1,244 @@
+import re
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+
+from .models import Attendance, AttendanceLedger
+from .records import merge_sorted, sources
+from .stats import percentage
+from .summaries import STATUS_FIELDS
+from .terms import term_for
+
+
+# ------------------------
+# PACKED ATTENDANCE LEDGERS
+# ------------------------
+# An AttendanceLedger holds one student's statuses in one subject over a
+# term as 3-bit codes, one per day since the term started: 0 for a day
+# without a session, then one code per status. Day n takes bits 3n to 3n+2
+# of the little-endian buffer, so a 120-day term fits in 45 bytes where the
+# ORM would build a model instance per session. The readers count, slice
+# and scan the buffers as Python integers. upsert_attendance and the
+# attendance signals keep the ledgers current; build_ledgers rebuilds them.
+
+BITS = 3
+MASK = (1 << BITS) - 1
+NO_SESSION = 0
+STATUS_CODES = {status: code for code, (status, _) in enumerate(Attendance.STATUS_CHOICES, start=1)}
+CODE_STATUSES = {code: status for status, code in STATUS_CODES.items()}
+
+LEDGER_BATCH_SIZE = 500
+CHUNK_SIZE = 2000
+
+_to_date = Attendance._meta.get_field('date').to_python
+
+
+def _term_lookup():
+    """term_for, remembered per date for the length of one batch."""
+    terms = {}
+
+    def lookup(on_date):
+        if on_date not in terms:
+            terms[on_date] = term_for(on_date)
+        return terms[on_date]
+    return lookup
+
+
+# Packing
+
+def pack(value):
+    """The buffer for an integer holding one code per day, day 0 lowest."""
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+
+def set_code(buffer, day, code):
+    """Store ``code`` for ``day`` in a bytearray, growing it as needed."""
+    bit = day * BITS
+    first, shift = divmod(bit, 8)
+    end = (bit + BITS + 7) // 8
+    if len(buffer) < end:
+        buffer.extend(bytes(end - len(buffer)))
+    word = int.from_bytes(buffer[first:end], 'little')
+    word = (word & ~(MASK << shift)) | (code << shift)
+    buffer[first:end] = word.to_bytes(end - first, 'little')
+
+
+def rebase(statuses, old_start, new_start):
+    """The buffer re-counted from ``new_start``; days before it are dropped."""
+    value = int.from_bytes(statuses, 'little')
+    shift = (old_start - new_start).days * BITS
+    return pack(value << shift if shift >= 0 else value >> -shift)
+
+
+# Reading
+
+def day_range(start_date, date_from=None, date_to=None):
+    """Day ordinals ``(start, stop)`` covering ``date_from`` to ``date_to`` inclusive."""
+    start = (date_from - start_date).days if date_from else 0
+    stop = (date_to - start_date).days + 1 if date_to else None
+    return start, stop
+
+
+def window(statuses, start=0, stop=None):
+    """Days ``[start, stop)`` as one integer, day ``start`` lowest, and the number of days."""
+    # The last code may end in the last byte's unused high bits
+    days = (len(statuses) * 8 + BITS - 1) // BITS
+    stop = days if stop is None else min(stop, days)
+    start = max(start, 0)
+    if start >= stop:
+        return 0, 0
+    value = int.from_bytes(statuses, 'little') >> (start * BITS)
+    count = stop - start
+    return value & ((1 << count * BITS) - 1), count
+
+
+def counts(statuses, start=0, stop=None):
+    """Summary counters (see home.summaries) over days ``[start, stop)``."""
+    value, days = window(statuses, start, stop)
+    # The lowest bit of every code, then each code bit moved onto it
+    low = int('001' * days, 2) if days else 0
+    lanes = [(value >> bit) & low for bit in range(BITS)]
+    result = {'total_classes': (lanes[0] | lanes[1] | lanes[2]).bit_count()}
+    for status, field in STATUS_FIELDS.items():
+        code = STATUS_CODES[status]
+        matches = low
+        for bit, lane in enumerate(lanes):
+            matches &= lane if code >> bit & 1 else ~lane
+        result[field] = matches.bit_count()
+    return result
+
+
+def attendance_percentage(statuses, start=0, stop=None):
+    result = counts(statuses, start, stop)
+    return percentage(result['present_count'], result['total_classes'])
+
+
+def codes(statuses, start=0, stop=None):
+    """The codes of days ``[start, stop)`` as a string of digits, oldest first."""
+    value, days = window(statuses, start, stop)
+    # An octal digit is exactly one 3-bit code
+    return oct(value)[2:].zfill(days)[::-1] if days else ''
+
+
+def streaks(statuses, status='Present', start=0, stop=None):
+    """``(current, longest)`` runs of consecutive sessions with ``status``.
+
+    Days without a session neither extend nor break a run.
+    """
+    sessions = codes(statuses, start, stop).replace(str(NO_SESSION), '')
+    code = str(STATUS_CODES[status])
+    longest = max((len(run) for run in re.findall(f'{code}+', sessions)), default=0)
+    return len(sessions) - len(sessions.rstrip(code)), longest
+
+
+def sessions(statuses, start_date, start=0, stop=None):
+    """``(date, status)`` for every session in days ``[start, stop)``, oldest first."""
+    start = max(start, 0)
+    return [
+        (start_date + timedelta(days=start + offset), CODE_STATUSES[int(code)])
+        for offset, code in enumerate(codes(statuses, start, stop))
+        if code != str(NO_SESSION)
+    ]
+
+
+# Writing
+
+def update_ledgers(changes):
+    """Apply ``(student_id, subject_id, date, status)`` changes to the stored ledgers.
+
+    A status of None clears the day, and never creates a ledger. Dates
+    outside every term are not kept in a ledger. A ledger counted from an
+    earlier start date of its term is rebased first. Must run inside the
+    transaction that wrote the attendance.
+    """
+    by_key = {}
+    term_of = _term_lookup()
+    for student_id, subject_id, on_date, status in changes:
+        on_date = _to_date(on_date)
+        term = term_of(on_date)
+        if term is None:
+            continue
+        term_id, start_date = term
+        days = by_key.setdefault((student_id, subject_id, term_id), (start_date, []))[1]
+        days.append(((on_date - start_date).days, STATUS_CODES.get(status, NO_SESSION)))
+    if not by_key:
+        return 0
+
+    stored = {
+        row[:3]: row[3:]
+        for row in AttendanceLedger.objects.filter(
+            student_id__in={key[0] for key in by_key},
+            subject_id__in={key[1] for key in by_key},
+            term_id__in={key[2] for key in by_key},
+        ).values_list('student_id', 'subject_id', 'term_id', 'start_date', 'statuses')
+    }
+    ledgers = []
+    for (student_id, subject_id, term_id), (start_date, days) in by_key.items():
+        if (student_id, subject_id, term_id) not in stored and all(code == NO_SESSION for _, code in days):
+            # Nothing to clear; a cascade deleting the student or subject lands here
+            continue
+        stored_start, statuses = stored.get((student_id, subject_id, term_id), (start_date, b''))
+        if stored_start != start_date:
+            # The term's start date moved since the ledger was written
+            statuses = rebase(statuses, stored_start, start_date)
+        buffer = bytearray(statuses or b'')
+        for day, code in days:
+            set_code(buffer, day, code)
+        ledgers.append(AttendanceLedger(
+            student_id=student_id,
+            subject_id=subject_id,
+            term_id=term_id,
+            start_date=start_date,
+            statuses=bytes(buffer),
+        ))
+    if not ledgers:
+        return 0
+    AttendanceLedger.objects.bulk_create(
+        ledgers,
+        update_conflicts=True,
+        unique_fields=['student', 'subject', 'term'],
+        update_fields=['start_date', 'statuses', 'updated_at'],
+        batch_size=LEDGER_BATCH_SIZE,
+    )
+    return len(ledgers)
+
+
+def build_ledgers(batch_size=LEDGER_BATCH_SIZE):
+    """Rebuild every ledger from hot and archived attendance; returns the number written."""
+    fields = ('student_id', 'subject_id', 'date', 'status')
+    streams = [
+        model.objects.order_by(*fields[:3]).values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+        for model in sources()
+    ]
+    by_pair = itemgetter(0, 1)
+    term_of = _term_lookup()
+    written = 0
+    pending = []
+    with transaction.atomic():
+        AttendanceLedger.objects.all().delete()
+        for (student_id, subject_id), rows in groupby(merge_sorted(streams, by_pair), by_pair):
+            values = {}
+            for _, _, on_date, status in rows:
+                term = term_of(on_date)
+                if term is None:
+                    continue
+                value = values.get(term, 0)
+                values[term] = value | STATUS_CODES[status] << (on_date - term[1]).days * BITS
+            pending.extend(
+                AttendanceLedger(
+                    student_id=student_id,
+                    subject_id=subject_id,
+                    term_id=term_id,
+                    start_date=start_date,
+                    statuses=pack(value),
+                )
+                for (term_id, start_date), value in values.items()
+            )
+            if len(pending) >= batch_size:
+                AttendanceLedger.objects.bulk_create(pending, batch_size=batch_size)
+                written += len(pending)
+                pending = []
+        AttendanceLedger.objects.bulk_create(pending, batch_size=batch_size)
+    return written + len(pending)
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from home.archive import ARCHIVE_BATCH_SIZE, ArchiveError, archive_term, check_archivable, term_attendance
+from home.models import Term
+from home.routers import pin_to_primary
+
+
+class Command(BaseCommand):
+    help = 'Move the attendance of closed terms out of the hot table into ArchivedAttendance'
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='*', help='Names of the terms to archive')
+        parser.add_argument(
+            '--closed',
+            action='store_true',
+            help='Archive every term that ended before the current one started',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ARCHIVE_BATCH_SIZE,
+            help='Number of rows moved per transaction',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report what would move without moving it')
+
+    def handle(self, *args, **options):
+        if not options['terms'] and not options['closed']:
+            raise CommandError('Name the terms to archive or pass --closed')
+        with pin_to_primary():
+            for term in self.selected_terms(options):
+                self.archive(term, options)
+
+    def selected_terms(self, options):
+        if options['closed']:
+            terms = []
+            for term in Term.objects.filter(end_date__isnull=False).order_by('start_date'):
+                try:
+                    check_archivable(term)
+                except ArchiveError:
+                    continue
+                terms.append(term)
+            return terms
+        terms = {term.name: term for term in Term.objects.filter(name__in=options['terms'])}
+        missing = [name for name in options['terms'] if name not in terms]
+        if missing:
+            raise CommandError(f'Unknown term: {", ".join(missing)}')
+        return [terms[name] for name in options['terms']]
+
+    def archive(self, term, options):
+        started = time.perf_counter()
+        try:
+            if options['dry_run']:
+                check_archivable(term)
+                self.stdout.write(f'{term}: would archive {term_attendance(term).count():,} rows')
+                return
+            moved = archive_term(term, batch_size=options['batch_size'])
+        except ArchiveError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'{term}: archived {moved:,} rows in {time.perf_counter() - started:.2f}s'
+        ))
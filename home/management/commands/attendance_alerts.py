@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from home.alerts import run_alerts
+from home.routers import pin_to_primary
+
+
+class Command(BaseCommand):
+    help = (
+        'Raise and resolve low-attendance alerts for the (student, subject) pairs changed '
+        'since the last run. Run it from cron, or keep it running with --loop.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            action='append',
+            help='Alert below this percentage; repeat for several (default: ATTENDANCE_ALERT_THRESHOLDS)',
+        )
+        parser.add_argument(
+            '--min-classes',
+            type=int,
+            help='Classes needed before a pair is judged (default: ATTENDANCE_ALERT_MIN_CLASSES)',
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep running, one pass every --interval seconds')
+        parser.add_argument('--interval', type=float, default=300, help='Seconds between passes with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            with pin_to_primary():
+                evaluated, opened, resolved = run_alerts(options['threshold'], options['min_classes'])
+            self.stdout.write(
+                f'Evaluated {evaluated:,} changed pairs: {opened:,} alerts opened, '
+                f'{resolved:,} resolved in {time.perf_counter() - started:.2f}s'
+            )
+            if not options['loop']:
+                break
+            # A long-running process must not hold on to a stale connection
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,176 @@
+import asyncio
+import io
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from home.models import Student, Teacher
+
+
+DASHBOARDS = {
+    'teacher': (Teacher, 'teacher_dashboard', 'teacher_dashboard_async'),
+    'student': (Student, 'student_dashboard', 'student_dashboard_async'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare dashboard throughput and tail latency under ASGI (async views, '
+        'AttendenceX.asgi) and WSGI (sync views on a thread per user, AttendenceX.wsgi). '
+        'Requests are driven in-process, so the numbers exclude any server and network overhead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Concurrent simulated users')
+        parser.add_argument('--requests', type=int, default=5, help='Sequential requests per user')
+        parser.add_argument('--dashboard', choices=sorted(DASHBOARDS), default='teacher')
+
+    def handle(self, *args, **options):
+        from AttendenceX.asgi import application as asgi_app
+        from AttendenceX.wsgi import application as wsgi_app
+
+        model, sync_name, async_name = DASHBOARDS[options['dashboard']]
+        profiles = list(model.objects.select_related('user').order_by('pk')[:options['users']])
+        if not profiles:
+            raise CommandError(f'No {options["dashboard"]} accounts; run generate_dataset first')
+        sessions = [self.session_cookie(profile.user) for profile in profiles]
+        # With fewer accounts than users, several users share a login
+        cookies = [sessions[i % len(sessions)] for i in range(options['users'])]
+
+        self.stdout.write(
+            f'{options["users"]} users x {options["requests"]} requests '
+            f'on the {options["dashboard"]} dashboard ({len(sessions)} accounts)'
+        )
+        runs = [
+            ('WSGI', self.run_wsgi(wsgi_app, reverse(sync_name), cookies, options['requests'])),
+            ('ASGI', asyncio.run(self.run_asgi(asgi_app, reverse(async_name), cookies, options['requests']))),
+        ]
+        self.stdout.write(f'{"":6}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"errors":>8}')
+        for name, (elapsed, latencies, errors) in runs:
+            ordered = sorted(latencies)
+            self.stdout.write(
+                f'{name:6}{len(latencies) / elapsed:>10.1f}'
+                f'{statistics.median(ordered):>10.1f}'
+                f'{self.quantile(ordered, 0.95):>10.1f}'
+                f'{self.quantile(ordered, 0.99):>10.1f}'
+                f'{errors:>8}'
+            )
+
+    def session_cookie(self, user):
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        store[SESSION_KEY] = str(user.pk)
+        store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        store.create()
+        return f'{settings.SESSION_COOKIE_NAME}={store.session_key}'
+
+    def quantile(self, ordered, fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    # WSGI: one thread per user, as a threaded WSGI server would run them
+
+    def run_wsgi(self, app, path, cookies, requests):
+        self.wsgi_get(app, path, cookies[0])  # warm up
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(cookies)) as pool:
+            results = list(pool.map(lambda cookie: self.wsgi_user(app, path, cookie, requests), cookies))
+        return self.collect(started, results)
+
+    def wsgi_user(self, app, path, cookie, requests):
+        results = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            status = self.wsgi_get(app, path, cookie)
+            results.append(((time.perf_counter() - start) * 1000, status))
+        return results
+
+    def wsgi_get(self, app, path, cookie):
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'localhost',
+            'HTTP_COOKIE': cookie,
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': sys.stderr,
+            'wsgi.url_scheme': 'http',
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            'wsgi.version': (1, 0),
+        }
+        status = []
+        body = app(environ, lambda line, headers, exc_info=None: status.append(int(line.split()[0])))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        return status[0]
+
+    # ASGI: one task per user on a single event loop
+
+    async def run_asgi(self, app, path, cookies, requests):
+        await self.asgi_get(app, path, cookies[0])  # warm up
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self.asgi_user(app, path, cookie, requests) for cookie in cookies))
+        return self.collect(started, results)
+
+    async def asgi_user(self, app, path, cookie, requests):
+        results = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            status = await self.asgi_get(app, path, cookie)
+            results.append(((time.perf_counter() - start) * 1000, status))
+        return results
+
+    async def asgi_get(self, app, path, cookie):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'cookie', cookie.encode())],
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+        body_sent = False
+        status = []
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # The client never disconnects; Django cancels this wait once it responds
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        # ASGIHandler runs each request's sync code in a thread of its own
+        await app(scope, receive, send)
+        return status[0]
+
+    def collect(self, started, results):
+        elapsed = time.perf_counter() - started
+        flat = [result for user in results for result in user]
+        latencies = [latency for latency, _ in flat]
+        errors = sum(1 for _, status in flat if status != 200)
+        return elapsed, latencies, errors
@@ -0,0 +1,93 @@
+import gc
+import statistics
+import time
+import tracemalloc
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from home import ledger
+from home.models import Attendance, AttendanceLedger, Student
+from home.stats import percentage
+from home.terms import current_term
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare time and peak memory of per-subject percentages and present streaks computed '
+        'from Attendance model instances and from the packed ledgers, over the current term'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000, help='Number of students to compute for')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per path')
+
+    def handle(self, *args, **options):
+        term = current_term()
+        if term is None:
+            raise CommandError('There is no current term')
+        student_ids = list(Student.objects.order_by('pk').values_list('pk', flat=True)[:options['students']])
+        if not student_ids:
+            raise CommandError('No students; run generate_dataset first')
+
+        paths = [('ORM', self.orm_path), ('ledger', self.ledger_path)]
+        self.stdout.write(f'{len(student_ids):,} students, term {term}, median of {options["repeat"]} runs')
+        self.stdout.write(f'{"":8}{"pairs":>10}{"median ms":>12}{"peak KiB":>12}')
+        results = {}
+        for name, path in paths:
+            timings = []
+            for _ in range(options['repeat']):
+                gc.collect()
+                started = time.perf_counter()
+                results[name] = path(student_ids, term)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f'{name:8}{len(results[name]):>10,}{statistics.median(timings):>12.1f}'
+                f'{self.peak_memory(path, student_ids, term) / 1024:>12,.0f}'
+            )
+
+        mismatched = sum(1 for pair, value in results['ORM'].items() if results['ledger'].get(pair) != value)
+        if mismatched or len(results['ORM']) != len(results['ledger']):
+            self.stderr.write(f'{mismatched:,} pairs differ; run build_ledgers to rebuild the ledgers')
+        else:
+            self.stdout.write(self.style.SUCCESS('Both paths agree on every (student, subject) pair'))
+
+    def peak_memory(self, path, student_ids, term):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            path(student_ids, term)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def orm_path(self, student_ids, term):
+        """``{(student, subject): (percentage, current streak, longest streak)}`` from model instances."""
+        rows = Attendance.objects.filter(student_id__in=student_ids, date__gte=term.start_date)
+        if term.end_date:
+            rows = rows.filter(date__lte=term.end_date)
+        statuses = defaultdict(list)
+        for record in rows.order_by('date'):
+            statuses[(record.student_id, record.subject_id)].append(record.status)
+        results = {}
+        for pair, history in statuses.items():
+            longest = current = 0
+            for status in history:
+                current = current + 1 if status == 'Present' else 0
+                longest = max(longest, current)
+            results[pair] = (percentage(history.count('Present'), len(history)), current, longest)
+        return results
+
+    def ledger_path(self, student_ids, term):
+        """The same results read from the packed ledgers."""
+        results = {}
+        for student_id, subject_id, statuses in AttendanceLedger.objects.filter(
+            student_id__in=student_ids, term=term,
+        ).values_list('student_id', 'subject_id', 'statuses'):
+            counts = ledger.counts(statuses)
+            if counts['total_classes']:
+                results[(student_id, subject_id)] = (
+                    percentage(counts['present_count'], counts['total_classes']),
+                    *ledger.streaks(statuses),
+                )
+        return results
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home.ledger import LEDGER_BATCH_SIZE, build_ledgers
+from home.routers import pin_to_primary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the packed attendance ledgers from hot and archived attendance'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=LEDGER_BATCH_SIZE,
+            help='Number of ledgers written per INSERT',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with pin_to_primary():
+            written = build_ledgers(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {written:,} attendance ledgers in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,61 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from home import assets
+
+
+class Command(BaseCommand):
+    help = 'Write gzip (and brotli) variants of the collected static files and report bytes per page'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-size',
+            type=int,
+            default=256,
+            help='Leave files smaller than this many bytes uncompressed',
+        )
+        parser.add_argument('--force', action='store_true', help='Recompress files whose variants are up to date')
+
+    def handle(self, *args, **options):
+        root = Path(settings.STATIC_ROOT)
+        if not root.is_dir():
+            raise CommandError(f'{root} does not exist; run "manage.py collectstatic" first')
+        if assets.brotli is None:
+            self.stderr.write('brotli is not installed; writing gzip variants only')
+
+        started = time.perf_counter()
+        files = raw = 0
+        compressed = dict.fromkeys(assets.available_encodings(), 0)
+        for path in assets.compressible_files(root, options['min_size']):
+            size = path.stat().st_size
+            sizes = assets.compress_file(path, force=options['force'])
+            files += 1
+            raw += size
+            for encoding in compressed:
+                compressed[encoding] += sizes.get(encoding, size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Compressed {files:,} files ({raw:,} bytes) in {time.perf_counter() - started:.2f}s: '
+            + ', '.join(f'{encoding} {total:,} bytes' for encoding, total in compressed.items())
+        ))
+        self.write_report(compressed)
+
+    def write_report(self, encodings):
+        template_dir = Path(__file__).resolve().parents[2] / 'templates'
+        self.stdout.write(self.style.MIGRATE_HEADING('\nBytes per page (template + linked bundles)'))
+        self.stdout.write(
+            f'  {"page":<26}{"html":>8}{"bundles":>9}'
+            + ''.join(f'{encoding:>9}' for encoding in encodings)
+            + f'{"inlined":>10}'
+        )
+        for row in assets.page_report(template_dir):
+            # What every view cost when the bundles were inlined; a repeat
+            # view now sends only the html
+            inlined = row['html'] + row['assets']
+            self.stdout.write(
+                f'  {row["page"]:<26}{row["html"]:>8,}{row["assets"]:>9,}'
+                + ''.join(f'{row[encoding]:>9,}' for encoding in encodings)
+                + f'{inlined:>10,}'
+            )
@@ -0,0 +1,107 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+
+from home.history import PAGE_SIZE, encode_cursor, history_queryset
+from home.marking import session_records, upsert_attendance
+from home.models import Attendance, Student, Teacher
+from home.roster import get_roster
+from home.stats import (
+    recent_marked_attendance,
+    student_summary_rows,
+    subject_totals,
+    teacher_subjects,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Print the query plan and timing of the dashboard and save queries. '
+        'Run it against a large dataset (see generate_dataset) before deploying.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teacher', type=int, help='Teacher employee_id to profile (default: largest roster)')
+        parser.add_argument('--student', help='Student roll_number to profile (default: longest history)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+
+    def handle(self, *args, **options):
+        self.repeat = max(options['repeat'], 1)
+        teacher = self.pick_teacher(options['teacher'])
+        student = self.pick_student(options['student'])
+        self.stdout.write(f'Database: {connection.vendor} ({connection.settings_dict["NAME"]})')
+        self.stdout.write(f'Teacher: {teacher}  Student: {student}\n')
+
+        subjects = list(teacher_subjects(teacher))
+        self.report('teacher dashboard: subjects with marked counts', teacher_subjects(teacher))
+        self.report('teacher dashboard: subject percentages', subject_totals(subjects))
+        self.report('teacher dashboard: recent attendance', recent_marked_attendance(teacher, subjects))
+        self.report('student dashboard: subject summaries', student_summary_rows(student))
+        self.report('student history: first page', history_queryset(student)[:PAGE_SIZE + 1])
+        oldest = history_queryset(student).order_by('date', 'pk').first()
+        if oldest is not None:
+            cursor = encode_cursor(oldest['date'], oldest['pk'] + 1)
+            self.report('student history: deepest page', history_queryset(student, cursor)[:PAGE_SIZE + 1])
+
+        if subjects:
+            subject = subjects[0]
+            # The students a save marks: those enrolled in the subject this term
+            roster = [student.roll_number for student in get_roster(subject)]
+            on_date = Attendance.objects.filter(subject=subject).values_list('date', flat=True).first()
+            if on_date is not None:
+                self.report(
+                    'save attendance: existing keys',
+                    Attendance.objects.filter(student_id__in=roster, subject=subject, date=on_date)
+                    .values_list('student_id', 'subject_id', 'date', 'status'),
+                )
+                self.time_upsert(teacher, subject, on_date, roster)
+
+    def pick_teacher(self, employee_id):
+        teachers = Teacher.objects.all()
+        if employee_id is not None:
+            teachers = teachers.filter(pk=employee_id)
+        teacher = teachers.annotate(roster_size=Count('students')).order_by('-roster_size').first()
+        if teacher is None:
+            raise CommandError('No teacher found; generate a dataset first.')
+        return teacher
+
+    def pick_student(self, roll_number):
+        if roll_number is not None:
+            student = Student.objects.filter(pk=roll_number).first()
+        else:
+            student = Student.objects.order_by('-attendancesummary__total_classes').first()
+        if student is None:
+            raise CommandError('No student found; generate a dataset first.')
+        return student
+
+    def report(self, label, queryset):
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        for line in queryset.explain().splitlines():
+            self.stdout.write(f'    {line}')
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            rows = len(list(queryset.all()))
+            timings.append(time.perf_counter() - start)
+        self.write_timing(timings, f'{rows} rows')
+
+    def time_upsert(self, teacher, subject, on_date, roster):
+        self.stdout.write(self.style.MIGRATE_HEADING('save attendance: bulk upsert (rolled back)'))
+        statuses = {roll_number: 'Present' for roll_number in roster}
+        timings = []
+        for _ in range(self.repeat):
+            with transaction.atomic():
+                start = time.perf_counter()
+                upsert_attendance(session_records(teacher, subject, on_date, statuses, set(roster)))
+                timings.append(time.perf_counter() - start)
+                transaction.set_rollback(True)
+        self.write_timing(timings, f'{len(roster)} rows')
+
+    def write_timing(self, timings, detail):
+        timings.sort()
+        self.stdout.write(
+            f'    {detail}; best {timings[0] * 1000:.2f} ms, '
+            f'median {timings[len(timings) // 2] * 1000:.2f} ms over {len(timings)} runs\n'
+        )
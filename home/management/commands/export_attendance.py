@@ -0,0 +1,51 @@
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from home.exports import EXPORT_FORMATS, ExportError, export_rows, export_stream
+
+
+class Command(BaseCommand):
+    help = 'Stream attendance records to CSV or JSON Lines with constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--subject', help='Subject code')
+        parser.add_argument('--teacher', type=int, help='employee_id of the teacher who marked the records')
+        parser.add_argument('--student', help='Student roll number')
+        parser.add_argument('--date-from', help='First date to include (YYYY-MM-DD)')
+        parser.add_argument('--date-to', help='Last date to include (YYYY-MM-DD)')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+
+    def handle(self, *args, **options):
+        try:
+            rows = export_rows(
+                subject=options['subject'],
+                teacher=options['teacher'],
+                student=options['student'],
+                date_from=options['date_from'],
+                date_to=options['date_to'],
+            )
+            stream = export_stream(options['format'], rows)
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        written = 0
+        target = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            sink = gzip.GzipFile(fileobj=target, mode='wb') if options['gzip'] else target
+            for chunk in stream:
+                sink.write(chunk)
+                written += len(chunk)
+            if options['gzip']:
+                sink.close()
+        finally:
+            if options['output']:
+                target.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(f'Exported {written:,} bytes in {elapsed:.1f}s'))
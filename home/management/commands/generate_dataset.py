@@ -0,0 +1,289 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from home.enrollment import enrollment_changed
+from home.models import (
+    ArchivedAttendance,
+    Attendance,
+    AttendanceLedger,
+    AttendanceSummary,
+    DailyRollup,
+    Enrollment,
+    LowAttendanceAlert,
+    Student,
+    Subject,
+    SyncReceipt,
+    Teacher,
+)
+from home.terms import current_term
+
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Alice', 'Amit', 'Ananya', 'Arjun', 'Bob', 'Charlie', 'Deepa', 'Diana',
+    'Eve', 'Farhan', 'Frank', 'Grace', 'Harsh', 'Henry', 'Isha', 'Ivy', 'Jack', 'Kabir',
+    'Kavya', 'Meera', 'Nikhil', 'Priya', 'Rahul', 'Riya', 'Rohan', 'Sara', 'Tanvi', 'Vikram',
+]
+LAST_NAMES = [
+    'Anderson', 'Brown', 'Das', 'Davis', 'Garcia', 'Gupta', 'Iyer', 'Jackson', 'Jain', 'Johnson',
+    'Kapoor', 'Khan', 'Martinez', 'Mehta', 'Miller', 'Nair', 'Patel', 'Rao', 'Reddy', 'Shah',
+    'Sharma', 'Singh', 'Smith', 'Taylor', 'Thomas', 'Verma', 'Williams', 'Wilson', 'Yadav', 'Zhang',
+]
+DEPARTMENTS = [
+    ('Computer Science', 'CS'),
+    ('Mathematics', 'MATH'),
+    ('Physics', 'PHY'),
+    ('Chemistry', 'CHEM'),
+    ('Electronics', 'ECE'),
+    ('Mechanical Engineering', 'ME'),
+]
+SUBJECT_TOPICS = [
+    'Algorithms', 'Data Structures', 'Databases', 'Networks', 'Operating Systems', 'Calculus',
+    'Linear Algebra', 'Probability', 'Quantum Mechanics', 'Thermodynamics', 'Optics',
+    'Organic Chemistry', 'Signals and Systems', 'Control Theory', 'Fluid Mechanics', 'Statistics',
+]
+ABSENCE_STATUSES = ['Absent', 'Late', 'Excused']
+ABSENCE_WEIGHTS = [6, 3, 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a deterministic synthetic dataset at configurable scale '
+        '(defaults: 200 teachers, 50k students, 2k subjects, ~20M attendance rows)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teachers', type=int, default=200)
+        parser.add_argument('--students', type=int, default=50000)
+        parser.add_argument('--subjects', type=int, default=2000)
+        parser.add_argument('--sessions', type=int, default=40, help='Class sessions per subject')
+        parser.add_argument('--start-date', type=date.fromisoformat, default=date(2025, 8, 1))
+        parser.add_argument('--days', type=int, default=365, help='Length of the teaching period in days')
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiply the teacher, student and subject counts (e.g. 0.01 for a quick run)',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create')
+        parser.add_argument('--password', default='password123', help='Password shared by every generated user')
+        parser.add_argument('--clear', action='store_true', help='Delete existing non-superuser data first')
+        parser.add_argument(
+            '--skip-summaries',
+            action='store_true',
+            help='Do not rebuild AttendanceSummary counters, daily rollups and ledgers afterwards',
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.rng = random.Random(options['seed'])
+        scale = options['scale']
+        n_teachers = max(1, round(options['teachers'] * scale))
+        n_students = max(1, round(options['students'] * scale))
+        n_subjects = max(1, round(options['subjects'] * scale))
+
+        if options['clear']:
+            self.clear()
+        if User.objects.filter(username__in=['teacher0001', 'student000001']).exists():
+            raise CommandError('Generated users already exist; rerun with --clear.')
+
+        # Hashing is deliberately slow, so every user shares one hash
+        self.password = make_password(options['password'])
+
+        teachers = self.create_teachers(n_teachers)
+        subjects_by_teacher = self.create_subjects(n_subjects, teachers)
+        students_by_teacher = self.create_students(n_students, teachers)
+        self.create_enrollments(subjects_by_teacher, students_by_teacher, options['start_date'])
+        self.create_attendance(
+            teachers,
+            subjects_by_teacher,
+            students_by_teacher,
+            options['sessions'],
+            options['start_date'],
+            options['days'],
+        )
+
+        if not options['skip_summaries']:
+            call_command('rebuild_summaries', batch_size=self.batch_size, stdout=self.stdout)
+            call_command('refresh_rollups', full=True, stdout=self.stdout)
+            call_command('build_ledgers', batch_size=self.batch_size, stdout=self.stdout)
+
+        self.stdout.write(
+            self.style.WARNING(
+                f'\nLogin with teacher0001 / student000001 (and so on), '
+                f'password "{options["password"]}"'
+            )
+        )
+
+    def clear(self):
+        self.stdout.write('Clearing existing data...')
+        # Raw deletes skip loading millions of rows for per-row signals
+        with transaction.atomic(), connection.cursor() as cursor:
+            models = (
+                ArchivedAttendance, Attendance, AttendanceLedger, AttendanceSummary, DailyRollup,
+                LowAttendanceAlert, SyncReceipt, Enrollment, Teacher.subjects.through, Student, Teacher, Subject,
+            )
+            for model in models:
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+        User.objects.filter(is_superuser=False).delete()
+
+    def create_teachers(self, count):
+        started = time.perf_counter()
+        users = []
+        for n in range(1, count + 1):
+            users.append(User(
+                username=f'teacher{n:04d}',
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                password=self.password,
+            ))
+        self.bulk_create(User, users)
+
+        teachers = [
+            Teacher(
+                user=user,
+                name=f'{user.first_name} {user.last_name}',
+                department=self.rng.choice(DEPARTMENTS)[0],
+            )
+            for user in users
+        ]
+        self.bulk_create(Teacher, teachers)
+        self.report('teachers', len(teachers), started)
+        return teachers
+
+    def create_subjects(self, count, teachers):
+        started = time.perf_counter()
+        subjects = []
+        for n in range(1, count + 1):
+            _, prefix = self.rng.choice(DEPARTMENTS)
+            topic = self.rng.choice(SUBJECT_TOPICS)
+            subjects.append(Subject(name=f'{topic} {n}', code=f'{prefix}{n:05d}'))
+        self.bulk_create(Subject, subjects)
+
+        # Subjects are dealt out to teachers round-robin
+        subjects_by_teacher = {teacher.pk: [] for teacher in teachers}
+        links = []
+        for i, subject in enumerate(subjects):
+            teacher = teachers[i % len(teachers)]
+            subjects_by_teacher[teacher.pk].append(subject)
+            links.append(Teacher.subjects.through(teacher_id=teacher.pk, subject_id=subject.pk))
+        self.bulk_create(Teacher.subjects.through, links)
+        self.report('subjects', len(subjects), started)
+        return subjects_by_teacher
+
+    def create_students(self, count, teachers):
+        started = time.perf_counter()
+        students_by_teacher = {teacher.pk: [] for teacher in teachers}
+        for offset in range(0, count, self.batch_size):
+            users, students = [], []
+            for n in range(offset + 1, min(offset + self.batch_size, count) + 1):
+                first_name = self.rng.choice(FIRST_NAMES)
+                last_name = self.rng.choice(LAST_NAMES)
+                course, branch = self.rng.choice(DEPARTMENTS)
+                user = User(
+                    username=f'student{n:06d}',
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=self.password,
+                )
+                users.append(user)
+                students.append(Student(
+                    user=user,
+                    name=f'{first_name} {last_name}',
+                    roll_number=f'R{n:06d}',
+                    course=course,
+                    branch=branch,
+                    year=self.rng.randint(1, 4),
+                    teacher_id=teachers[n % len(teachers)].pk,
+                ))
+            with transaction.atomic():
+                self.bulk_create(User, users)
+                self.bulk_create(Student, students)
+            for student in students:
+                # Each student attends with their own propensity
+                students_by_teacher[student.teacher_id].append(
+                    (student.roll_number, self.rng.betavariate(8, 2))
+                )
+        self.report('students', count, started)
+        return students_by_teacher
+
+    def create_enrollments(self, subjects_by_teacher, students_by_teacher, start_date):
+        started = time.perf_counter()
+        term = current_term()
+        if term.start_date > start_date:
+            # The generated attendance belongs to the current term, ledgers included
+            term.start_date = start_date
+            term.save(update_fields=['start_date', 'updated_at'])
+        total = 0
+        pending = []
+        for teacher_id, subjects in subjects_by_teacher.items():
+            # Every student of the teacher takes each of their subjects
+            for subject in subjects:
+                pending.extend(
+                    Enrollment(student_id=roll_number, subject_id=subject.pk, term=term)
+                    for roll_number, _ in students_by_teacher[teacher_id]
+                )
+                if len(pending) >= self.batch_size:
+                    total += len(pending)
+                    self.bulk_create(Enrollment, pending)
+                    pending = []
+        total += len(pending)
+        self.bulk_create(Enrollment, pending)
+        # bulk_create skips the Enrollment signals
+        enrollment_changed(subject.pk for subjects in subjects_by_teacher.values() for subject in subjects)
+        self.report('enrollments', total, started)
+
+    def create_attendance(self, teachers, subjects_by_teacher, students_by_teacher, sessions, start_date, days):
+        started = time.perf_counter()
+        teaching_days = [
+            start_date + timedelta(days=offset)
+            for offset in range(days)
+            if (start_date + timedelta(days=offset)).weekday() < 5
+        ]
+        sessions = min(sessions, len(teaching_days))
+        total = 0
+        pending = []
+        for teacher in teachers:
+            # Every student of the teacher is enrolled in each of their subjects
+            students = students_by_teacher[teacher.pk]
+            for subject in subjects_by_teacher[teacher.pk]:
+                for on_date in sorted(self.rng.sample(teaching_days, sessions)):
+                    for roll_number, propensity in students:
+                        if self.rng.random() < propensity:
+                            status = 'Present'
+                        else:
+                            status = self.rng.choices(ABSENCE_STATUSES, ABSENCE_WEIGHTS)[0]
+                        pending.append(Attendance(
+                            student_id=roll_number,
+                            subject_id=subject.pk,
+                            date=on_date,
+                            status=status,
+                            marked_by_id=teacher.pk,
+                        ))
+                    if len(pending) >= self.batch_size:
+                        total += self.flush_attendance(pending)
+                        pending = []
+                        if total // self.batch_size % 100 == 0:
+                            self.stdout.write(f'  {total} attendance rows...')
+        total += self.flush_attendance(pending)
+        self.report('attendance rows', total, started)
+
+    def flush_attendance(self, rows):
+        with transaction.atomic():
+            self.bulk_create(Attendance, rows)
+        return len(rows)
+
+    def bulk_create(self, model, objs):
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+
+    def report(self, label, count, started):
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f'Created {count} {label} in {elapsed:.1f}s ({rate:,.0f} rows/sec)'))
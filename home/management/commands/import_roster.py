@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from home.imports import RosterImporter, RowError
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream students, their user accounts and teacher assignments from a CSV file '
+        '(columns: roll_number, username, name, course, year[, branch, email, teacher, subjects]; '
+        'subjects are the codes to enroll the student in this term, separated by ";", '
+        'and default to every subject of the teacher)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows written per transaction')
+        parser.add_argument('--password', help='Initial password for new accounts (default: unusable)')
+        parser.add_argument('--rejects', help='Where to write rejected rows (default: <path>.rejects.csv)')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--resume', action='store_true', help='Continue from the last checkpoint')
+
+    def handle(self, *args, **options):
+        importer = RosterImporter(
+            options['path'],
+            password=options['password'],
+            chunk_size=options['chunk_size'],
+            rejects_path=options['rejects'],
+            checkpoint_path=options['checkpoint'],
+            resume=options['resume'],
+            stdout=self.stdout,
+        )
+        try:
+            imported, rejected = importer.run()
+        except (OSError, RowError) as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {imported:,} students, rejected {rejected:,} '
+                f'in {importer.elapsed:.1f}s (rejects: {importer.rejects_path})'
+            )
+        )
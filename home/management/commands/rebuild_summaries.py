@@ -0,0 +1,92 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from home.models import AttendanceSummary, Subject
+from home.records import combined_breakdown
+from home.routers import pin_to_primary
+from home.summaries import COUNTER_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Recompute AttendanceSummary counters from hot and archived attendance and fix any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Number of summary rows written per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without writing changes',
+        )
+
+    def handle(self, *args, **options):
+        # Drift is measured against the primary, never a possibly stale replica
+        with pin_to_primary():
+            self.reconcile(options)
+
+    def reconcile(self, options):
+        self.batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        self.to_create, self.to_update, self.to_delete = [], [], []
+        self.created = self.updated = self.deleted = 0
+
+        # Both streams are ordered on (student, subject), so they can be merged
+        # in a single pass without holding either side in memory.
+        expected = combined_breakdown(('student_id', 'subject_id'), chunk_size=self.batch_size)
+        stored = (
+            AttendanceSummary.objects.order_by('student_id', 'subject_id')
+            .iterator(chunk_size=self.batch_size)
+        )
+
+        row = next(expected, None)
+        summary = next(stored, None)
+        while row is not None or summary is not None:
+            row_key = (row['student_id'], row['subject_id']) if row is not None else None
+            summary_key = (summary.student_id, summary.subject_id) if summary is not None else None
+
+            if summary_key is None or (row_key is not None and row_key < summary_key):
+                self.to_create.append(AttendanceSummary(**row))
+                row = next(expected, None)
+            elif row_key is None or summary_key < row_key:
+                self.to_delete.append(summary.pk)
+                summary = next(stored, None)
+            else:
+                if any(getattr(summary, field) != row[field] for field in COUNTER_FIELDS):
+                    for field in COUNTER_FIELDS:
+                        setattr(summary, field, row[field])
+                    summary.updated_at = timezone.now()
+                    self.to_update.append(summary)
+                row = next(expected, None)
+                summary = next(stored, None)
+            self.flush()
+        self.flush(force=True)
+        if not self.dry_run and self.created + self.updated + self.deleted:
+            # Cached teacher dashboards are versioned on their subjects
+            Subject.objects.update(updated_at=timezone.now())
+
+        verb = 'Would fix' if self.dry_run else 'Fixed'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{verb} attendance summaries: {self.created} created, '
+                f'{self.updated} updated, {self.deleted} deleted'
+            )
+        )
+
+    def flush(self, force=False):
+        pending = len(self.to_create) + len(self.to_update) + len(self.to_delete)
+        if not pending or (pending < self.batch_size and not force):
+            return
+        if not self.dry_run:
+            with transaction.atomic():
+                AttendanceSummary.objects.bulk_create(self.to_create)
+                AttendanceSummary.objects.bulk_update(self.to_update, COUNTER_FIELDS + ('updated_at',))
+                AttendanceSummary.objects.filter(pk__in=self.to_delete).delete()
+        self.created += len(self.to_create)
+        self.updated += len(self.to_update)
+        self.deleted += len(self.to_delete)
+        self.to_create, self.to_update, self.to_delete = [], [], []
@@ -0,0 +1,116 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from home import analytics
+from home.models import Teacher
+
+
+class Command(BaseCommand):
+    help = 'Report at-risk students, absence streaks and rising late arrivals (needs NumPy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', help='Only subjects taught in this department')
+        parser.add_argument('--teacher', type=int, help='Only subjects of this teacher (employee_id)')
+        parser.add_argument('--subject', help='Only this subject code')
+        parser.add_argument('--date-from', help='First date to include (YYYY-MM-DD)')
+        parser.add_argument('--date-to', help='Last date to include (YYYY-MM-DD)')
+        parser.add_argument('--threshold', type=float, default=75.0, help='Flag students below this percentage')
+        parser.add_argument('--streak', type=int, default=3, help='Flag runs of at least this many absences')
+        parser.add_argument('--window', type=int, default=10, help='Recent sessions used for the late trend')
+        parser.add_argument('--limit', type=int, default=20, help='Rows shown per section')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            metavar='ROWS',
+            help='Time every computation on ROWS synthetic sessions instead of reporting',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            analytics.require_numpy()
+        except analytics.AnalyticsUnavailable as e:
+            raise CommandError(str(e))
+        if options['streak'] < 1 or options['window'] < 1:
+            raise CommandError('--streak and --window must be at least 1')
+        if options['benchmark']:
+            return self.benchmark(options['benchmark'], options)
+
+        teacher = None
+        if options['teacher']:
+            try:
+                teacher = Teacher.objects.get(pk=options['teacher'])
+            except Teacher.DoesNotExist:
+                raise CommandError(f'Unknown teacher: {options["teacher"]}')
+        dates = {}
+        for name in ('date_from', 'date_to'):
+            if options[name]:
+                dates[name] = parse_date(options[name])
+                if dates[name] is None:
+                    raise CommandError(f'Invalid {name}: {options[name]}')
+
+        started = time.perf_counter()
+        arrays = analytics.load_arrays(analytics.scope_queryset(
+            department=options['department'], teacher=teacher, subject=options['subject'], **dates
+        ))
+        loaded = time.perf_counter()
+        report = analytics.risk_report(
+            arrays, options['threshold'], options['streak'], options['window'], options['limit']
+        )
+        finished = time.perf_counter()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+        else:
+            self.write_text(report, options)
+        self.stderr.write(
+            f'Loaded {report["sessions"]:,} sessions in {loaded - started:.2f}s, '
+            f'analysed in {finished - loaded:.3f}s'
+        )
+
+    def write_text(self, report, options):
+        self.stdout.write(f'{report["sessions"]:,} sessions for {report["students"]:,} students\n')
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Below {options["threshold"]:g}% attendance'))
+        for row in report['at_risk']:
+            self.stdout.write(
+                f'  {row["roll_number"]:<12}{row["name"] or "":<30}'
+                f'{row["present_count"]:>5}/{row["total_classes"]:<5}{row["attendance_percentage"]:>6}%'
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{options["streak"]}+ consecutive absences'))
+        for row in report['absence_streaks']:
+            self.stdout.write(
+                f'  {row["roll_number"]:<12}{row["name"] or "":<30}{row["subject"] or "":<10}'
+                f'longest {row["longest"]:<4} current {row["current"]}'
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\nRising late arrivals (last {options["window"]} sessions)'))
+        for row in report['rising_late']:
+            self.stdout.write(
+                f'  {row["roll_number"]:<12}{row["name"] or "":<30}'
+                f'{row["overall_late_rate"]:>6}% -> {row["recent_late_rate"]}%'
+            )
+
+    def benchmark(self, rows, options):
+        started = time.perf_counter()
+        arrays = analytics.synthetic_arrays(rows)
+        self.stdout.write(f'Generated {rows:,} synthetic sessions in {time.perf_counter() - started:.2f}s')
+
+        steps = [
+            ('student percentages', lambda: analytics.student_percentages(arrays)),
+            ('absence streaks', lambda: analytics.absence_streaks(arrays)),
+            ('late trends', lambda: analytics.late_trends(arrays, options['window'])),
+            ('weekly late rate', lambda: analytics.weekly_rates(arrays)),
+            ('full report', lambda: analytics.risk_report(
+                arrays, options['threshold'], options['streak'], options['window'], options['limit']
+            )),
+        ]
+        for label, step in steps:
+            started = time.perf_counter()
+            step()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'  {label:<22}{elapsed:>8.3f}s  ({rows / elapsed:,.0f} rows/sec)')
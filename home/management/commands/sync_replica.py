@@ -0,0 +1,63 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from home.routers import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+    help = 'Refresh the reporting replica from the default database using the SQLite backup API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=1024,
+            help='Pages copied per backup step; writers can run between steps',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep refreshing the replica every --interval seconds',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60,
+            help='Seconds between refreshes with --loop',
+        )
+
+    def handle(self, *args, **options):
+        if REPLICA_ALIAS not in settings.DATABASES:
+            raise CommandError('No replica configured; set ATTENDENCEX_DB_PROFILE=replica')
+        source_path = settings.DATABASES['default']['NAME']
+        target_path = settings.DATABASES[REPLICA_ALIAS]['NAME']
+
+        while True:
+            self.sync(source_path, target_path, options['pages'])
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def sync(self, source_path, target_path, pages):
+        started = time.perf_counter()
+        copied = {}
+
+        def progress(status, remaining, total):
+            copied['total'] = total
+
+        source = sqlite3.connect(source_path)
+        # Readers on the replica may briefly hold it, so wait rather than fail
+        target = sqlite3.connect(target_path, timeout=30)
+        try:
+            source.backup(target, pages=pages, progress=progress, sleep=0.005)
+        finally:
+            target.close()
+            source.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Replica refreshed: {copied.get("total", 0):,} pages copied to {target_path} in {elapsed:.2f}s'
+        ))
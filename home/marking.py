@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .ledger import update_ledgers
+from .models import Attendance, Subject
+from .records import check_writable
+from .rollups import refresh_rollups
+from .summaries import apply_deltas, new_deltas, record_change
+
+
+# ------------------------
+# BULK MARKING ENGINE
+# ------------------------
+
+STATUS_VALUES = {value for value, _ in Attendance.STATUS_CHOICES}
+
+
+def upsert_attendance(records):
+    """Insert or update unsaved Attendance instances in one transaction.
+
+    Rows are matched on the (student, subject, date) unique key and written
+    with a single batched INSERT ... ON CONFLICT DO UPDATE. The matching
+    AttendanceSummary counters, DailyRollup rows and attendance ledgers are
+    brought up to date in the same transaction.
+    Returns a ``(created, updated)`` tuple. Raises ArchivedTermError when a
+    record is dated in an archived term.
+    """
+    # Last record wins when the same key appears twice in one batch
+    by_key = {}
+    for record in records:
+        by_key[(record.student_id, record.subject_id, record.date)] = record
+    if not by_key:
+        return 0, 0
+
+    student_ids = {key[0] for key in by_key}
+    subject_ids = {key[1] for key in by_key}
+    dates = {key[2] for key in by_key}
+    check_writable(dates)
+
+    with transaction.atomic():
+        existing = Attendance.objects.filter(
+            student_id__in=student_ids,
+            subject_id__in=subject_ids,
+            date__in=dates,
+        ).values_list('student_id', 'subject_id', 'date', 'status')
+        previous = {row[:3]: row[3] for row in existing if row[:3] in by_key}
+
+        Attendance.objects.bulk_create(
+            by_key.values(),
+            update_conflicts=True,
+            unique_fields=['student', 'subject', 'date'],
+            update_fields=['status', 'marked_by', 'updated_at'],
+        )
+
+        deltas = new_deltas()
+        for key, record in by_key.items():
+            record_change(deltas, record.student_id, record.subject_id, previous.get(key), record.status)
+        apply_deltas(deltas)
+        refresh_rollups((subject_id, on_date) for _, subject_id, on_date in by_key)
+        update_ledgers((*key, record.status) for key, record in by_key.items())
+        touch_subjects(subject_ids)
+
+    return len(by_key) - len(previous), len(previous)
+
+
+def touch_subjects(subject_ids):
+    """Move Subject.updated_at, the version teacher dashboards are cached on."""
+    Subject.objects.filter(pk__in=subject_ids).update(updated_at=timezone.now())
+
+
+def session_records(teacher, subject, on_date, statuses, roster):
+    """Build Attendance rows for one class session.
+
+    ``statuses`` maps roll numbers to a status; roll numbers missing from
+    ``roster`` are ignored.
+    """
+    return [
+        Attendance(
+            student_id=roll_number,
+            subject=subject,
+            date=on_date,
+            status=status,
+            marked_by=teacher,
+        )
+        for roll_number, status in statuses.items()
+        if roll_number in roster
+    ]
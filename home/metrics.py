@@ -0,0 +1,136 @@
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from time import perf_counter
+
+
+# ------------------------
+# REQUEST METRICS
+# ------------------------
+# Per-process histograms of request timings, filled in by
+# home.middleware.PerformanceMiddleware and exposed in Prometheus text
+# format by the /metrics view.
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Number of recent requests per route used for the rolling quantiles
+ROLLING_WINDOW = 1000
+
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """Timings collected while one request is being handled."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def query_wrapper(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += perf_counter() - start
+            self.queries += 1
+
+
+def record_template_time(seconds):
+    timings = current_timings.get()
+    if timings is not None:
+        timings.template_seconds += seconds
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.duration = Histogram(SECONDS_BUCKETS)
+        self.db = Histogram(SECONDS_BUCKETS)
+        self.template = Histogram(SECONDS_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.recent = deque(maxlen=ROLLING_WINDOW)
+
+
+_lock = threading.Lock()
+_routes = {}
+
+
+def observe(route, total_seconds, timings):
+    with _lock:
+        metrics = _routes.get(route)
+        if metrics is None:
+            metrics = _routes[route] = RouteMetrics()
+        metrics.duration.observe(total_seconds)
+        metrics.db.observe(timings.db_seconds)
+        metrics.template.observe(timings.template_seconds)
+        metrics.queries.observe(timings.queries)
+        metrics.recent.append(total_seconds)
+
+
+def reset():
+    with _lock:
+        _routes.clear()
+
+
+def _quantile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _histogram_lines(name, route, histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_sum{{route="{route}"}} {histogram.sum:.6f}')
+    lines.append(f'{name}_count{{route="{route}"}} {histogram.count}')
+    return lines
+
+
+def render_prometheus(extra_counters=None):
+    """Render every route's metrics in the Prometheus text exposition format."""
+    families = [
+        ('attendancex_request_duration_seconds', 'histogram', 'Total request time', 'duration'),
+        ('attendancex_db_duration_seconds', 'histogram', 'Time spent in SQL per request', 'db'),
+        ('attendancex_template_duration_seconds', 'histogram', 'Template render time per request', 'template'),
+        ('attendancex_db_queries', 'histogram', 'SQL queries per request', 'queries'),
+    ]
+    with _lock:
+        routes = sorted(_routes.items())
+        lines = []
+        for name, kind, help_text, attr in families:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for route, metrics in routes:
+                lines.extend(_histogram_lines(name, route, getattr(metrics, attr)))
+
+        name = 'attendancex_request_duration_rolling_seconds'
+        lines.append(f'# HELP {name} Request time quantiles over the last {ROLLING_WINDOW} requests')
+        lines.append(f'# TYPE {name} summary')
+        for route, metrics in routes:
+            ordered = sorted(metrics.recent)
+            if not ordered:
+                continue
+            for fraction in (0.5, 0.95, 0.99):
+                lines.append(f'{name}{{route="{route}",quantile="{fraction}"}} {_quantile(ordered, fraction):.6f}')
+
+    for name, help_text, value in extra_counters or ():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
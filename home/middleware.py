@@ -0,0 +1,79 @@
+from contextlib import ExitStack
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connections
+
+from .metrics import RequestTimings, current_timings, observe
+
+
+# ------------------------
+# PERFORMANCE INSTRUMENTATION
+# ------------------------
+
+class PerformanceMiddleware:
+    """Time every request and report it in a Server-Timing header.
+
+    SQL is measured with connection.execute_wrapper and template rendering
+    by home.templating.TimedDjangoTemplates. Results are also aggregated
+    per route for the /metrics endpoint. Keep this first in MIDDLEWARE so
+    the total covers the whole middleware stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = perf_counter()
+        try:
+            with self.wrap_connections(timings):
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, start)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = perf_counter()
+        try:
+            # Connections are thread-local, so the wrappers are installed from
+            # the thread the request's ORM calls run in
+            stack = await sync_to_async(self.wrap_connections)(timings)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, start)
+
+    def wrap_connections(self, timings):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(timings.query_wrapper))
+        return stack
+
+    def finish(self, request, response, timings, start):
+        total = perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        route = (match.view_name or match.route) if match else 'unresolved'
+        observe(route, total, timings)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.queries} queries"',
+            f'tpl;dur={timings.template_seconds * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+        return response
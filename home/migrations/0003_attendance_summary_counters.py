@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:58
+
+from django.db import migrations, models
+
+from home.stats import attendance_breakdown
+
+BATCH_SIZE = 2000
+
+
+def build_summaries(apps, schema_editor):
+    """Count the existing attendance into the new summary counters.
+
+    The dashboards read only the summaries from here on, so they must not
+    start out empty; this is the aggregation rebuild_summaries runs.
+    """
+    Attendance = apps.get_model('home', 'Attendance')
+    AttendanceSummary = apps.get_model('home', 'AttendanceSummary')
+    AttendanceSummary.objects.all().delete()
+    rows = attendance_breakdown(Attendance.objects.all(), 'student_id', 'subject_id')
+    batch = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(AttendanceSummary(**row))
+        if len(batch) >= BATCH_SIZE:
+            AttendanceSummary.objects.bulk_create(batch)
+            batch = []
+    AttendanceSummary.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_remove_attendance_teacher'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='attendancesummary',
+            unique_together={('student', 'subject')},
+        ),
+        migrations.AddField(
+            model_name='attendancesummary',
+            name='absent_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='attendancesummary',
+            name='excused_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='attendancesummary',
+            name='late_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='attendancesummary',
+            name='present_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RemoveField(
+            model_name='attendancesummary',
+            name='attended_classes',
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
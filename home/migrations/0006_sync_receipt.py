@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0005_attendance_history_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('date', models.DateField()),
+                ('created_count', models.IntegerField(default=0)),
+                ('updated_count', models.IntegerField(default=0)),
+                ('applied_at', models.DateTimeField(auto_now_add=True)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='home.subject')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_receipts', to='home.teacher')),
+            ],
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+from home.stats import attendance_breakdown
+
+BATCH_SIZE = 2000
+
+
+def build_rollups(apps, schema_editor):
+    """Roll up the existing attendance and start the refresh watermark at now.
+
+    Without this the trends stay empty until ``refresh_rollups --full``.
+    """
+    Attendance = apps.get_model('home', 'Attendance')
+    DailyRollup = apps.get_model('home', 'DailyRollup')
+    Watermark = apps.get_model('home', 'Watermark')
+    now = timezone.now()
+    rows = attendance_breakdown(Attendance.objects.all(), 'subject_id', 'date')
+    batch = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(DailyRollup(**row))
+        if len(batch) >= BATCH_SIZE:
+            DailyRollup.objects.bulk_create(batch)
+            batch = []
+    DailyRollup.objects.bulk_create(batch)
+    # Same name as home.rollups.WATERMARK
+    Watermark.objects.create(name='rollups', value=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0006_sync_receipt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_classes', models.IntegerField(default=0)),
+                ('present_count', models.IntegerField(default=0)),
+                ('absent_count', models.IntegerField(default=0)),
+                ('late_count', models.IntegerField(default=0)),
+                ('excused_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Watermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['subject', 'date'], name='attendance_subject_date'),
+        ),
+        migrations.AddField(
+            model_name='dailyrollup',
+            name='subject',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='home.subject'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyrollup',
+            unique_together={('subject', 'date')},
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
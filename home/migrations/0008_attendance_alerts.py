@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0007_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancesummary',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='LowAttendanceAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold', models.FloatField()),
+                ('percentage', models.FloatField()),
+                ('total_classes', models.IntegerField()),
+                ('present_count', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_alerts', to='home.student')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_alerts', to='home.subject')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('resolved_at__isnull', True)), fields=('student', 'subject', 'threshold'), name='one_open_alert_per_threshold')],
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:47
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Min
+
+BATCH_SIZE = 5000
+
+
+def enroll_from_teacher_subjects(apps, schema_editor):
+    """Turn the implicit "Option B" rosters into enrollments in a first term.
+
+    Every student was treated as enrolled in every subject of their teacher;
+    those pairs become Enrollment rows, so existing rosters do not change.
+    """
+    Term = apps.get_model('home', 'Term')
+    Enrollment = apps.get_model('home', 'Enrollment')
+    Student = apps.get_model('home', 'Student')
+    TeacherSubject = apps.get_model('home', 'Teacher').subjects.through
+
+    first_date = apps.get_model('home', 'Attendance').objects.aggregate(first=Min('date'))['first']
+    term = Term.objects.create(name='Initial', start_date=first_date or datetime.date.today())
+
+    subjects = {}
+    for teacher_id, subject_id in TeacherSubject.objects.values_list('teacher_id', 'subject_id'):
+        subjects.setdefault(teacher_id, []).append(subject_id)
+    batch = []
+    students = Student.objects.filter(teacher_id__in=subjects).values_list('roll_number', 'teacher_id')
+    for roll_number, teacher_id in students.iterator(chunk_size=BATCH_SIZE):
+        batch.extend(
+            Enrollment(student_id=roll_number, subject_id=subject_id, term=term)
+            for subject_id in subjects[teacher_id]
+        )
+        if len(batch) >= BATCH_SIZE:
+            Enrollment.objects.bulk_create(batch)
+            batch = []
+    Enrollment.objects.bulk_create(batch)
+
+
+def remove_terms(apps, schema_editor):
+    apps.get_model('home', 'Term').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0009_subject_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Term',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-start_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Enrollment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='home.student')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='home.subject')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='home.term')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'term', 'subject'], name='enrollment_student_term')],
+                'unique_together': {('subject', 'term', 'student')},
+            },
+        ),
+        migrations.RunPython(enroll_from_teacher_subjects, remove_terms),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0010_enrollment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='term',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedAttendance',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('One', 'Single Session'), ('Two', 'Double Session')], default='One', max_length=3)),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('Present', 'Present'), ('Absent', 'Absent'), ('Late', 'Late'), ('Excused', 'Excused')], max_length=10)),
+                ('updated_at', models.DateTimeField()),
+                ('marked_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_attendance', to='home.teacher')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance', to='home.student')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance', to='home.subject')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance', to='home.term')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['student', '-date', '-id'], name='archived_student_date_id'), models.Index(fields=['subject', 'date'], name='archived_subject_date')],
+            },
+        ),
+    ]
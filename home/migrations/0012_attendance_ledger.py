@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from home.ledger import BITS, STATUS_CODES, pack
+
+BATCH_SIZE = 500
+
+
+def build_ledgers(apps, schema_editor):
+    """Pack the existing hot and archived attendance into ledgers.
+
+    The same packing as home.ledger.build_ledgers, against the models as
+    they are at this migration. Dates outside every term are not kept.
+    """
+    Term = apps.get_model('home', 'Term')
+    AttendanceLedger = apps.get_model('home', 'AttendanceLedger')
+    # Latest-starting first, so the first match is the one term_for picks
+    terms = list(Term.objects.order_by('-start_date').values_list('pk', 'start_date', 'end_date'))
+    values = {}
+    for model in ('Attendance', 'ArchivedAttendance'):
+        rows = apps.get_model('home', model).objects.values_list('student_id', 'subject_id', 'date', 'status')
+        for student_id, subject_id, on_date, status in rows.iterator(chunk_size=2000):
+            term = next(
+                (term for term in terms if term[1] <= on_date and (term[2] is None or on_date <= term[2])), None
+            )
+            if term is None:
+                continue
+            key = (student_id, subject_id, term[0], term[1])
+            values[key] = values.get(key, 0) | STATUS_CODES[status] << (on_date - term[1]).days * BITS
+    AttendanceLedger.objects.bulk_create(
+        [
+            AttendanceLedger(
+                student_id=student_id, subject_id=subject_id, term_id=term_id,
+                start_date=start_date, statuses=pack(value),
+            )
+            for (student_id, subject_id, term_id, start_date), value in values.items()
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0011_archived_attendance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('statuses', models.BinaryField(default=bytes)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_ledgers', to='home.student')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_ledgers', to='home.subject')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_ledgers', to='home.term')),
+            ],
+            options={
+                'unique_together': {('student', 'subject', 'term')},
+            },
+        ),
+        migrations.RunPython(build_ledgers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0012_attendance_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='roster_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
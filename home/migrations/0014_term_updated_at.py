@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0013_subject_roster_changed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='term',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # ------------------------
 # USER PROFILE EXTENSIONS
@@ -7,6 +8,10 @@ from django.contrib.auth.models import User
 class Subject(models.Model):
     name = models.CharField(max_length=100)
     code = models.CharField(max_length=20, unique=True)
+    # Also moved by every attendance write in the subject; dashboards use it as a version
+    updated_at = models.DateTimeField(auto_now=True)
+    # Moved only when the roster changes; the version rosters are cached on
+    roster_changed_at = models.DateTimeField(default=timezone.now)
     
     def __str__(self):
         return f"{self.name} ({self.code})"
@@ -18,6 +23,8 @@ class Teacher(models.Model):
     employee_id = models.AutoField(primary_key=True)
     department = models.CharField(max_length=100, blank=True, null=True)
     subjects = models.ManyToManyField(Subject, related_name="teachers", blank=True)
+    # Part of the teacher dashboard version (see home.conditional)
+    updated_at = models.DateTimeField(auto_now=True)
 
 
     def __str__(self):
@@ -36,6 +43,46 @@ class Student(models.Model):
         return f"{self.name} ({self.roll_number})"
 
 
+# ------------------------
+# TERMS & ENROLLMENT
+# ------------------------
+
+class Term(models.Model):
+    """An academic term; rosters are the enrollments of the current one (see home.enrollment)"""
+    name = models.CharField(max_length=50, unique=True)
+    start_date = models.DateField()
+    # Open-ended until the next term is planned
+    end_date = models.DateField(null=True, blank=True)
+    # Set once the term's attendance has moved to ArchivedAttendance
+    archived_at = models.DateTimeField(null=True, blank=True)
+    # Part of the generation the term calendar is cached on (see home.terms)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-start_date']
+
+    def __str__(self):
+        return self.name
+
+
+class Enrollment(models.Model):
+    """A student taking a subject in a term"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="enrollments")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="enrollments")
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name="enrollments")
+
+    class Meta:
+        # The unique index also serves subject -> students roster lookups
+        unique_together = ('subject', 'term', 'student')
+        indexes = [
+            # A student's subjects in a term
+            models.Index(fields=['student', 'term', 'subject'], name='enrollment_student_term'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.subject} ({self.term})"
+
+
 # ------------------------
 # SUBJECT & ATTENDANCE
 # ------------------------
@@ -60,31 +107,179 @@ class Attendance(models.Model):
     date = models.DateField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Present')
     marked_by = models.ForeignKey(Teacher, on_delete=models.SET_NULL, null=True, blank=True, related_name="marked_attendance")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ('student', 'subject', 'date')
         ordering = ['-date']
+        indexes = [
+            # Teacher dashboard: records a teacher marked per subject, newest first
+            models.Index(fields=['subject', 'marked_by', '-date'], name='attendance_subj_marker_date'),
+            # Student history: keyset pages on (date, id), newest first
+            models.Index(fields=['student', '-date', '-id'], name='attendance_student_date_id'),
+            # Daily rollups: one subject's rows for a set of dates
+            models.Index(fields=['subject', 'date'], name='attendance_subject_date'),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.subject} - {self.date} ({self.status})"
 
+    def save(self, *args, **kwargs):
+        # Summary counters are updated from signals; keep them in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class ArchivedAttendance(models.Model):
+    """Attendance of a closed term, moved out of the hot table by archive_term (see home.archive).
+
+    Rows keep the id they had in Attendance, so history cursors stay valid.
+    Summary counters and daily rollups still include them.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name="archived_attendance")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="archived_attendance")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="archived_attendance")
+    type = models.CharField(max_length=3, choices=Attendance.ATTENDENCE_TYPE_CHOICES, default='One')
+    date = models.DateField()
+    status = models.CharField(max_length=10, choices=Attendance.STATUS_CHOICES)
+    marked_by = models.ForeignKey(Teacher, on_delete=models.SET_NULL, null=True, blank=True, related_name="archived_attendance")
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-date']
+        indexes = [
+            # Student history: keyset pages on (date, id), newest first
+            models.Index(fields=['student', '-date', '-id'], name='archived_student_date_id'),
+            # Daily rollups of archived dates
+            models.Index(fields=['subject', 'date'], name='archived_subject_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.subject} - {self.date} ({self.status}, archived)"
+
 
 # ------------------------
 # OPTIONAL: AGGREGATE VIEW
 # ------------------------
 
 class AttendanceSummary(models.Model):
-    """Optional: store summarized attendance data for performance"""
+    """Per-student, per-subject status counters, kept in sync on every attendance write"""
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
     total_classes = models.IntegerField(default=0)
-    attended_classes = models.IntegerField(default=0)
+    present_count = models.IntegerField(default=0)
+    absent_count = models.IntegerField(default=0)
+    late_count = models.IntegerField(default=0)
+    excused_count = models.IntegerField(default=0)
+    # Set on every counter change, so incremental jobs can find what moved
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        unique_together = ('student', 'subject')
 
     @property
     def attendance_percentage(self):
         if self.total_classes == 0:
             return 0
-        return round((self.attended_classes / self.total_classes) * 100, 2)
+        return round((self.present_count / self.total_classes) * 100, 2)
 
     def __str__(self):
         return f"{self.student} - {self.subject}: {self.attendance_percentage}%"
+
+
+# ------------------------
+# ANALYTICS ROLLUPS
+# ------------------------
+
+class DailyRollup(models.Model):
+    """Status counters per subject per day, recomputed from Attendance (see home.rollups)"""
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="daily_rollups")
+    date = models.DateField()
+    total_classes = models.IntegerField(default=0)
+    present_count = models.IntegerField(default=0)
+    absent_count = models.IntegerField(default=0)
+    late_count = models.IntegerField(default=0)
+    excused_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('subject', 'date')
+
+    def __str__(self):
+        return f"{self.subject} - {self.date}: {self.present_count}/{self.total_classes}"
+
+
+class AttendanceLedger(models.Model):
+    """A student's statuses in a subject over one term, packed 3 bits per day (see home.ledger)"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="attendance_ledgers")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="attendance_ledgers")
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name="attendance_ledgers")
+    # Day 0 of the packed statuses; the term's first day
+    start_date = models.DateField()
+    statuses = models.BinaryField(default=bytes)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'subject', 'term')
+
+    def __str__(self):
+        return f"{self.student} - {self.subject} ({self.term})"
+
+
+class Watermark(models.Model):
+    """How far an incremental background job has processed, by job name"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
+# ------------------------
+# LOW ATTENDANCE ALERTS
+# ------------------------
+
+class LowAttendanceAlert(models.Model):
+    """A student's attendance in a subject fell below a threshold.
+
+    At most one alert per (student, subject, threshold) is open at a time. It
+    is resolved when the percentage recovers, and a later drop opens a new one.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="attendance_alerts")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="attendance_alerts")
+    threshold = models.FloatField()
+    percentage = models.FloatField()
+    total_classes = models.IntegerField()
+    present_count = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'subject', 'threshold'],
+                condition=models.Q(resolved_at__isnull=True),
+                name='one_open_alert_per_threshold',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.subject}: {self.percentage}% < {self.threshold}%"
+
+
+# ------------------------
+# OFFLINE SYNC
+# ------------------------
+
+class SyncReceipt(models.Model):
+    """An applied offline session, so a retried submission is not written twice"""
+    key = models.CharField(max_length=64, unique=True)
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name="sync_receipts")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
+    date = models.DateField()
+    created_count = models.IntegerField(default=0)
+    updated_count = models.IntegerField(default=0)
+    applied_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.key} - {self.subject} - {self.date}"
@@ -0,0 +1,79 @@
+import heapq
+from itertools import groupby
+from operator import itemgetter
+
+from .models import ArchivedAttendance, Attendance, Term
+from .stats import attendance_breakdown
+from .summaries import COUNTER_FIELDS
+from .terms import archive_horizon
+
+
+# ------------------------
+# HOT AND ARCHIVED ATTENDANCE
+# ------------------------
+# Attendance holds the rows of open terms and ArchivedAttendance those of
+# archived ones (see home.archive); both have the same fields. Readers that
+# need a student's whole record query each table the same way and merge
+# the sorted results here. The archive is skipped whenever the rows asked
+# for are all dated after the last archived term.
+
+SOURCES = (Attendance, ArchivedAttendance)
+
+
+class ArchivedTermError(ValueError):
+    pass
+
+
+def reaches_archive(oldest=None):
+    """Whether archived rows can be dated on or after ``oldest``; None means any date."""
+    horizon = archive_horizon()
+    return horizon is not None and (oldest is None or oldest <= horizon)
+
+
+def sources(oldest=None):
+    """The record models holding rows dated on or after ``oldest``."""
+    return SOURCES if reaches_archive(oldest) else SOURCES[:1]
+
+
+def merge_sorted(streams, key, reverse=False):
+    """Merge iterables that are each sorted on ``key`` into one sorted iterator."""
+    return heapq.merge(*streams, key=key, reverse=reverse)
+
+
+def combined_breakdown(group_by, oldest=None, chunk_size=2000, **filters):
+    """attendance_breakdown of both tables, summed per group and ordered on ``group_by``.
+
+    ``filters`` apply to either table; pass ``oldest`` when they only match
+    rows from that date on, so the archive can be skipped.
+    """
+    key = itemgetter(*group_by)
+    streams = [
+        attendance_breakdown(model.objects.filter(**filters), *group_by)
+        .order_by(*group_by)
+        .iterator(chunk_size=chunk_size)
+        for model in sources(oldest)
+    ]
+    for _, rows in groupby(merge_sorted(streams, key), key):
+        row, *others = rows
+        for other in others:
+            for field in COUNTER_FIELDS:
+                row[field] += other[field]
+        yield row
+
+
+def check_writable(dates):
+    """Refuse attendance dated in an archived term; those rows are read-only.
+
+    The archived terms are read from the database rather than the cached
+    calendar, so a term archived by another process is refused at once.
+    """
+    to_date = Attendance._meta.get_field('date').to_python
+    dates = set(map(to_date, set(dates)))
+    if not dates:
+        return
+    spans = Term.objects.filter(
+        archived_at__isnull=False, start_date__lte=max(dates), end_date__gte=min(dates),
+    ).values_list('start_date', 'end_date')
+    archived = sorted(on_date for on_date in dates if any(start <= on_date <= end for start, end in spans))
+    if archived:
+        raise ArchivedTermError(f'Attendance on {archived[0]} belongs to an archived term')
@@ -0,0 +1,170 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import auth, messages
+from django.contrib.auth.models import User
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from .models import Student, Teacher
+
+
+# ------------------------
+# REQUEST ROLES AND PROFILES
+# ------------------------
+# Whether the logged-in user is a teacher or a student is resolved with one
+# query and remembered in the session as (user id, role, profile pk). After
+# that a view loads its profile by primary key with the user joined in, and
+# that user doubles as request.user, so the separate user lookup of the
+# auth middleware is skipped too.
+
+SESSION_KEY = '_attendencex_role'
+
+PROFILE_MODELS = {'teacher': Teacher, 'student': Student}
+
+
+def _session_user_id(request):
+    return request.session.get(auth.SESSION_KEY)
+
+
+def resolve_role(user_id):
+    """``(role, profile pk)`` for a user id, or ``(None, None)`` when it has no profile."""
+    row = User.objects.filter(pk=user_id).values_list('teacher__pk', 'student__pk').first()
+    for role, pk in zip(PROFILE_MODELS, row or ()):
+        if pk is not None:
+            return role, pk
+    return None, None
+
+
+def get_role(request):
+    """The request's ``(role, profile pk)``, read from the session when already known."""
+    user_id = _session_user_id(request)
+    if user_id is None:
+        return None, None
+    cached = request.session.get(SESSION_KEY)
+    if cached and cached[0] == user_id:
+        return cached[1], cached[2]
+    role, pk = resolve_role(user_id)
+    # Users without a profile are looked up again, in case one is added
+    if role is not None:
+        request.session[SESSION_KEY] = [user_id, role, pk]
+    return role, pk
+
+
+def forget_role(request):
+    request.session.pop(SESSION_KEY, None)
+
+
+def _adopt_user(request, user):
+    """Use the profile's joined user as request.user when it is the session's user.
+
+    Mirrors the checks of django.contrib.auth.get_user; when any of them is
+    in doubt request.user is loaded the usual way and compared instead.
+    """
+    if hasattr(request, '_cached_user'):
+        return request._cached_user.pk == user.pk
+    session = request.session
+    if (
+        str(user.pk) == _session_user_id(request)
+        and user.is_active
+        and session.get(auth.BACKEND_SESSION_KEY) in settings.AUTHENTICATION_BACKENDS
+        and constant_time_compare(session.get(auth.HASH_SESSION_KEY, ''), user.get_session_auth_hash())
+    ):
+        request._cached_user = user
+        return True
+    return request.user.pk == user.pk
+
+
+def get_profile(request, role, queryset=None):
+    """The request's Teacher or Student when the user has ``role``, else None.
+
+    ``queryset`` may adapt the profile query, e.g. to add annotations. The
+    result is kept on the request, so later calls cost nothing.
+    """
+    profiles = request.__dict__.setdefault('_profiles', {})
+    if role in profiles:
+        return profiles[role]
+    profile = None
+    current_role, pk = get_role(request)
+    if current_role == role:
+        profiles_qs = PROFILE_MODELS[role].objects.select_related('user')
+        if queryset is not None:
+            profiles_qs = queryset(profiles_qs)
+        profile = profiles_qs.filter(pk=pk).first()
+        if profile is None:
+            # The profile was deleted since the role was cached
+            forget_role(request)
+        elif not _adopt_user(request, profile.user):
+            profile = None
+    profiles[role] = profile
+    return profile
+
+
+class RoleMiddleware:
+    """Attach lazy ``request.teacher`` and ``request.student`` profiles.
+
+    Each is the profile when the user has that role and a falsy None
+    otherwise; neither runs a query until it is used.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        self.attach(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.attach(request)
+        return await self.get_response(request)
+
+    def attach(self, request):
+        for role in PROFILE_MODELS:
+            setattr(request, role, SimpleLazyObject(lambda role=role: get_profile(request, role)))
+
+
+def denied(request, role, api):
+    authenticated = _session_user_id(request) is not None and request.user.is_authenticated
+    if api:
+        if not authenticated:
+            return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=401)
+        return JsonResponse({'success': False, 'error': f'{role.title()} profile not found'}, status=403)
+    if authenticated:
+        messages.error(request, f'Access denied. {role.title()} profile not found.')
+    return redirect('login')
+
+
+def role_required(role, api=False, queryset=None):
+    """Only let users with ``role`` through, passing their profile as a keyword argument.
+
+    Others are redirected to the login page, or get a 401/403 JSON error
+    when ``api`` is true.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                profile = await sync_to_async(get_profile)(request, role, queryset)
+                if profile is None:
+                    return await sync_to_async(denied)(request, role, api)
+                return await view(request, *args, **{role: profile}, **kwargs)
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                profile = get_profile(request, role, queryset)
+                if profile is None:
+                    return denied(request, role, api)
+                return view(request, *args, **{role: profile}, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,109 @@
+from collections import defaultdict
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import ArchivedAttendance, Attendance, DailyRollup
+from .records import combined_breakdown
+from .stats import percentage
+from .summaries import COUNTER_FIELDS
+from .watermarks import advance_watermark
+
+
+# ------------------------
+# DAILY ROLLUPS
+# ------------------------
+# DailyRollup holds one row of status counters per (subject, date). Rows
+# are recomputed from Attendance, never incremented. A (subject, date) pair
+# can therefore be refreshed any number of times, from the save path or by
+# the refresh_rollups command, and always converges on the same counts.
+# Dates in archived terms are counted from ArchivedAttendance as well.
+
+WATERMARK = 'rollups'
+
+# Pairs recomputed per aggregate query
+REFRESH_BATCH_SIZE = 200
+
+PERIODS = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def refresh_rollups(pairs):
+    """Recompute the rollups for an iterable of ``(subject_id, date)`` pairs."""
+    to_date = Attendance._meta.get_field('date').to_python
+    pairs = sorted({(subject_id, to_date(on_date)) for subject_id, on_date in pairs})
+    for start in range(0, len(pairs), REFRESH_BATCH_SIZE):
+        _refresh_batch(pairs[start:start + REFRESH_BATCH_SIZE])
+    return len(pairs)
+
+
+def _refresh_batch(pairs):
+    wanted = set(pairs)
+    dates = {on_date for _, on_date in pairs}
+    rows = combined_breakdown(
+        ('subject_id', 'date'),
+        oldest=min(dates),
+        subject_id__in={subject_id for subject_id, _ in pairs},
+        date__in=dates,
+    )
+    rollups = [
+        DailyRollup(**row) for row in rows if (row['subject_id'], row['date']) in wanted
+    ]
+    # No savepoint: inside upsert_attendance a failure rolls back the whole write anyway
+    with transaction.atomic(savepoint=False):
+        DailyRollup.objects.bulk_create(
+            rollups,
+            update_conflicts=True,
+            unique_fields=['subject', 'date'],
+            update_fields=list(COUNTER_FIELDS),
+        )
+        # Pairs whose attendance is all gone no longer get a rollup row
+        emptied = wanted - {(rollup.subject_id, rollup.date) for rollup in rollups}
+        by_subject = defaultdict(list)
+        for subject_id, on_date in emptied:
+            by_subject[subject_id].append(on_date)
+        for subject_id, dates in by_subject.items():
+            DailyRollup.objects.filter(subject_id=subject_id, date__in=dates).delete()
+
+
+def refresh_since_watermark(full=False):
+    """Refresh every pair with attendance written since the stored watermark.
+
+    Returns the number of pairs refreshed. With ``full`` every rollup is
+    rebuilt from scratch.
+    """
+    with advance_watermark(WATERMARK) as (since, now):
+        if full or since is None:
+            DailyRollup.objects.all().delete()
+            touched = [Attendance.objects.all(), ArchivedAttendance.objects.all()]
+        else:
+            # Archived rows never change
+            touched = [Attendance.objects.filter(updated_at__gt=since, updated_at__lte=now)]
+        refreshed = refresh_rollups(chain.from_iterable(
+            rows.order_by().values_list('subject_id', 'date').distinct().iterator() for rows in touched
+        ))
+    return refreshed
+
+
+def rollup_series(subjects, period='week', date_from=None, date_to=None):
+    """Attendance counters per subject per day, week or month, oldest first."""
+    rows = DailyRollup.objects.filter(subject__in=subjects)
+    if date_from:
+        rows = rows.filter(date__gte=date_from)
+    if date_to:
+        rows = rows.filter(date__lte=date_to)
+    trunc = PERIODS[period]
+    rows = rows.annotate(period=trunc('date') if trunc else F('date'))
+    series = (
+        rows.order_by('subject__code', 'period')
+        .values('subject__code', 'period')
+        .annotate(**{field: Sum(field) for field in COUNTER_FIELDS})
+    )
+    for row in series:
+        row['attendance_percentage'] = percentage(row['present_count'], row['total_classes'])
+        yield row
@@ -0,0 +1,92 @@
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Enrollment, Student
+from .terms import current_term
+
+
+# ------------------------
+# VERSIONED ROSTER CACHE
+# ------------------------
+# Each subject's roster, the students enrolled in it this term, is cached
+# under the subject's roster version: Subject.roster_changed_at, which
+# enrollment changes and edits to an enrolled student move (see
+# home.enrollment and home.signals). The version lives in the database, so
+# every process sees a change at once; stale entries are simply never
+# read again and expire on their own.
+
+RosterEntry = namedtuple('RosterEntry', ['roll_number', 'name', 'branch', 'course', 'year'])
+
+ROSTER_FIELDS = RosterEntry._fields
+
+ROSTER_TIMEOUT = 60 * 60 * 24 * 7
+
+_stats = {'hits': 0, 'misses': 0}
+
+
+def roster_version(subject):
+    """The subject's roster version, in microseconds since the epoch."""
+    changed = subject.roster_changed_at
+    return int(changed.timestamp()) * 1_000_000 + changed.microsecond
+
+
+def roster_tags(subjects, term=None):
+    """Opaque tags per subject id that change with the roster or the current term."""
+    term = term or current_term()
+    term_id = term.pk if term else 0
+    return {subject.pk: f'{term_id}.{roster_version(subject)}' for subject in subjects}
+
+
+def get_roster(subject, term=None):
+    """Return the students enrolled in the subject as a list of RosterEntry tuples."""
+    term = term or current_term()
+    if term is None:
+        return []
+    key = f'roster:{subject.pk}:{term.pk}:{roster_version(subject)}'
+    rows = cache.get(key)
+    if rows is None:
+        _stats['misses'] += 1
+        rows = list(
+            Student.objects.filter(enrollments__subject=subject, enrollments__term=term)
+            .order_by('roll_number')
+            .values_list(*ROSTER_FIELDS)
+        )
+        cache.set(key, rows, ROSTER_TIMEOUT)
+    else:
+        _stats['hits'] += 1
+    return [RosterEntry(*row) for row in rows]
+
+
+def roster_sizes(subjects, term=None):
+    """Enrolled student count per subject id, without loading the rosters."""
+    term = term or current_term()
+    if term is None:
+        return {subject.pk: 0 for subject in subjects}
+    keys = {
+        subject.pk: f'roster:size:{subject.pk}:{term.pk}:{roster_version(subject)}'
+        for subject in subjects
+    }
+    found = cache.get_many(keys.values())
+    missing = [subject_id for subject_id, key in keys.items() if key not in found]
+    if missing:
+        counts = dict(
+            Enrollment.objects.filter(term=term, subject_id__in=missing)
+            .values('subject_id')
+            .annotate(students=Count('id'))
+            .values_list('subject_id', 'students')
+        )
+        fresh = {keys[subject_id]: counts.get(subject_id, 0) for subject_id in missing}
+        cache.set_many(fresh, ROSTER_TIMEOUT)
+        found.update(fresh)
+    return {subject_id: found[key] for subject_id, key in keys.items()}
+
+
+def roster_cache_stats():
+    """Hit and miss counters for this process."""
+    return dict(_stats)
+
+
+def reset_roster_cache_stats():
+    _stats['hits'] = _stats['misses'] = 0
@@ -0,0 +1,106 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+
+# ------------------------
+# PRIMARY / REPLICA ROUTING
+# ------------------------
+# Reporting reads (attendance history, summaries and other aggregates) go
+# to the ``replica`` alias when it is configured; every write goes to
+# ``default``. A request that has just written, or that comes from a user
+# who wrote within REPLICA_STICKY_SECONDS, is pinned to ``default`` so it
+# always reads its own writes.
+
+REPLICA_ALIAS = 'replica'
+REPORTING_MODELS = {'attendance', 'attendancesummary', 'dailyrollup'}
+STICKY_COOKIE = 'pin_primary_until'
+UNSAFE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+_pinned = ContextVar('replica_pinned', default=False)
+
+
+def replica_enabled():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def pin_to_primary():
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not replica_enabled() or model._meta.app_label != 'home':
+            return None
+        if model._meta.model_name not in REPORTING_MODELS:
+            return None
+        if _pinned.get() or connections['default'].in_atomic_block:
+            return 'default'
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of default, so objects from either may relate
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is refreshed wholesale by the sync_replica command
+        if db == REPLICA_ALIAS:
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """Pin reads to the primary for writers and for a short while after they write."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.should_pin(request):
+            return self.get_response(request)
+        with pin_to_primary():
+            response = self.get_response(request)
+        return self.remember_write(request, response)
+
+    async def __acall__(self, request):
+        if not self.should_pin(request):
+            return await self.get_response(request)
+        with pin_to_primary():
+            response = await self.get_response(request)
+        return self.remember_write(request, response)
+
+    def should_pin(self, request):
+        if not replica_enabled():
+            return False
+        if request.method in UNSAFE_METHODS:
+            return True
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def remember_write(self, request, response):
+        if request.method in UNSAFE_METHODS:
+            sticky = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(STICKY_COOKIE, str(time.time() + sticky), max_age=sticky, httponly=True, samesite='Lax')
+        return response
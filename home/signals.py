@@ -0,0 +1,128 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .enrollment import enrollment_changed
+from .ledger import update_ledgers
+from .marking import touch_subjects
+from .models import Attendance, Enrollment, Student, Term
+from .records import check_writable
+from .rollups import refresh_rollups
+from .summaries import apply_deltas, new_deltas, record_change
+from .terms import forget_term_generation
+
+
+# ------------------------
+# ATTENDANCE SUMMARY SYNC
+# ------------------------
+# Single-row writes (model saves, admin edits and deletes) keep the
+# AttendanceSummary counters, DailyRollup rows, attendance ledgers and
+# subject versions in step here. Bulk writes bypass signals and
+# apply their own deltas (see home.marking.upsert_attendance).
+
+_suppressed = ContextVar('summary_signals_suppressed', default=False)
+
+
+@contextmanager
+def summary_signals_suppressed():
+    """Leave the counters alone for rows deleted in this block.
+
+    Used by home.archive, which moves rows to ArchivedAttendance where
+    they are still counted.
+    """
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_previous_attendance(sender, instance, raw=False, **kwargs):
+    instance._summary_previous = None
+    if raw:
+        return
+    check_writable([instance.date])
+    if instance.pk is None:
+        return
+    instance._summary_previous = (
+        Attendance.objects.filter(pk=instance.pk)
+        .values_list('student_id', 'subject_id', 'status', 'date')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Attendance)
+def update_summary_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = new_deltas()
+    previous = getattr(instance, '_summary_previous', None)
+    if previous is None:
+        record_change(deltas, instance.student_id, instance.subject_id, None, instance.status)
+    elif previous[:2] == (instance.student_id, instance.subject_id):
+        record_change(deltas, instance.student_id, instance.subject_id, previous[2], instance.status)
+    else:
+        record_change(deltas, previous[0], previous[1], previous[2], None)
+        record_change(deltas, instance.student_id, instance.subject_id, None, instance.status)
+    apply_deltas(deltas)
+
+    pairs = {(instance.subject_id, instance.date)}
+    changes = [(instance.student_id, instance.subject_id, instance.date, instance.status)]
+    if previous is not None:
+        pairs.add((previous[1], previous[3]))
+        if (previous[0], previous[1], previous[3]) != (instance.student_id, instance.subject_id, instance.date):
+            changes.insert(0, (previous[0], previous[1], previous[3], None))
+    refresh_rollups(pairs)
+    update_ledgers(changes)
+    touch_subjects({subject_id for subject_id, _ in pairs})
+
+
+@receiver(post_delete, sender=Attendance)
+def update_summary_on_delete(sender, instance, **kwargs):
+    if _suppressed.get():
+        return
+    deltas = new_deltas()
+    record_change(deltas, instance.student_id, instance.subject_id, instance.status, None)
+    apply_deltas(deltas)
+    refresh_rollups([(instance.subject_id, instance.date)])
+    update_ledgers([(instance.student_id, instance.subject_id, instance.date, None)])
+    touch_subjects([instance.subject_id])
+
+
+# ------------------------
+# ROSTER CACHE INVALIDATION
+# ------------------------
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_roster_on_enrollment(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    enrollment_changed([instance.subject_id])
+
+
+@receiver(post_save, sender=Student)
+def invalidate_roster_on_save(sender, instance, raw=False, **kwargs):
+    # Names and other roster fields changed; deletes are covered by the
+    # Enrollment rows deleted with the student
+    if raw or kwargs.get('created'):
+        return
+    enrollment_changed(Enrollment.objects.filter(student=instance).values_list('subject_id', flat=True))
+
+
+# ------------------------
+# TERM CALENDAR
+# ------------------------
+
+@receiver(request_started)
+@receiver(request_finished)
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+def reread_term_generation(sender, **kwargs):
+    # Each request reads the generation afresh, so terms changed by another
+    # process are seen by the next request here
+    forget_term_generation()
@@ -0,0 +1,77 @@
+const form = document.getElementById('loginForm');
+const usernameInput = document.getElementById('username');
+const passwordInput = document.getElementById('password');
+const togglePassword = document.getElementById('togglePassword');
+const successMessage = document.getElementById('successMessage');
+const usernameError = document.getElementById('usernameError');
+const passwordError = document.getElementById('passwordError');
+
+// Password visibility toggle
+togglePassword.addEventListener('click', function() {
+    const type = passwordInput.getAttribute('type') === 'password' ? 'text' : 'password';
+    passwordInput.setAttribute('type', type);
+    this.textContent = type === 'password' ? '👁️' : '👁️‍🗨️';
+});
+
+// Clear error on input
+usernameInput.addEventListener('input', function() {
+    usernameError.classList.remove('show');
+    usernameInput.classList.remove('error');
+});
+
+passwordInput.addEventListener('input', function() {
+    passwordError.classList.remove('show');
+    passwordInput.classList.remove('error');
+});
+
+// Form validation and submission
+form.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    // Reset errors
+    usernameError.classList.remove('show');
+    passwordError.classList.remove('show');
+    usernameInput.classList.remove('error');
+    passwordInput.classList.remove('error');
+    successMessage.classList.remove('show');
+
+    let isValid = true;
+    const username = usernameInput.value.trim();
+    const password = passwordInput.value.trim();
+
+    // Username validation
+    if (username === '') {
+        showError(usernameError, 'Username is required');
+        usernameInput.classList.add('error');
+        isValid = false;
+    } else if (username.length < 3) {
+        showError(usernameError, 'Username must be at least 3 characters');
+        usernameInput.classList.add('error');
+        isValid = false;
+    } else if (!/^[a-zA-Z0-9_.-]+$/.test(username)) {
+        showError(usernameError, 'Username can only contain letters, numbers, underscores, dots and hyphens');
+        usernameInput.classList.add('error');
+        isValid = false;
+    }
+
+    // Password validation
+    if (password === '') {
+        showError(passwordError, 'Password is required');
+        passwordInput.classList.add('error');
+        isValid = false;
+    } else if (password.length < 6) {
+        showError(passwordError, 'Password must be at least 6 characters');
+        passwordInput.classList.add('error');
+        isValid = false;
+    }
+
+    if (isValid) {
+        // Submit the form to Django
+        form.submit();
+    }
+});
+
+function showError(element, message) {
+    element.textContent = message;
+    element.classList.add('show');
+}
@@ -0,0 +1,124 @@
+// Minimal JavaScript for quick actions only
+function markAll(status) {
+    const selects = document.querySelectorAll('.status-select');
+    selects.forEach(select => {
+        select.value = status;
+    });
+}
+
+// Set today's date as default
+document.addEventListener('DOMContentLoaded', function() {
+    const dateInput = document.getElementById('attendance_date');
+    if (!dateInput.value) {
+        dateInput.valueAsDate = new Date();
+    }
+});
+
+// Offline queue: submissions are kept in localStorage under a unique key
+// and sent to the sync endpoint in batches whenever the network allows.
+// The server skips keys it has already applied, so retries are safe.
+const BATCH_SIZE = 20;
+let flushing = false;
+
+function loadQueue() {
+    try {
+        return JSON.parse(localStorage.getItem(QUEUE_KEY)) || [];
+    } catch (e) {
+        return [];
+    }
+}
+
+function saveQueue(queue) {
+    localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+}
+
+function newKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+}
+
+function showSyncStatus(message) {
+    const status = document.getElementById('syncStatus');
+    if (status) {
+        status.textContent = message;
+    }
+}
+
+function queueSubmission(form) {
+    const statuses = {};
+    form.querySelectorAll('.status-select').forEach(select => {
+        statuses[select.name.slice('status_'.length)] = select.value;
+    });
+    const queue = loadQueue();
+    queue.push({
+        key: newKey(),
+        subject_id: Number(form.elements.subject_id.value),
+        date: form.elements.date.value,
+        statuses: statuses,
+    });
+    saveQueue(queue);
+}
+
+async function flushQueue() {
+    if (flushing || !navigator.onLine) {
+        return;
+    }
+    flushing = true;
+    const form = document.getElementById('attendanceForm');
+    const messages = [];
+    try {
+        let queue = loadQueue();
+        while (queue.length) {
+            const batch = queue.slice(0, BATCH_SIZE);
+            const response = await fetch(SYNC_URL, {
+                method: 'POST',
+                credentials: 'same-origin',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': form.elements.csrfmiddlewaretoken.value,
+                },
+                body: JSON.stringify({sessions: batch}),
+            });
+            if (!response.ok) {
+                break;
+            }
+            const data = await response.json();
+            const done = new Set(data.results.map(result => result.key));
+            data.results.forEach(result => {
+                if (result.status === 'rejected') {
+                    messages.push('Rejected: ' + result.error);
+                } else {
+                    messages.push('Saved ' + (result.created + result.updated) + ' students');
+                }
+            });
+            // Re-read: another tab may have queued more in the meantime
+            queue = loadQueue().filter(session => !done.has(session.key));
+            saveQueue(queue);
+        }
+    } catch (e) {
+        // Offline or the request failed; the queue is kept for the next flush
+    } finally {
+        flushing = false;
+    }
+    const pending = loadQueue().length;
+    if (pending) {
+        messages.push(pending + ' submission' + (pending === 1 ? '' : 's') + ' waiting to sync');
+    }
+    if (messages.length) {
+        showSyncStatus(messages.join(' · '));
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('attendanceForm');
+    form.addEventListener('submit', function(event) {
+        event.preventDefault();
+        queueSubmission(form);
+        flushQueue();
+    });
+    window.addEventListener('online', flushQueue);
+    setInterval(flushQueue, 30000);
+    flushQueue();
+});
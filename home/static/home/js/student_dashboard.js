@@ -0,0 +1,101 @@
+// Sidebar toggle for mobile
+const toggleSidebar = document.getElementById('toggleSidebar');
+const sidebar = document.getElementById('sidebar');
+
+toggleSidebar.addEventListener('click', function() {
+    sidebar.classList.toggle('active');
+});
+
+// Close sidebar when a menu item is clicked
+document.querySelectorAll('.menu-link').forEach(link => {
+    link.addEventListener('click', function() {
+        document.querySelectorAll('.menu-link').forEach(l => l.classList.remove('active'));
+        this.classList.add('active');
+        sidebar.classList.remove('active');
+    });
+});
+
+// Load older history pages as the list is scrolled
+const historyContainer = document.getElementById('historyContainer');
+let historyLoading = false;
+
+function appendHistoryRow(record) {
+    const item = document.createElement('div');
+    item.className = 'history-item';
+    const day = new Date(record.date + 'T00:00:00');
+    const parts = [
+        ['history-date', day.toLocaleDateString('en-GB', { day: '2-digit', month: 'short', year: 'numeric' })],
+        ['history-time', record.subject],
+        ['status-badge status-' + record.status.toLowerCase(), record.status],
+    ];
+    parts.forEach(([className, text]) => {
+        const span = document.createElement('span');
+        span.className = className;
+        span.textContent = text;
+        item.appendChild(span);
+    });
+    historyContainer.appendChild(item);
+}
+
+function loadOlderHistory() {
+    const cursor = historyContainer.dataset.nextCursor;
+    if (!cursor || historyLoading) {
+        return;
+    }
+    historyLoading = true;
+    fetch(historyContainer.dataset.url + '?cursor=' + encodeURIComponent(cursor), { credentials: 'same-origin' })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                data.results.forEach(appendHistoryRow);
+                historyContainer.dataset.nextCursor = data.next_cursor || '';
+            }
+        })
+        .catch(error => console.error('Error:', error))
+        .finally(() => { historyLoading = false; });
+}
+
+historyContainer.addEventListener('scroll', function() {
+    if (this.scrollTop + this.clientHeight >= this.scrollHeight - 40) {
+        loadOlderHistory();
+    }
+});
+
+// Logout function
+function handleLogout() {
+    if (confirm('Are you sure you want to logout?')) {
+        // For Django integration, uncomment the code below
+        /*
+        fetch('/logout/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            }
+        })
+        .then(response => {
+            window.location.href = '/login/';
+        })
+        .catch(error => console.error('Error:', error));
+        */
+
+        // Demo redirect
+        alert('Logged out successfully!');
+        window.location.href = '/login/';
+    }
+}
+
+// Add ripple effect on click
+document.querySelectorAll('.menu-link').forEach(link => {
+    link.addEventListener('click', function(e) {
+        const ripple = document.createElement('span');
+        const rect = this.getBoundingClientRect();
+        const size = Math.max(rect.width, rect.height);
+        const x = e.clientX - rect.left - size / 2;
+        const y = e.clientY - rect.top - size / 2;
+
+        ripple.style.width = ripple.style.height = size + 'px';
+        ripple.style.left = x + 'px';
+        ripple.style.top = y + 'px';
+    });
+});
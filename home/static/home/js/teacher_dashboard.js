@@ -0,0 +1,221 @@
+// Get CSRF token
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+const csrftoken = getCookie('csrftoken');
+
+let currentClass = '';
+let attendanceData = {};
+
+// Sidebar toggle
+const toggleSidebar = document.getElementById('toggleSidebar');
+const sidebar = document.getElementById('sidebar');
+
+toggleSidebar.addEventListener('click', function() {
+    sidebar.classList.toggle('active');
+});
+
+document.querySelectorAll('.menu-link').forEach(link => {
+    link.addEventListener('click', function() {
+        document.querySelectorAll('.menu-link').forEach(l => l.classList.remove('active'));
+        this.classList.add('active');
+        sidebar.classList.remove('active');
+    });
+});
+
+// Rosters are fetched when a class is opened and kept in sessionStorage
+// until the dashboard shows a new roster version for that class.
+function loadRoster(className) {
+    const key = `roster:${className}`;
+    const card = document.querySelector(`.class-card[data-subject="${className}"]`);
+    try {
+        const cached = JSON.parse(sessionStorage.getItem(key));
+        if (cached && cached.version === card.dataset.rosterVersion) {
+            return Promise.resolve(cached.students);
+        }
+    } catch (e) {
+        // Fall through to the network
+    }
+
+    return fetch(card.dataset.rosterUrl, { credentials: 'same-origin' })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Roster request failed: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            try {
+                sessionStorage.setItem(key, JSON.stringify({ version: data.version, students: data.students }));
+            } catch (e) {
+                // Storage full or disabled; the roster is simply fetched again next time
+            }
+            return data.students;
+        });
+}
+
+// Open attendance modal
+function openAttendanceModal(className, studentCount) {
+    currentClass = className;
+    attendanceData = {};
+
+    const modal = document.getElementById('attendanceModal');
+    document.getElementById('modalClassName').textContent = className;
+
+    const now = new Date();
+    document.getElementById('attendanceDate').textContent = now.toLocaleDateString('en-IN', { day: '2-digit', month: 'short', year: 'numeric' });
+
+    document.getElementById('totalStudents').textContent = studentCount;
+    document.getElementById('presentCount').textContent = '0';
+    document.getElementById('absentCount').textContent = '0';
+
+    // Populate students list
+    const studentsList = document.getElementById('studentsList');
+    studentsList.innerHTML = '';
+
+    loadRoster(className).then(students => {
+        students.forEach(([rollNumber, name], index) => {
+            const roll = index + 1;
+            attendanceData[roll] = false;
+            // Names come from imported data, so they are only ever set as text
+            const row = document.createElement('tr');
+            const rollCell = document.createElement('td');
+            rollCell.className = 'roll-number';
+            rollCell.textContent = roll;
+            const nameCell = document.createElement('td');
+            nameCell.className = 'student-name';
+            nameCell.textContent = name;
+            const statusCell = document.createElement('td');
+            statusCell.id = `status-${roll}`;
+            statusCell.innerHTML = '<span style="color: #e53935; font-weight: 600;">Absent</span>';
+            const checkboxCell = document.createElement('td');
+            checkboxCell.style.textAlign = 'center';
+            const checkbox = document.createElement('input');
+            checkbox.type = 'checkbox';
+            checkbox.className = 'attendance-checkbox';
+            checkbox.dataset.roll = roll;
+            checkbox.dataset.student = rollNumber;
+            checkbox.addEventListener('change', () => updateAttendance(roll, checkbox.checked));
+            checkboxCell.appendChild(checkbox);
+            row.append(rollCell, nameCell, statusCell, checkboxCell);
+            studentsList.appendChild(row);
+        });
+    }).catch(error => {
+        console.error('Error:', error);
+        alert('Could not load the class roster.');
+    });
+
+    modal.classList.add('show');
+}
+
+function closeAttendanceModal() {
+    document.getElementById('attendanceModal').classList.remove('show');
+}
+
+function updateAttendance(roll, isPresent) {
+    attendanceData[roll] = isPresent;
+
+    const statusElement = document.getElementById(`status-${roll}`);
+    if (isPresent) {
+        statusElement.innerHTML = '<span style="color: #2e7d32; font-weight: 600;">Present</span>';
+    } else {
+        statusElement.innerHTML = '<span style="color: #e53935; font-weight: 600;">Absent</span>';
+    }
+
+    updateStats();
+}
+
+function updateStats() {
+    const presentCount = Object.values(attendanceData).filter(v => v === true).length;
+    const totalStudents = Object.keys(attendanceData).length;
+    const absentCount = totalStudents - presentCount;
+
+    document.getElementById('presentCount').textContent = presentCount;
+    document.getElementById('absentCount').textContent = absentCount;
+}
+
+function submitAttendance() {
+    const presentStudents = Object.entries(attendanceData)
+        .filter(([_, isPresent]) => isPresent)
+        .map(([roll, _]) => roll);
+
+    // Save attendance to database
+    fetch('/save-attendance/', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': csrftoken
+        },
+        body: JSON.stringify({
+            class: currentClass,
+            presentStudents: presentStudents,
+            date: document.getElementById('attendanceDate').textContent
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast('Attendance saved successfully! ' + data.message);
+            closeAttendanceModal();
+        } else {
+            alert('Error: ' + data.error);
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('An error occurred while saving attendance.');
+    });
+}
+
+function showToast(message) {
+    const toast = document.createElement('div');
+    toast.className = 'success-toast';
+    toast.textContent = '✓ ' + message;
+    document.body.appendChild(toast);
+
+    setTimeout(() => {
+        toast.remove();
+    }, 3000);
+}
+
+function handleLogout() {
+    if (confirm('Are you sure you want to logout?')) {
+        // For Django integration, uncomment the code below
+        /*
+        fetch('/logout/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            }
+        })
+        .then(response => {
+            window.location.href = '/login/';
+        })
+        .catch(error => console.error('Error:', error));
+        */
+
+        // Demo redirect
+        alert('Logged out successfully!');
+        window.location.href = '/login/';
+    }
+}
+
+// Close modal when clicking outside of it
+window.onclick = function(event) {
+    const modal = document.getElementById('attendanceModal');
+    if (event.target == modal) {
+        modal.classList.remove('show');
+    }
+}
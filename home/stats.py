@@ -0,0 +1,93 @@
+from django.db.models import Count, Q, Sum
+
+from .models import Attendance, AttendanceSummary
+from .summaries import COUNTER_FIELDS, STATUS_FIELDS
+
+
+# ------------------------
+# ATTENDANCE STATISTICS
+# ------------------------
+
+def status_counters():
+    """Conditional COUNT expressions for the total and every status."""
+    counters = {'total_classes': Count('id')}
+    counters.update({
+        field: Count('id', filter=Q(status=status)) for status, field in STATUS_FIELDS.items()
+    })
+    return counters
+
+
+def attendance_breakdown(attendance, *group_by):
+    """Group an Attendance queryset and count every status in one query."""
+    return attendance.order_by().values(*group_by).annotate(**status_counters())
+
+
+# The dashboard queries live here so that explain_hot_queries inspects
+# exactly what the views run.
+
+def teacher_subjects(teacher):
+    """The teacher's subjects, each annotated with the records the teacher marked."""
+    return teacher.subjects.annotate(
+        marked_count=Count('attendance_records', filter=Q(attendance_records__marked_by=teacher))
+    ).order_by('code')
+
+
+def subject_totals(subjects):
+    """Summed summary counters per subject."""
+    return (
+        AttendanceSummary.objects.filter(subject__in=subjects)
+        .values('subject_id')
+        .annotate(total=Sum('total_classes'), present=Sum('present_count'))
+    )
+
+
+def recent_marked_attendance(teacher, subjects, limit=10):
+    return (
+        Attendance.objects.filter(subject__in=subjects, marked_by=teacher)
+        .select_related('student', 'subject')
+        .order_by('-date')[:limit]
+    )
+
+
+def student_summary_rows(student):
+    return (
+        AttendanceSummary.objects.filter(student=student)
+        .values('subject_id', 'subject__name', 'subject__code', *COUNTER_FIELDS)
+        .order_by('subject__code')
+    )
+
+
+def student_subject_stats(student):
+    """Per-subject counters for a student plus overall totals.
+
+    Reads the pre-aggregated AttendanceSummary rows (one per subject), so the
+    cost does not grow with the student's attendance history.
+    """
+    return _with_percentages(list(student_summary_rows(student)))
+
+
+async def astudent_subject_stats(student):
+    """Async variant of student_subject_stats."""
+    return _with_percentages([row async for row in student_summary_rows(student)])
+
+
+def _with_percentages(subjects):
+    for row in subjects:
+        row['attendance_percentage'] = percentage(row['present_count'], row['total_classes'])
+    return subjects, summarize(subjects)
+
+
+def summarize(rows):
+    """Fold per-subject counter rows into overall totals and a percentage."""
+    totals = {field: 0 for field in COUNTER_FIELDS}
+    for row in rows:
+        for field in COUNTER_FIELDS:
+            totals[field] += row[field]
+    totals['attendance_percentage'] = percentage(totals['present_count'], totals['total_classes'])
+    return totals
+
+
+def percentage(present, total):
+    if total > 0:
+        return round((present / total) * 100, 1)
+    return 0
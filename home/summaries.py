@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AttendanceSummary
+
+
+# ------------------------
+# SUMMARY COUNTER DELTAS
+# ------------------------
+
+STATUS_FIELDS = {
+    'Present': 'present_count',
+    'Absent': 'absent_count',
+    'Late': 'late_count',
+    'Excused': 'excused_count',
+}
+
+COUNTER_FIELDS = ('total_classes',) + tuple(STATUS_FIELDS.values())
+
+# Keeps each UPDATE well under SQLite's bound-parameter limit
+UPDATE_BATCH_SIZE = 500
+
+
+def record_change(deltas, student_id, subject_id, old_status, new_status):
+    """Accumulate the counter changes for one attendance row.
+
+    ``old_status`` is None for a new row and ``new_status`` is None for a
+    deleted one. ``deltas`` maps ``(student_id, subject_id)`` to a dict of
+    counter field -> increment.
+    """
+    if old_status == new_status:
+        return
+    delta = deltas[(student_id, subject_id)]
+    if old_status is None:
+        delta['total_classes'] += 1
+    else:
+        delta[STATUS_FIELDS[old_status]] -= 1
+    if new_status is None:
+        delta['total_classes'] -= 1
+    else:
+        delta[STATUS_FIELDS[new_status]] += 1
+
+
+def new_deltas():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def apply_deltas(deltas):
+    """Apply accumulated counter changes with F() expressions.
+
+    Rows sharing the same subject and the same change are updated together,
+    so a full class session costs a handful of UPDATEs rather than one per
+    student. Must run inside the transaction that wrote the attendance rows.
+    """
+    groups = defaultdict(list)
+    for (student_id, subject_id), delta in deltas.items():
+        changes = tuple(sorted((field, n) for field, n in delta.items() if n))
+        if changes:
+            groups[(subject_id, changes)].append(student_id)
+    if not groups:
+        return
+
+    # Only added rows can need a new summary. Updates and deletes find theirs,
+    # and a delete cascading from its student or subject must not recreate it
+    AttendanceSummary.objects.bulk_create(
+        [
+            AttendanceSummary(student_id=student_id, subject_id=subject_id)
+            for (subject_id, changes), student_ids in groups.items()
+            if dict(changes).get('total_classes', 0) > 0
+            for student_id in student_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+    now = timezone.now()
+    for (subject_id, changes), student_ids in groups.items():
+        updates = {field: F(field) + n for field, n in changes}
+        updates['updated_at'] = now
+        for start in range(0, len(student_ids), UPDATE_BATCH_SIZE):
+            AttendanceSummary.objects.filter(
+                subject_id=subject_id,
+                student_id__in=student_ids[start:start + UPDATE_BATCH_SIZE],
+            ).update(**updates)
+
@@ -0,0 +1,125 @@
+import json
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from .marking import STATUS_VALUES, session_records, upsert_attendance
+from .models import SyncReceipt
+from .roster import get_roster
+from .terms import is_archived
+
+
+# ------------------------
+# OFFLINE SYNC BATCHES
+# ------------------------
+# The mark-attendance page queues every submission in localStorage under a
+# client-generated key and posts the queue in batches. A batch is applied
+# in one transaction. Keys that already have a SyncReceipt are skipped, so
+# re-sending a batch after a lost response writes nothing.
+
+MAX_SESSIONS = 50
+MAX_KEY_LENGTH = 64
+
+
+class SyncError(ValueError):
+    pass
+
+
+def parse_batch(body):
+    """The list of sessions in a JSON ``{"sessions": [...]}`` request body."""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise SyncError('Invalid JSON')
+    sessions = payload.get('sessions') if isinstance(payload, dict) else None
+    if not isinstance(sessions, list):
+        raise SyncError('Expected an object with a "sessions" list')
+    if len(sessions) > MAX_SESSIONS:
+        raise SyncError(f'At most {MAX_SESSIONS} sessions per batch')
+    return sessions
+
+
+def _validate(session, subjects):
+    key = session.get('key')
+    if not isinstance(key, str) or not key or len(key) > MAX_KEY_LENGTH:
+        raise SyncError(f'key must be a string of 1-{MAX_KEY_LENGTH} characters')
+    try:
+        subject = subjects[int(session.get('subject_id'))]
+    except (KeyError, TypeError, ValueError):
+        raise SyncError('Subject not found for this teacher')
+    try:
+        on_date = parse_date(session.get('date') or '')
+    except ValueError:
+        on_date = None
+    if on_date is None:
+        raise SyncError('Invalid date')
+    if is_archived(on_date):
+        raise SyncError(f'{on_date} belongs to an archived term')
+    statuses = session.get('statuses')
+    if not isinstance(statuses, dict) or not statuses:
+        raise SyncError('statuses must map roll numbers to a status')
+    for status in statuses.values():
+        if status not in STATUS_VALUES:
+            raise SyncError(f'Invalid status: {status}')
+    return key, subject, on_date, statuses
+
+
+def apply_sessions(teacher, sessions):
+    """Apply a batch of queued sessions marked by ``teacher``.
+
+    Returns one result per session, in order, with a ``status`` of
+    ``applied``, ``duplicate`` (the key was applied before) or ``rejected``.
+    A rejected session does not stop the rest of the batch.
+    """
+    subjects = {subject.pk: subject for subject in teacher.subjects.all()}
+    rosters = {}
+
+    results, valid = [], []
+    for session in sessions:
+        if not isinstance(session, dict):
+            session = {}
+        try:
+            fields = _validate(session, subjects)
+        except SyncError as e:
+            results.append({'key': session.get('key'), 'status': 'rejected', 'error': str(e)})
+            continue
+        valid.append((len(results), fields))
+        results.append(None)
+
+    with transaction.atomic():
+        receipts = {
+            receipt.key: receipt
+            for receipt in SyncReceipt.objects.filter(key__in=[fields[0] for _, fields in valid])
+        }
+        new_receipts = []
+        for index, (key, subject, on_date, statuses) in valid:
+            receipt = receipts.get(key)
+            if receipt is not None and receipt.teacher_id != teacher.pk:
+                results[index] = {'key': key, 'status': 'rejected', 'error': 'Key already used'}
+                continue
+            if receipt is not None:
+                results[index] = {
+                    'key': key,
+                    'status': 'duplicate',
+                    'created': receipt.created_count,
+                    'updated': receipt.updated_count,
+                }
+                continue
+            # Only students enrolled in the subject this term are marked
+            if subject.pk not in rosters:
+                rosters[subject.pk] = {student.roll_number for student in get_roster(subject)}
+            records = session_records(teacher, subject, on_date, statuses, rosters[subject.pk])
+            created, updated = upsert_attendance(records)
+            receipts[key] = SyncReceipt(
+                key=key,
+                teacher=teacher,
+                subject=subject,
+                date=on_date,
+                created_count=created,
+                updated_count=updated,
+            )
+            new_receipts.append(receipts[key])
+            results[index] = {'key': key, 'status': 'applied', 'created': created, 'updated': updated}
+        SyncReceipt.objects.bulk_create(new_receipts)
+
+    return results
@@ -0,0 +1,28 @@
+from time import perf_counter
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from .metrics import record_template_time
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            record_template_time(perf_counter() - start)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time fed to the request metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
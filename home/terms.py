@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Term
+
+
+# ------------------------
+# CURRENT TERM
+# ------------------------
+# Rosters are the enrollments of the current term. The terms are cached per
+# day along with the date ranges of the archived ones, under a generation
+# read from the database: the number of terms and the latest
+# Term.updated_at. Adding, editing, archiving or deleting a term in any
+# process changes it. The generation is read once per request and again
+# after a Term save or delete in this process (see home.signals).
+
+TERM_TIMEOUT = 60 * 60
+
+_memo = {}
+
+
+def term_generation():
+    """A value that changes whenever a term is added, changed or deleted."""
+    if 'generation' not in _memo:
+        generation = Term.objects.aggregate(terms=Count('pk'), changed=Max('updated_at'))
+        changed = generation['changed']
+        _memo['generation'] = f'{generation["terms"]}.{changed.timestamp() if changed else 0}'
+    return _memo['generation']
+
+
+def forget_term_generation():
+    _memo.clear()
+
+
+def _calendar():
+    """``(current term, archived date ranges, every term's dates and pk)``, cached per generation and day."""
+    today = timezone.localdate()
+    key = f'term:calendar:{term_generation()}:{today}'
+    calendar = cache.get(key)
+    if calendar is None:
+        terms = list(Term.objects.all())
+        started = [term for term in terms if term.start_date <= today]
+        current = (
+            next((term for term in started if term.end_date is None or term.end_date >= today), None)
+            or next(iter(started), None)
+            or next(reversed(terms), None)
+        )
+        archived = sorted(
+            (term.start_date, term.end_date) for term in terms if term.archived_at is not None
+        )
+        spans = [(term.start_date, term.end_date, term.pk) for term in reversed(terms)]
+        calendar = (current, archived, spans)
+        cache.set(key, calendar, TERM_TIMEOUT)
+    return calendar
+
+
+def current_term():
+    """The term in progress today, else the latest one started, else the first planned."""
+    return _calendar()[0]
+
+
+def archive_horizon():
+    """The last day of the latest archived term, or None when nothing is archived."""
+    archived = _calendar()[1]
+    return max(end for _, end in archived) if archived else None
+
+
+def is_archived(on_date):
+    """Whether ``on_date`` falls in an archived term (see home.archive)."""
+    horizon = archive_horizon()
+    if horizon is None or on_date > horizon:
+        return False
+    return any(start <= on_date <= end for start, end in _calendar()[1])
+
+
+def term_for(on_date):
+    """``(pk, start date)`` of the latest-starting term that covers ``on_date``, or None."""
+    for start, end, pk in reversed(_calendar()[2]):
+        if start <= on_date and (end is None or on_date <= end):
+            return pk, start
+    return None
@@ -1,3 +1,1321 @@
-from django.test import TestCase
+import gc
+import gzip
+import json
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import analytics, ledger, roles
+from .archive import ArchiveError, archive_term
+from .conditional import lazy_context
+from .exports import export_rows
+from .history import history_page
+from .marking import session_records, upsert_attendance
+from .models import (
+    ArchivedAttendance,
+    Attendance,
+    AttendanceLedger,
+    AttendanceSummary,
+    DailyRollup,
+    Enrollment,
+    LowAttendanceAlert,
+    Student,
+    Subject,
+    Teacher,
+    Term,
+    Watermark,
+)
+from .records import ArchivedTermError
+from .roster import get_roster, reset_roster_cache_stats, roster_cache_stats
+from .routers import STICKY_COOKIE, PrimaryReplicaRouter, ReplicaPinningMiddleware
+from .summaries import COUNTER_FIELDS
+from .terms import current_term, is_archived
+
+
+# ------------------------
+# ENDPOINT BENCHMARKS
+# ------------------------
+# Every route in home/urls.py is driven through the test client against a
+# generated dataset. Each run records SQL queries, p50/p95 latency and bytes
+# rendered, writes them to BENCH_OUTPUT and fails when a route exceeds its
+# query budget or regresses against the stored baseline.
+#
+#   BENCH_SCALE              dataset scale passed to generate_dataset
+#   BENCH_ITERATIONS         timed requests per route
+#   BENCH_OUTPUT             where to write the results JSON
+#   BENCH_UPDATE_BASELINE=1  overwrite the stored baseline with this run
+
+BENCH_SCALE = os.environ.get('BENCH_SCALE', '0.005')
+BENCH_SESSIONS = os.environ.get('BENCH_SESSIONS', '20')
+BENCH_ITERATIONS = int(os.environ.get('BENCH_ITERATIONS', '10'))
+BENCH_OUTPUT = Path(os.environ.get('BENCH_OUTPUT', settings.BASE_DIR / 'bench_results.json'))
+BENCH_BASELINE = Path(__file__).resolve().parent / 'bench_baseline.json'
+
+# Maximum SQL queries per request; the count must not depend on data size
+QUERY_BUDGETS = {
+    'root': 1,
+    'login': 10,
+    'dashboard': 1,
+    'teacher_dashboard': 7,
+    'student_dashboard': 6,
+    'logout': 4,
+    'mark_attendance': 6,
+    'save_attendance': 21,
+}
+
+# A route regresses when its p95 exceeds baseline * ratio + slack
+LATENCY_REGRESSION_RATIO = 2.0
+LATENCY_REGRESSION_SLACK_MS = 25.0
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EndpointBenchmarkTests(TestCase):
+    results = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'generate_dataset',
+            scale=float(BENCH_SCALE),
+            sessions=int(BENCH_SESSIONS),
+            stdout=StringIO(),
+        )
+        cls.teacher = Teacher.objects.select_related('user').order_by('pk').first()
+        cls.student = Student.objects.select_related('user').filter(teacher=cls.teacher).order_by('pk').first()
+        cls.subject = cls.teacher.subjects.order_by('pk').first()
+        cls.roster = list(Student.objects.filter(teacher=cls.teacher).values_list('roll_number', flat=True))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if not cls.results:
+            return
+        BENCH_OUTPUT.write_text(json.dumps(cls.results, indent=2, sort_keys=True) + '\n')
+        if os.environ.get('BENCH_UPDATE_BASELINE') == '1':
+            BENCH_BASELINE.write_text(json.dumps(cls.results, indent=2, sort_keys=True) + '\n')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_explain_hot_queries(self):
+        before = list(Attendance.objects.filter(subject=self.subject).values_list('pk', 'status'))
+        out = StringIO()
+        call_command('explain_hot_queries', teacher=self.teacher.pk, repeat=1, stdout=out)
+        output = out.getvalue()
+        for label in (
+            'teacher dashboard: subject percentages',
+            'student dashboard: subject summaries',
+            'student history: deepest page',
+            'save attendance: bulk upsert (rolled back)',
+        ):
+            self.assertIn(label, output)
+        # The timed upsert is rolled back
+        self.assertEqual(list(Attendance.objects.filter(subject=self.subject).values_list('pk', 'status')), before)
+
+    def benchmark(self, route, request, prepare=None):
+        """Run ``request`` BENCH_ITERATIONS times and check it against its budgets."""
+        latencies, query_counts = [], []
+        response = None
+        # Collect garbage left by earlier tests so no full collection lands in the timings
+        gc.collect()
+        for _ in range(BENCH_ITERATIONS):
+            if prepare is not None:
+                prepare()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = request()
+                latencies.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries))
+
+        result = {
+            'queries': max(query_counts),
+            'p50_ms': round(statistics.median(latencies), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'bytes': len(response.content),
+            'status': response.status_code,
+        }
+        self.results[route] = result
+
+        self.assertLessEqual(
+            result['queries'], QUERY_BUDGETS[route],
+            f'{route} ran {result["queries"]} queries, budget is {QUERY_BUDGETS[route]}',
+        )
+        self.check_baseline(route, result)
+        return response
+
+    def check_baseline(self, route, result):
+        if not BENCH_BASELINE.exists() or os.environ.get('BENCH_UPDATE_BASELINE') == '1':
+            return
+        baseline = json.loads(BENCH_BASELINE.read_text()).get(route)
+        if baseline is None:
+            return
+        self.assertLessEqual(
+            result['queries'], baseline['queries'],
+            f'{route} query count regressed: {result["queries"]} vs baseline {baseline["queries"]}',
+        )
+        limit = baseline['p95_ms'] * LATENCY_REGRESSION_RATIO + LATENCY_REGRESSION_SLACK_MS
+        self.assertLessEqual(
+            result['p95_ms'], limit,
+            f'{route} p95 regressed: {result["p95_ms"]:.1f} ms vs limit {limit:.1f} ms',
+        )
+
+    def login_teacher(self):
+        self.client.force_login(self.teacher.user)
+        self.land_on_dashboard()
+
+    def login_student(self):
+        self.client.force_login(self.student.user)
+        self.land_on_dashboard()
+
+    def land_on_dashboard(self):
+        # Like a real login, leaves the user's role cached in the session
+        self.client.get(reverse('dashboard'))
+
+    def test_root(self):
+        self.login_teacher()
+        response = self.benchmark('root', lambda: self.client.get('/'))
+        self.assertRedirects(response, reverse('teacher_dashboard'), fetch_redirect_response=False)
+
+    def test_login(self):
+        response = self.benchmark(
+            'login',
+            lambda: self.client.post(reverse('login'), {'username': self.teacher.user.username, 'password': 'password123'}),
+            prepare=self.client.logout,
+        )
+        self.assertRedirects(response, reverse('teacher_dashboard'), fetch_redirect_response=False)
+
+    def test_dashboard(self):
+        self.login_student()
+        response = self.benchmark('dashboard', lambda: self.client.get(reverse('dashboard')))
+        self.assertRedirects(response, reverse('student_dashboard'), fetch_redirect_response=False)
+
+    def test_teacher_dashboard(self):
+        self.login_teacher()
+        response = self.benchmark('teacher_dashboard', lambda: self.client.get(reverse('teacher_dashboard')))
+        self.assertContains(response, self.subject.code)
+
+    def test_student_dashboard(self):
+        self.login_student()
+        response = self.benchmark('student_dashboard', lambda: self.client.get(reverse('student_dashboard')))
+        self.assertContains(response, 'Subject-wise Attendance')
+
+    def test_logout(self):
+        response = self.benchmark('logout', lambda: self.client.get(reverse('logout')), prepare=self.login_teacher)
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+
+    def test_mark_attendance(self):
+        self.login_teacher()
+        response = self.benchmark(
+            'mark_attendance',
+            lambda: self.client.get(reverse('mark_attendance', args=[self.subject.pk])),
+        )
+        self.assertContains(response, f'status_{self.roster[0]}')
+
+    def test_save_attendance(self):
+        self.login_teacher()
+        data = {'subject_id': self.subject.pk, 'date': '2026-01-05'}
+        data.update({f'status_{roll_number}': 'Present' for roll_number in self.roster})
+        response = self.benchmark('save_attendance', lambda: self.client.post(reverse('save_attendance'), data))
+        self.assertTrue(response.json()['success'], response.json())
+        self.assertEqual(
+            self.subject.attendance_records.filter(date='2026-01-05').count(), len(self.roster)
+        )
+
+
+class InstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('ops', password='x', is_staff=True)
+        cls.user = User.objects.create_user('plain', password='x')
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('login'))
+        header = response['Server-Timing']
+        self.assertIn('db;dur=', header)
+        self.assertIn('tpl;dur=', header)
+        self.assertIn('total;dur=', header)
+
+    def test_metrics_requires_staff(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    def test_metrics_exposes_route_histograms(self):
+        self.client.get(reverse('login'))
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'attendancex_request_duration_seconds_bucket{route="login"')
+        self.assertContains(response, 'attendancex_roster_cache_hits_total')
+
+
+class AttendanceFixture:
+    """A teacher teaching one subject to ``student_count`` students, with a mark() helper."""
+
+    student_count = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('teacher', password='x'), name='Teacher')
+        cls.subject = Subject.objects.create(name='Subject', code='SUB101')
+        cls.teacher.subjects.add(cls.subject)
+        cls.students = [
+            Student.objects.create(
+                user=User.objects.create_user(f'student{n}', password='x'),
+                name=f'Student {n}', roll_number=f'S{n}', course='CS', year=1, teacher=cls.teacher,
+            )
+            for n in range(cls.student_count)
+        ]
+        cls.student = cls.students[0]
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def mark(self, on_date, *statuses, students=None):
+        """Upsert one session on ``on_date``, one status per student in order."""
+        upsert_attendance([
+            Attendance(student=student, subject=self.subject, date=on_date, status=status, marked_by=self.teacher)
+            for student, status in zip(students or self.students, statuses)
+        ])
+
+
+class SummaryTests(AttendanceFixture, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Term.objects.create(name='Spring 2025', start_date=date(2025, 1, 1), end_date=date(2025, 5, 31))
+
+    def test_deleting_a_student_or_subject_with_attendance(self):
+        self.mark(date(2025, 2, 3), 'Present', 'Absent')
+        self.mark(date(2025, 2, 4), 'Late', 'Present')
+        self.assertEqual(AttendanceLedger.objects.count(), 2)
+
+        deleted = self.students[0].pk
+        self.students[0].delete()
+        self.assertFalse(AttendanceSummary.objects.filter(student_id=deleted).exists())
+        self.assertFalse(AttendanceLedger.objects.filter(student_id=deleted).exists())
+        summary = AttendanceSummary.objects.get(student=self.students[1])
+        self.assertEqual((summary.total_classes, summary.present_count), (2, 1))
+        self.assertEqual(DailyRollup.objects.get(date=date(2025, 2, 3)).total_classes, 1)
+
+        self.subject.delete()
+        self.assertFalse(AttendanceSummary.objects.exists())
+        self.assertFalse(AttendanceLedger.objects.exists())
+        self.assertFalse(DailyRollup.objects.exists())
+
+    def counters(self, student):
+        summary = AttendanceSummary.objects.get(student=student, subject=self.subject)
+        return {field: getattr(summary, field) for field in COUNTER_FIELDS}
+
+    def test_single_row_writes_keep_the_summary(self):
+        student = self.students[0]
+        record = Attendance.objects.create(
+            student=student, subject=self.subject, date=date(2025, 3, 3), status='Present', marked_by=self.teacher,
+        )
+        Attendance.objects.create(student=student, subject=self.subject, date=date(2025, 3, 4), status='Absent')
+        self.assertEqual(self.counters(student), {
+            'total_classes': 2, 'present_count': 1, 'absent_count': 1, 'late_count': 0, 'excused_count': 0,
+        })
+
+        record.status = 'Late'
+        record.save()
+        self.assertEqual(self.counters(student)['present_count'], 0)
+        self.assertEqual(self.counters(student)['late_count'], 1)
+
+        admin = User.objects.create_superuser('root', password='x')
+        self.client.force_login(admin)
+        response = self.client.post(reverse('admin:home_attendance_change', args=[record.pk]), {
+            'student': student.pk,
+            'subject': self.subject.pk,
+            'type': 'One',
+            'date': '2025-03-03',
+            'status': 'Excused',
+            'marked_by': self.teacher.pk,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.counters(student), {
+            'total_classes': 2, 'present_count': 0, 'absent_count': 1, 'late_count': 0, 'excused_count': 1,
+        })
+
+        Attendance.objects.get(pk=record.pk).delete()
+        self.assertEqual(self.counters(student), {
+            'total_classes': 1, 'present_count': 0, 'absent_count': 1, 'late_count': 0, 'excused_count': 0,
+        })
+
+    def test_rebuild_summaries_repairs_drift(self):
+        self.mark(date(2025, 2, 3), 'Present', 'Absent')
+        self.mark(date(2025, 2, 4), 'Late', 'Present')
+        expected = {student.pk: self.counters(student) for student in self.students}
+
+        AttendanceSummary.objects.filter(student=self.students[0]).update(total_classes=7, present_count=0)
+        AttendanceSummary.objects.filter(student=self.students[1]).delete()
+        other = Subject.objects.create(name='Acoustics', code='PH230')
+        AttendanceSummary.objects.create(student=self.students[0], subject=other, total_classes=3)
+
+        out = StringIO()
+        call_command('rebuild_summaries', '--dry-run', stdout=out)
+        self.assertIn('Would fix attendance summaries: 1 created, 1 updated, 1 deleted', out.getvalue())
+        self.assertEqual(AttendanceSummary.objects.get(student=self.students[0], subject=self.subject).total_classes, 7)
+
+        out = StringIO()
+        call_command('rebuild_summaries', stdout=out)
+        self.assertIn('Fixed attendance summaries: 1 created, 1 updated, 1 deleted', out.getvalue())
+        self.assertEqual({student.pk: self.counters(student) for student in self.students}, expected)
+        self.assertFalse(AttendanceSummary.objects.filter(subject=other).exists())
+
+        out = StringIO()
+        call_command('rebuild_summaries', stdout=out)
+        self.assertIn('0 created, 0 updated, 0 deleted', out.getvalue())
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('registrar', password='x', is_staff=True)
+        teacher = Teacher.objects.create(user=User.objects.create_user('teach', password='x'), name='Teach')
+        cls.subject = Subject.objects.create(name='Databases', code='CS303')
+        other = Subject.objects.create(name='Networks', code='CS304')
+        for n in range(3):
+            student = Student.objects.create(
+                user=User.objects.create_user(f'stu{n}', password='x'),
+                name=f'Student, {n}', roll_number=f'R{n}', course='CS', year=2, teacher=teacher,
+            )
+            Attendance.objects.create(student=student, subject=cls.subject, date='2026-01-05', status='Present')
+            Attendance.objects.create(student=student, subject=other, date='2026-02-05', status='Absent')
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def test_csv_export_is_filtered_and_streamed(self):
+        response = self.client.get(reverse('export_attendance'), {'subject': 'CS303'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'date,roll_number,student_name,subject_code,subject_name,status,session_type,marked_by')
+        self.assertEqual(len(lines), 4)
+        self.assertIn('"Student, 0",CS303', lines[1])
+
+    def test_jsonl_export_gzipped_when_accepted(self):
+        response = self.client.get(
+            reverse('export_attendance'),
+            {'format': 'jsonl', 'date_from': '2026-02-01'},
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        rows = [json.loads(line) for line in gzip.decompress(b''.join(response.streaming_content)).splitlines()]
+        self.assertEqual({row['subject_code'] for row in rows}, {'CS304'})
+        self.assertEqual(len(rows), 3)
+
+    def test_invalid_date_is_rejected(self):
+        response = self.client.get(reverse('export_attendance'), {'date_to': 'tomorrow'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_teacher_is_rejected(self):
+        response = self.client.get(reverse('export_attendance'), {'teacher': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_writes_gzip_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'out.csv.gz'
+            call_command('export_attendance', student='R1', output=str(path), gzip=True, stderr=StringIO())
+            lines = gzip.decompress(path.read_bytes()).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+
+
+class ImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('teach', password='x'), name='Teach')
+        cls.subject = Subject.objects.create(name='Databases', code='CS303')
+        cls.teacher.subjects.add(cls.subject)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_csv(self, name, text):
+        path = Path(self.directory.name) / name
+        path.write_text(text)
+        return path
+
+    def test_import_roster_and_attendance(self):
+        roster = self.write_csv('roster.csv', (
+            'roll_number,username,name,course,year,branch,teacher\n'
+            f'R1,alice,Alice Brown,CS,3,CS,{self.teacher.pk}\n'
+            f'R2,bob,Bob Davis,CS,three,CS,{self.teacher.pk}\n'
+            'R3,carol,Carol White,CS,2,CS,999\n'
+            f'R4,dan,Dan Green,CS,1,CS,{self.teacher.pk}\n'
+        ))
+        call_command('import_roster', str(roster), chunk_size=2, stdout=StringIO())
+        self.assertEqual(sorted(Student.objects.values_list('pk', flat=True)), ['R1', 'R4'])
+        self.assertEqual(Student.objects.get(pk='R1').user.first_name, 'Alice')
+        # Without a subjects column students are enrolled in their teacher's subjects
+        self.assertEqual(
+            sorted(Enrollment.objects.values_list('student_id', 'subject__code')), [('R1', 'CS303'), ('R4', 'CS303')]
+        )
+        rejects = Path(f'{roster}.rejects.csv').read_text().splitlines()
+        self.assertEqual(len(rejects), 3)
+        self.assertIn('Invalid year', rejects[1])
+        self.assertFalse(Path(f'{roster}.checkpoint').exists())
+
+        attendance = self.write_csv('attendance.csv', (
+            'roll_number,subject_code,date,status,marked_by\n'
+            f'R1,CS303,2025-09-01,present,{self.teacher.pk}\n'
+            'R4,CS303,2025-09-01,Absent,\n'
+            'R9,CS303,2025-09-01,Present,\n'
+            'R1,CS303,2025-09-01,Late,\n'
+        ))
+        call_command('import_attendance', str(attendance), stdout=StringIO())
+        self.assertEqual(Attendance.objects.count(), 2)
+        self.assertEqual(Attendance.objects.get(student_id='R1').status, 'Late')
+        summary = AttendanceSummary.objects.get(student_id='R1', subject=self.subject)
+        self.assertEqual((summary.total_classes, summary.late_count), (1, 1))
+
+    def test_import_never_takes_over_other_accounts(self):
+        Student.objects.create(
+            user=User.objects.create_user('alice', password='x'),
+            name='Alice', roll_number='R1', course='CS', year=1, teacher=self.teacher,
+        )
+        User.objects.create_superuser('admin', password='x', first_name='Site')
+        roster = self.write_csv('roster.csv', (
+            'roll_number,username,name,course,year\n'
+            'R2,teach,Mallory,CS,1\n'
+            'R3,admin,Mallory,CS,1\n'
+            'R4,alice,Mallory,CS,1\n'
+            'R1,alice2,Alice Brown,CS,2\n'
+            'R1,alice,Alice Brown,CS,2\n'
+        ))
+        call_command('import_roster', str(roster), stdout=StringIO())
+        self.assertEqual(list(Student.objects.values_list('pk', 'year')), [('R1', 2)])
+        self.assertEqual(User.objects.get(username='teach').teacher, self.teacher)
+        self.assertEqual(User.objects.get(username='admin').first_name, 'Site')
+        self.assertFalse(User.objects.filter(username='alice2').exists())
+        errors = [line.rsplit(',', 1)[1] for line in Path(f'{roster}.rejects.csv').read_text().splitlines()[1:]]
+        self.assertEqual(errors, [
+            'Username teach belongs to another account',
+            'Username admin belongs to another account',
+            'Username alice belongs to student R1',
+            'Student R1 already has username alice',
+        ])
+
+    def test_resume_from_checkpoint(self):
+        Student.objects.create(
+            user=User.objects.create_user('alice', password='x'),
+            name='Alice', roll_number='R1', course='CS', year=1, teacher=self.teacher,
+        )
+        attendance = self.write_csv('attendance.csv', (
+            'roll_number,subject_code,date,status\n'
+            'R1,CS303,2025-09-01,Present\n'
+            'R1,CS303,2025-09-02,Present\n'
+            'R1,CS303,2025-09-03,Present\n'
+        ))
+        Path(f'{attendance}.checkpoint').write_text(json.dumps({'rows': 2}))
+        call_command('import_attendance', str(attendance), resume=True, stdout=StringIO())
+        self.assertEqual(list(Attendance.objects.values_list('date', flat=True)), [date(2025, 9, 3)])
+
+
+class HistoryApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', password='x')
+        cls.student = Student.objects.create(user=cls.user, name='Alice', roll_number='R1', course='CS', year=1)
+        math = Subject.objects.create(name='Calculus', code='MATH301')
+        physics = Subject.objects.create(name='Optics', code='PHY302')
+        for day in range(1, 26):
+            Attendance.objects.create(student=cls.student, subject=math, date=date(2026, 1, day), status='Present')
+            Attendance.objects.create(
+                student=cls.student, subject=physics, date=date(2026, 1, day),
+                status='Absent' if day % 5 == 0 else 'Present',
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def fetch_all(self, **params):
+        rows, cursor, pages = [], None, 0
+        while True:
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(reverse('attendance_history'), params).json()
+            rows.extend(data['results'])
+            pages += 1
+            cursor = data['next_cursor']
+            if not cursor:
+                return rows, pages
+
+    def test_pages_cover_history_in_order_without_duplicates(self):
+        rows, pages = self.fetch_all(limit=7)
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(pages, 8)
+        self.assertEqual(len({row['id'] for row in rows}), 50)
+        keys = [(row['date'], row['id']) for row in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_filters(self):
+        rows, _ = self.fetch_all(subject='PHY302', status='Absent', date_from='2026-01-10')
+        self.assertEqual([row['date'] for row in rows], ['2026-01-25', '2026-01-20', '2026-01-15', '2026-01-10'])
+        self.assertEqual(rows[0]['subject'], 'Optics')
+
+    def test_deep_page_costs_one_query(self):
+        _, cursor = history_page(self.student, limit=45)
+        with self.assertNumQueries(1):
+            rows, next_cursor = history_page(self.student, cursor=cursor, limit=10)
+        self.assertEqual(len(rows), 5)
+        self.assertIsNone(next_cursor)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('attendance_history'), {'cursor': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncDashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('prof', password='x'), name='Prof')
+        subjects = [Subject.objects.create(name=f'Subject {n}', code=f'SUB{n}') for n in range(2)]
+        cls.teacher.subjects.set(subjects)
+        cls.student = Student.objects.create(
+            user=User.objects.create_user('pupil', password='x'),
+            name='Pupil', roll_number='P1', course='CS', year=1, teacher=cls.teacher,
+        )
+        for day, status in enumerate(['Present', 'Absent', 'Present'], start=1):
+            for subject in subjects:
+                Attendance.objects.create(
+                    student=cls.student, subject=subject, date=date(2026, 3, day),
+                    status=status, marked_by=cls.teacher,
+                )
+
+    async def fetch_both(self, user, sync_name, async_name):
+        await self.async_client.aforce_login(user)
+        expected = await self.async_client.get(reverse(sync_name))
+        actual = await self.async_client.get(reverse(async_name))
+        self.assertEqual(actual.status_code, 200)
+        # The async middleware path still sees the view's queries
+        self.assertNotIn('"0 queries"', actual['Server-Timing'])
+        return expected.context, actual.context
+
+    async def test_teacher_dashboard_matches_sync_view(self):
+        expected, actual = await self.fetch_both(self.teacher.user, 'teacher_dashboard', 'teacher_dashboard_async')
+        self.assertEqual(actual['total_attendance_marked'], 6)
+        for key in ('total_students', 'total_attendance_marked'):
+            self.assertEqual(actual[key], expected[key])
+        self.assertEqual(
+            [row['attendance_percentage'] for row in actual['subjects_data']],
+            [row['attendance_percentage'] for row in expected['subjects_data']],
+        )
+
+    async def test_student_dashboard_matches_sync_view(self):
+        expected, actual = await self.fetch_both(self.student.user, 'student_dashboard', 'student_dashboard_async')
+        self.assertEqual(actual['attendance_percentage'], 66.7)
+        for key in ('attendance_records', 'subject_stats', 'total_classes', 'history_cursor'):
+            self.assertEqual(actual[key], expected[key])
+
+
+class ConditionalDashboardTests(AttendanceFixture, TestCase):
+    student_count = 1
+
+    def test_unchanged_dashboard_answers_not_modified(self):
+        self.mark(date(2026, 3, 1), 'Present')
+        for user, name in ((self.teacher.user, 'teacher_dashboard'), (self.student.user, 'student_dashboard')):
+            self.client.force_login(user)
+            first = self.client.get(reverse(name))
+            self.assertEqual(first.status_code, 200)
+            self.assertIn('Last-Modified', first)
+            again = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(again.status_code, 304)
+
+    def test_attendance_write_changes_the_version(self):
+        self.mark(date(2026, 3, 1), 'Present')
+        self.client.force_login(self.student.user)
+        first = self.client.get(reverse('student_dashboard'))
+        self.mark(date(2026, 3, 2), 'Absent')
+        second = self.client.get(reverse('student_dashboard'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertContains(second, '50.0%')
+
+    def test_edit_keeping_the_status_changes_the_version(self):
+        self.mark(date(2026, 3, 1), 'Present')
+        self.client.force_login(self.student.user)
+        first = self.client.get(reverse('student_dashboard'))
+        record = Attendance.objects.get(student=self.student)
+        record.type = 'Two'
+        record.save()
+        second = self.client.get(reverse('student_dashboard'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_teacher_profile_edit_changes_the_version(self):
+        self.client.force_login(self.teacher.user)
+        etag = self.client.get(reverse('teacher_dashboard'))['ETag']
+        for edit in (
+            lambda: Teacher.objects.filter(pk=self.teacher.pk).update(department='Physics'),
+            lambda: User.objects.filter(pk=self.teacher.user.pk).update(first_name='Ada'),
+        ):
+            edit()
+            response = self.client.get(reverse('teacher_dashboard'), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+        self.assertContains(response, 'Physics')
+        self.assertContains(response, 'Ada')
+
+    def test_cached_fragments_skip_dashboard_queries(self):
+        self.mark(date(2026, 3, 1), 'Present')
+        self.client.force_login(self.teacher.user)
+        with CaptureQueriesContext(connection) as cold:
+            first = self.client.get(reverse('teacher_dashboard'))
+        with CaptureQueriesContext(connection) as warm:
+            second = self.client.get(reverse('teacher_dashboard'))
+        self.assertEqual(second.content, first.content)
+        self.assertLess(len(warm), len(cold))
+
+
+class SubjectRosterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('prof', password='x'), name='Prof')
+        cls.subject = Subject.objects.create(name='Subject', code='SUB')
+        cls.elective = Subject.objects.create(name='Elective', code='ELE')
+        cls.other = Subject.objects.create(name='Other', code='OTH')
+        cls.teacher.subjects.add(cls.subject, cls.elective)
+        for n in range(3):
+            cls.add_student(n, cls.subject)
+        Enrollment.objects.create(student_id='P0', subject=cls.elective, term=current_term())
+
+    @classmethod
+    def add_student(cls, n, subject):
+        student = Student.objects.create(
+            user=User.objects.create_user(f'pupil{n}', password='x'),
+            name=f'Pupil {n}', roll_number=f'P{n}', course='CS', year=1, teacher=cls.teacher,
+        )
+        Enrollment.objects.create(student=student, subject=subject, term=current_term())
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.teacher.user)
+
+    def test_dashboard_no_longer_inlines_the_roster(self):
+        response = self.client.get(reverse('teacher_dashboard'))
+        self.assertNotContains(response, 'Pupil 0')
+        self.assertContains(response, reverse('subject_roster', args=[self.subject.pk]))
+        # Counts come from enrollments, not from every student of the teacher
+        self.assertEqual(response.context['total_students'], 4)
+        self.assertEqual([row['student_count'] for row in response.context['subjects_data']], [1, 3])
+
+    def test_only_enrolled_students_are_marked(self):
+        response = self.client.get(reverse('mark_attendance', args=[self.elective.pk]))
+        self.assertEqual([student.roll_number for student in response.context['students']], ['P0'])
+        data = {'subject_id': self.elective.pk, 'date': '2026-03-02', 'status_P0': 'Present', 'status_P1': 'Present'}
+        self.assertTrue(self.client.post(reverse('save_attendance'), data).json()['success'])
+        self.assertEqual(
+            list(Attendance.objects.filter(subject=self.elective).values_list('student_id', flat=True)), ['P0']
+        )
+
+    def test_roster_is_versioned(self):
+        url = reverse('subject_roster', args=[self.subject.pk])
+        first = self.client.get(url)
+        self.assertEqual(first.json()['students'][0], ['P0', 'Pupil 0'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        self.add_student(3, self.subject)
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.json()['version'], first.json()['version'])
+        self.assertEqual(len(second.json()['students']), 4)
+
+    def roster(self, subject):
+        subject.refresh_from_db()
+        return [student.name for student in get_roster(subject)]
+
+    def test_roster_cache_hits_and_invalidation(self):
+        reset_roster_cache_stats()
+        names = ['Pupil 0', 'Pupil 1', 'Pupil 2']
+        self.assertEqual(self.roster(self.subject), names)
+        with self.assertNumQueries(1):
+            # Only the subject, for its version; the roster itself is cached
+            self.assertEqual(self.roster(self.subject), names)
+        self.assertEqual(roster_cache_stats(), {'hits': 1, 'misses': 1})
+
+        student = Student.objects.get(pk='P1')
+        student.name = 'Renamed'
+        student.save()
+        self.assertEqual(self.roster(self.subject), ['Pupil 0', 'Renamed', 'Pupil 2'])
+        # The elective's roster holds P0 only and is cached under its own version
+        self.assertEqual(self.roster(self.elective), ['Pupil 0'])
+        self.assertEqual(roster_cache_stats(), {'hits': 1, 'misses': 3})
+
+        Enrollment.objects.create(student=student, subject=self.elective, term=current_term())
+        self.assertEqual(self.roster(self.elective), ['Pupil 0', 'Renamed'])
+        Enrollment.objects.filter(student=student, subject=self.elective).delete()
+        self.assertEqual(self.roster(self.elective), ['Pupil 0'])
+        self.assertEqual(self.roster(self.subject), ['Pupil 0', 'Renamed', 'Pupil 2'])
+        self.assertEqual(roster_cache_stats(), {'hits': 2, 'misses': 5})
+
+    def test_other_teachers_subjects_are_not_saved(self):
+        Enrollment.objects.create(student_id='P1', subject=self.other, term=current_term())
+        data = {'subject_id': self.other.pk, 'date': '2026-03-02', 'status_P1': 'Absent'}
+        response = self.client.post(reverse('save_attendance'), data)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.json()['success'])
+        self.assertFalse(Attendance.objects.filter(subject=self.other).exists())
+
+    def test_other_subjects_are_not_found(self):
+        response = self.client.get(reverse('subject_roster', args=[self.other.pk]))
+        self.assertEqual(response.status_code, 404)
+        for subject_id in (self.other.pk, 0):
+            response = self.client.get(reverse('mark_attendance', args=[subject_id]))
+            self.assertEqual(response.status_code, 404)
+
+
+class RoleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('prof', password='x'), name='Prof')
+        cls.student = Student.objects.create(
+            user=User.objects.create_user('pupil', password='x'),
+            name='Pupil', roll_number='P1', course='CS', year=1, teacher=cls.teacher,
+        )
+
+    def test_login_caches_the_role_in_the_session(self):
+        response = self.client.post(reverse('login'), {'username': 'pupil', 'password': 'x'})
+        self.assertRedirects(response, reverse('student_dashboard'), fetch_redirect_response=False)
+        self.assertEqual(self.client.session[roles.SESSION_KEY][1:], ['student', 'P1'])
+        # Only the session is read to pick the dashboard
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('dashboard'))
+        self.assertRedirects(response, reverse('student_dashboard'), fetch_redirect_response=False)
+
+    def test_role_required_rejects_other_roles(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(reverse('teacher_analytics'))
+        self.assertEqual(response.status_code, 403)
+        self.assertRedirects(self.client.get(reverse('teacher_dashboard')), reverse('login'))
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('teacher_analytics')).status_code, 401)
+
+    def test_profile_user_is_reused_as_request_user(self):
+        self.client.force_login(self.teacher.user)
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        AuthenticationMiddleware(lambda r: None).process_request(request)
+        roles.RoleMiddleware(lambda r: None)(request)
+        # Session, role, then the profile with its user; no separate user query
+        with self.assertNumQueries(3):
+            self.assertEqual(request.teacher.pk, self.teacher.pk)
+            self.assertEqual(request.user, self.teacher.user)
+            self.assertFalse(request.student)
+
+    def test_changed_password_is_not_trusted(self):
+        self.client.force_login(self.teacher.user)
+        self.client.get(reverse('dashboard'))
+        user = self.teacher.user
+        user.set_password('changed')
+        user.save()
+        response = self.client.get(reverse('teacher_dashboard'))
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+
+
+class StaticAssetTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_hashed_bundles_are_precompressed_and_negotiated(self):
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+        }
+        with override_settings(STATIC_ROOT=self.root, STORAGES=storages):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            call_command('compress_static', stdout=StringIO(), stderr=StringIO())
+            page = self.client.get(reverse('login')).content.decode()
+            url = re.search(r'href="(/static/home/css/login\.[0-9a-f]{12}\.css)"', page).group(1)
+
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertIn('Accept-Encoding', response['Vary'])
+            body = gzip.decompress(b''.join(response.streaming_content))
+            self.assertEqual(body, (self.root / url.removeprefix('/static/')).read_bytes())
+
+            plain = self.client.get(url)
+            self.assertFalse(plain.has_header('Content-Encoding'))
+            self.assertEqual(b''.join(plain.streaming_content), body)
+
+    def test_unhashed_files_get_a_short_lifetime(self):
+        (self.root / 'app.js').write_text('console.log(1);')
+        with override_settings(STATIC_ROOT=self.root):
+            response = self.client.get('/static/app.js', HTTP_ACCEPT_ENCODING='gzip')
+            self.assertNotIn('immutable', response['Cache-Control'])
+            self.assertEqual(self.client.get('/static/../settings.py').status_code, 404)
+
+
+class SyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('syncer', password='x'), name='Syncer')
+        cls.subject = Subject.objects.create(name='Compilers', code='CS401')
+        cls.teacher.subjects.add(cls.subject)
+        for n in range(3):
+            student = Student.objects.create(
+                user=User.objects.create_user(f'sync{n}', password='x'),
+                name=f'Sync {n}', roll_number=f'S{n}', course='CS', year=4, teacher=cls.teacher,
+            )
+            Enrollment.objects.create(student=student, subject=cls.subject, term=current_term())
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.teacher.user)
+
+    def sync(self, *sessions):
+        response = self.client.post(
+            reverse('sync_attendance'), json.dumps({'sessions': list(sessions)}), content_type='application/json'
+        )
+        return response.json()['results']
+
+    def session(self, key, on_date, status='Present'):
+        statuses = {f'S{n}': status for n in range(3)}
+        return {'key': key, 'subject_id': self.subject.pk, 'date': on_date, 'statuses': statuses}
+
+    def test_batch_is_applied_once(self):
+        batch = [self.session('k1', '2026-04-01'), self.session('k2', '2026-04-02', 'Absent')]
+        results = self.sync(*batch)
+        self.assertEqual([r['status'] for r in results], ['applied', 'applied'])
+        self.assertEqual(Attendance.objects.count(), 6)
+
+        # A retried batch is acknowledged without touching attendance
+        with CaptureQueriesContext(connection) as queries:
+            results = self.sync(*batch)
+        self.assertEqual([r['status'] for r in results], ['duplicate', 'duplicate'])
+        self.assertEqual(results[1]['created'], 3)
+        self.assertFalse([q for q in queries if 'home_attendance' in q['sql'] and 'INSERT' in q['sql']])
+        summary = AttendanceSummary.objects.get(student_id='S0', subject=self.subject)
+        self.assertEqual((summary.total_classes, summary.present_count), (2, 1))
+
+    def test_invalid_session_is_rejected_alone(self):
+        other = Subject.objects.create(name='Elsewhere', code='XX1')
+        results = self.sync(
+            self.session('good', '2026-04-03'),
+            dict(self.session('bad', '2026-04-03'), subject_id=other.pk),
+            dict(self.session('worse', 'soon')),
+        )
+        self.assertEqual([r['status'] for r in results], ['applied', 'rejected', 'rejected'])
+        self.assertEqual(results[2]['error'], 'Invalid date')
+        self.assertEqual(Attendance.objects.count(), 3)
+
+    def test_malformed_body(self):
+        response = self.client.post(reverse('sync_attendance'), 'nope', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class RollupTests(AttendanceFixture, TestCase):
+    def rollup(self, on_date):
+        return DailyRollup.objects.filter(subject=self.subject, date=on_date).values_list(
+            'total_classes', 'present_count', 'absent_count'
+        ).first()
+
+    def test_save_path_keeps_rollups_current(self):
+        self.mark(date(2026, 5, 4), 'Present', 'Absent')
+        self.assertEqual(self.rollup(date(2026, 5, 4)), (2, 1, 1))
+        self.mark(date(2026, 5, 4), 'Present', 'Present')
+        self.assertEqual(self.rollup(date(2026, 5, 4)), (2, 2, 0))
+
+        Attendance.objects.filter(date=date(2026, 5, 4)).first().delete()
+        self.assertEqual(self.rollup(date(2026, 5, 4))[0], 1)
+        Attendance.objects.filter(date=date(2026, 5, 4)).delete()
+        self.assertIsNone(self.rollup(date(2026, 5, 4)))
+
+    def test_command_refreshes_only_dates_past_the_watermark(self):
+        self.mark(date(2026, 5, 4), 'Present', 'Absent')
+        self.mark(date(2026, 5, 5), 'Absent', 'Absent')
+        call_command('refresh_rollups', full=True, stdout=StringIO())
+
+        # Writes that bypass the save path are picked up on the next run
+        DailyRollup.objects.all().update(total_classes=99)
+        Attendance.objects.update(updated_at=timezone.now() - timedelta(hours=2))
+        Attendance.objects.filter(date=date(2026, 5, 5)).update(status='Late', updated_at=timezone.now())
+        Watermark.objects.update(value=timezone.now() - timedelta(hours=1))
+        out = StringIO()
+        call_command('refresh_rollups', stdout=out)
+        self.assertIn('Refreshed 1 daily rollups', out.getvalue())
+        self.assertEqual(self.rollup(date(2026, 5, 5)), (2, 0, 0))
+        self.assertEqual(self.rollup(date(2026, 5, 4))[0], 99)
+
+    def test_analytics_view_groups_by_week_and_month(self):
+        for day, statuses in [(4, ('Present', 'Absent')), (6, ('Present', 'Present')), (12, ('Absent', 'Absent'))]:
+            self.mark(date(2026, 5, day), *statuses)
+        self.client.force_login(self.teacher.user)
+
+        weeks = self.client.get(reverse('teacher_analytics'), {'period': 'week'}).json()['series'][self.subject.code]
+        self.assertEqual([(row['period'], row['total_classes'], row['present_count']) for row in weeks], [
+            ('2026-05-04', 4, 3),
+            ('2026-05-11', 2, 0),
+        ])
+        self.assertEqual(weeks[0]['attendance_percentage'], 75.0)
+
+        # Session, teacher joined with its user, rollups: the role is already in the session
+        with self.assertNumQueries(3):
+            months = self.client.get(reverse('teacher_analytics'), {'period': 'month'}).json()['series'][self.subject.code]
+        self.assertEqual(len(months), 1)
+        self.assertEqual(months[0]['total_classes'], 6)
+
+        response = self.client.get(reverse('teacher_analytics'), {'period': 'year'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('keeper', password='x'), name='Keeper')
+        cls.subject = Subject.objects.create(name='History', code='HI101')
+        cls.students = [
+            Student.objects.create(
+                user=User.objects.create_user(f'arch{n}', password='x'),
+                name=f'Arch {n}', roll_number=f'A{n}', course='HI', year=1, teacher=cls.teacher,
+            )
+            for n in range(2)
+        ]
+        cls.term = Term.objects.create(name='Spring 2025', start_date=date(2025, 1, 1), end_date=date(2025, 5, 31))
+        for on_date, statuses in [
+            (date(2025, 2, 3), ('Present', 'Absent')),
+            (date(2025, 2, 4), ('Late', 'Present')),
+            (date(2025, 9, 1), ('Present', 'Present')),
+        ]:
+            upsert_attendance([
+                Attendance(student=student, subject=cls.subject, date=on_date, status=status, marked_by=cls.teacher)
+                for student, status in zip(cls.students, statuses)
+            ])
+
+    def setUp(self):
+        cache.clear()
+
+    def counters(self):
+        return (
+            list(AttendanceSummary.objects.order_by('student_id').values_list('student_id', 'total_classes', 'present_count')),
+            list(DailyRollup.objects.order_by('date').values_list('date', 'total_classes', 'present_count')),
+        )
+
+    def test_terms_archived_by_another_process(self):
+        self.assertFalse(is_archived(date(2025, 2, 3)))
+        # Another process archives the term; no signal reaches this one
+        Term.objects.filter(pk=self.term.pk).update(archived_at=timezone.now(), updated_at=timezone.now())
+        with self.assertRaises(ArchivedTermError):
+            upsert_attendance([
+                Attendance(student=self.students[0], subject=self.subject, date=date(2025, 2, 5), status='Present')
+            ])
+        # Reads see it from the next request on
+        self.client.get(reverse('login'))
+        self.assertTrue(is_archived(date(2025, 2, 3)))
+
+    def test_archive_moves_rows_and_keeps_counters(self):
+        before = self.counters()
+        ids = set(Attendance.objects.filter(date__lt=date(2025, 6, 1)).values_list('pk', flat=True))
+
+        self.assertEqual(archive_term(self.term), 4)
+        self.assertEqual(set(ArchivedAttendance.objects.values_list('pk', flat=True)), ids)
+        self.assertEqual(Attendance.objects.count(), 2)
+        self.assertEqual(self.counters(), before)
+
+        out = StringIO()
+        call_command('rebuild_summaries', stdout=out)
+        self.assertIn('0 created, 0 updated, 0 deleted', out.getvalue())
+        call_command('refresh_rollups', full=True, stdout=StringIO())
+        self.assertEqual(self.counters(), before)
+        # Running again after an interruption moves nothing twice
+        self.assertEqual(archive_term(Term.objects.get(pk=self.term.pk)), 0)
+
+    def test_history_and_exports_read_archived_rows(self):
+        archive_term(self.term)
+        student = self.students[0]
+        dates, cursor = [], None
+        while True:
+            rows, cursor = history_page(student, cursor=cursor, limit=1)
+            dates += [row['date'] for row in rows]
+            if cursor is None:
+                break
+        self.assertEqual(dates, [date(2025, 9, 1), date(2025, 2, 4), date(2025, 2, 3)])
+
+        self.assertEqual(len(list(export_rows(student='A0'))), 3)
+        rows = export_rows(student='A0', date_from='2025-02-04')
+        self.assertEqual([row[0] for row in rows], [date(2025, 2, 4), date(2025, 9, 1)])
+        # Nothing archived is dated after the term, so the archive is not read
+        with CaptureQueriesContext(connection) as queries:
+            list(export_rows(date_from='2025-06-01'))
+        self.assertFalse(any('archivedattendance' in query['sql'] for query in queries))
+
+    def test_archived_terms_are_read_only(self):
+        archive_term(self.term)
+        with self.assertRaises(ArchivedTermError):
+            upsert_attendance([Attendance(student=self.students[0], subject=self.subject, date=date(2025, 2, 5))])
+        with self.assertRaises(ArchivedTermError):
+            Attendance.objects.create(student=self.students[0], subject=self.subject, date='2025-02-05')
+        with self.assertRaises(ArchiveError):
+            archive_term(current_term())
+
+    def test_command_archives_closed_terms(self):
+        Term.objects.create(name='Overlapping', start_date=date(2025, 6, 1), end_date=timezone.localdate())
+        out = StringIO()
+        call_command('archive_term', closed=True, dry_run=True, stdout=out)
+        self.assertEqual(out.getvalue(), 'Spring 2025: would archive 4 rows\n')
+        self.assertEqual(ArchivedAttendance.objects.count(), 0)
+
+        out = StringIO()
+        call_command('archive_term', closed=True, stdout=out)
+        self.assertIn('Spring 2025: archived 4 rows', out.getvalue())
+        self.assertNotIn('Overlapping', out.getvalue())
+        with self.assertRaisesMessage(CommandError, 'Unknown term: Autumn'):
+            call_command('archive_term', 'Autumn')
+
+
+class LedgerTests(AttendanceFixture, TestCase):
+    student_count = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.term = Term.objects.create(name='Spring 2025', start_date=date(2025, 1, 1), end_date=date(2025, 5, 31))
+
+    def day(self, n):
+        # Fixed to the original start so moving the term does not move the marks
+        return date(2025, 1, 1) + timedelta(days=n)
+
+    def statuses(self):
+        return AttendanceLedger.objects.get(student=self.student, subject=self.subject, term=self.term).statuses
+
+    def test_codes_round_trip_across_byte_boundaries(self):
+        buffer = bytearray()
+        expected = [day % 5 for day in range(21)]
+        for day, code in enumerate(expected):
+            ledger.set_code(buffer, day, code)
+        self.assertEqual(len(buffer), 8)
+        self.assertEqual(ledger.codes(buffer), ''.join(map(str, expected)) + '0')
+        self.assertEqual(ledger.codes(buffer, 5, 9), '0123')
+        # Trimmed buffers still hold their last day
+        self.assertEqual(ledger.codes(ledger.pack(1 << 6)), '001')
+
+    def sessions(self):
+        stored = AttendanceLedger.objects.get(student=self.student, subject=self.subject, term=self.term)
+        return ledger.sessions(stored.statuses, stored.start_date)
+
+    def test_ledger_follows_a_moved_term_start(self):
+        self.mark(self.day(3), 'Present')
+        self.mark(self.day(10), 'Absent')
+        self.term.start_date = date(2024, 12, 30)
+        self.term.save()
+        self.mark(self.day(11), 'Late')
+        self.assertEqual(self.sessions(), [
+            (date(2025, 1, 4), 'Present'), (date(2025, 1, 11), 'Absent'), (date(2025, 1, 12), 'Late'),
+        ])
+        # Days before a later start fall outside the term and are dropped
+        self.term.start_date = date(2025, 1, 5)
+        self.term.save()
+        self.mark(self.day(12), 'Present')
+        self.assertEqual(self.sessions(), [
+            (date(2025, 1, 11), 'Absent'), (date(2025, 1, 12), 'Late'), (date(2025, 1, 13), 'Present'),
+        ])
+
+    def test_save_path_keeps_the_ledger_current(self):
+        for day, status in enumerate(['Present', 'Present', 'Absent', 'Present', 'Late', 'Present', 'Present']):
+            self.mark(self.day(day * 2), status)
+        statuses = self.statuses()
+        summary = AttendanceSummary.objects.get(student=self.student, subject=self.subject)
+        fields = ('total_classes', 'present_count', 'absent_count', 'late_count', 'excused_count')
+        self.assertEqual(ledger.counts(statuses), {field: getattr(summary, field) for field in fields})
+        self.assertEqual(ledger.attendance_percentage(statuses), 71.4)
+        self.assertEqual(ledger.streaks(statuses), (2, 2))
+
+        # Slicing by date: the first week holds days 0-6
+        start, stop = ledger.day_range(self.term.start_date, date(2025, 1, 1), date(2025, 1, 7))
+        self.assertEqual(ledger.counts(statuses, start, stop)['total_classes'], 4)
+        self.assertEqual(ledger.streaks(statuses, 'Present', start, stop), (1, 2))
+
+        self.mark(self.day(4), 'Present')
+        Attendance.objects.get(date=date(2025, 1, 9)).delete()
+        statuses = self.statuses()
+        self.assertEqual(ledger.streaks(statuses), (6, 6))
+        self.assertEqual(ledger.sessions(statuses, self.term.start_date)[-2:], [
+            (date(2025, 1, 11), 'Present'),
+            (date(2025, 1, 13), 'Present'),
+        ])
+
+    def test_build_matches_the_save_path(self):
+        for day, status in [(0, 'Present'), (3, 'Excused'), (40, 'Absent')]:
+            self.mark(self.day(day), status)
+        Attendance.objects.create(student=self.student, subject=self.subject, date='2025-03-01', status='Late')
+        before = ledger.sessions(self.statuses(), self.term.start_date)
+        out = StringIO()
+        call_command('build_ledgers', stdout=out)
+        self.assertIn('Built 1 attendance ledgers', out.getvalue())
+        self.assertEqual(ledger.sessions(self.statuses(), self.term.start_date), before)
+        self.assertEqual(len(before), 4)
+
+        out = StringIO()
+        call_command('benchmark_ledger', repeat=1, stdout=out)
+        self.assertIn('Both paths agree', out.getvalue())
+
+
+class AlertTests(AttendanceFixture, TestCase):
+    def mark_days(self, student, first_day, *statuses):
+        for n, status in enumerate(statuses):
+            self.mark(date(2026, 7, first_day + n), status, students=[student])
+
+    def run_alerts(self):
+        out = StringIO()
+        call_command('attendance_alerts', threshold=[75.0], min_classes=5, stdout=out)
+        return out.getvalue()
+
+    def age_changes(self):
+        # Move every change before the watermark's overlap window
+        AttendanceSummary.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        Watermark.objects.filter(name='alerts').update(value=timezone.now() - timedelta(minutes=30))
+
+    def test_alerts_follow_threshold_crossings(self):
+        for student in self.students:
+            self.mark_days(student, 1, *['Present'] * 5)
+        self.assertIn('Evaluated 2 changed pairs: 0 alerts opened', self.run_alerts())
+
+        self.age_changes()
+        self.mark_days(self.students[0], 6, 'Absent', 'Absent', 'Absent')
+        self.assertIn('Evaluated 1 changed pairs: 1 alerts opened', self.run_alerts())
+        alert = LowAttendanceAlert.objects.get()
+        self.assertEqual((alert.student_id, alert.percentage), (self.students[0].pk, 62.5))
+
+        # Still below the threshold: the open alert is not repeated
+        self.age_changes()
+        self.mark_days(self.students[0], 9, 'Absent')
+        self.assertIn('0 alerts opened, 0 resolved', self.run_alerts())
+
+        self.age_changes()
+        self.mark_days(self.students[0], 10, *['Present'] * 8)
+        self.assertIn('0 alerts opened, 1 resolved', self.run_alerts())
+
+        self.age_changes()
+        self.mark_days(self.students[0], 18, *['Absent'] * 6)
+        self.assertIn('1 alerts opened', self.run_alerts())
+        self.assertEqual(LowAttendanceAlert.objects.filter(resolved_at__isnull=True).count(), 1)
+        self.assertEqual(LowAttendanceAlert.objects.count(), 2)
+
+
+@skipUnless(analytics.np, 'NumPy is not installed')
+class RiskAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = Teacher.objects.create(user=User.objects.create_user('watch', password='x'), name='Watch')
+        cls.subject = Subject.objects.create(name='Ethics', code='HU101')
+        cls.teacher.subjects.add(cls.subject)
+        patterns = {
+            'A1': 'PPPPPPPP',
+            'A2': 'PPAPAAAA',
+            'A3': 'PPPPPLLL',
+        }
+        codes = {'P': 'Present', 'A': 'Absent', 'L': 'Late'}
+        for roll_number, pattern in patterns.items():
+            student = Student.objects.create(
+                user=User.objects.create_user(roll_number, password='x'),
+                name=f'Student {roll_number}', roll_number=roll_number, course='HU', year=1, teacher=cls.teacher,
+            )
+            Attendance.objects.bulk_create([
+                Attendance(student=student, subject=cls.subject, date=date(2026, 6, day + 1), status=codes[code])
+                for day, code in enumerate(pattern)
+            ])
+
+    def test_report_flags_percentages_streaks_and_late_trends(self):
+        self.client.force_login(self.teacher.user)
+        report = self.client.get(reverse('teacher_risk'), {'threshold': 70, 'window': 3}).json()
+        self.assertEqual(report['sessions'], 24)
+        self.assertEqual(
+            [(row['roll_number'], row['attendance_percentage']) for row in report['at_risk']],
+            [('A2', 37.5), ('A3', 62.5)],
+        )
+        self.assertEqual(
+            [(row['roll_number'], row['subject'], row['longest'], row['current']) for row in report['absence_streaks']],
+            [('A2', 'HU101', 4, 4)],
+        )
+        self.assertEqual(report['rising_late'], [{
+            'roll_number': 'A3', 'name': 'Student A3', 'overall_late_rate': 37.5, 'recent_late_rate': 100.0,
+        }])
+
+    def test_streak_and_window_must_be_positive(self):
+        self.client.force_login(self.teacher.user)
+        for params in ({'window': -5}, {'window': 0}, {'streak': 0}):
+            response = self.client.get(reverse('teacher_risk'), params)
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.json()['success'])
+        with self.assertRaises(CommandError):
+            call_command('risk_report', window=0, stdout=StringIO())
+
+    def test_command_prints_report(self):
+        out = StringIO()
+        call_command('risk_report', teacher=self.teacher.pk, json=True, stdout=out, stderr=StringIO())
+        self.assertEqual(json.loads(out.getvalue())['students'], 3)
+
+
+@mock.patch('home.routers.replica_enabled', return_value=True)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def route_in_request(self, request):
+        seen = {}
+
+        def view(request):
+            seen['db'] = self.router.db_for_read(Attendance)
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(request)
+        return seen['db'], response
+
+    def test_reads_inside_a_transaction_stay_on_default(self, _):
+        # TestCase runs every test inside an atomic block on default
+        self.assertEqual(self.router.db_for_read(AttendanceSummary), 'default')
+
+    def test_reporting_reads_go_to_replica_and_writes_to_default(self, _):
+        with mock.patch.object(connections['default'], 'in_atomic_block', False):
+            self.assertEqual(self.router.db_for_read(AttendanceSummary), 'replica')
+        self.assertIsNone(self.router.db_for_read(Student))
+        self.assertEqual(self.router.db_for_write(Attendance), 'default')
+        self.assertFalse(self.router.allow_migrate('replica', 'home'))
+
+    def test_dashboard_fragments_are_built_from_default(self, _):
+        with mock.patch.object(connections['default'], 'in_atomic_block', False):
+            context = lazy_context(lambda: {'db': self.router.db_for_read(AttendanceSummary)}, ['db'])
+            self.assertEqual(str(context['db']), 'default')
+            self.assertEqual(self.router.db_for_read(AttendanceSummary), 'replica')
+
+    def test_writer_is_pinned_to_default_until_cookie_expires(self, _):
+        with mock.patch.object(connections['default'], 'in_atomic_block', False):
+            db, response = self.route_in_request(self.factory.post('/save-attendance/'))
+            self.assertEqual(db, 'default')
+            self.assertIn(STICKY_COOKIE, response.cookies)
+
+            request = self.factory.get('/student-dashboard/')
+            request.COOKIES[STICKY_COOKIE] = response.cookies[STICKY_COOKIE].value
+            self.assertEqual(self.route_in_request(request)[0], 'default')
+
+            request.COOKIES[STICKY_COOKIE] = str(time.time() - 1)
+            self.assertEqual(self.route_in_request(request)[0], 'replica')
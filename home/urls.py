@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -7,8 +8,18 @@ urlpatterns = [
     path('dashboard/', views.dashboard_view, name='dashboard'),
     path('teacher-dashboard/', views.teacher_dashboard_view, name='teacher_dashboard'),
     path('student-dashboard/', views.student_dashboard_view, name='student_dashboard'),
+    path('teacher-dashboard/async/', views.teacher_dashboard_async_view, name='teacher_dashboard_async'),
+    path('student-dashboard/async/', views.student_dashboard_async_view, name='student_dashboard_async'),
     path('logout/', views.logout_view, name='logout'),
     path('mark-attendance/<int:subject_id>/', views.mark_attendance_view, name='mark_attendance'),
     path('save-attendance/', views.save_attendance_view, name='save_attendance'),
+    path('api/attendance/sync/', views.sync_attendance_view, name='sync_attendance'),
+    path('api/teacher/analytics/', views.teacher_analytics_view, name='teacher_analytics'),
+    path('api/teacher/risk/', views.teacher_risk_view, name='teacher_risk'),
+    path('api/subjects/<int:subject_id>/roster/', views.subject_roster_view, name='subject_roster'),
+    path('api/attendance/history/', views.attendance_history_view, name='attendance_history'),
+    path('export/attendance/', views.export_attendance_view, name='export_attendance'),
+    path('metrics', views.metrics_view, name='metrics'),
+    path(f'{settings.STATIC_URL.lstrip("/")}<path:path>', views.static_asset_view, name='static_asset'),
     
 ]
@@ -1,10 +1,42 @@
-from django.shortcuts import render, redirect
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_protect
 from django.http import JsonResponse
-from .models import Teacher, Student, Subject, Attendance
-from django.http import HttpResponse
+from . import analytics, assets
+from .conditional import (
+    FRAGMENT_TIMEOUT,
+    add_validators,
+    lazy_context,
+    not_modified,
+    student_version,
+    student_with_version,
+    teacher_version,
+    teacher_with_version,
+)
+from .exports import EXPORT_FORMATS, ExportError, export_rows, export_stream
+from .history import PAGE_SIZE, HistoryError, ahistory_page, history_page
+from .metrics import render_prometheus
+from .rollups import PERIODS, rollup_series
+from .roles import get_role, role_required
+from .roster import get_roster, roster_cache_stats, roster_sizes, roster_tags
+from .routers import pin_to_primary
+from .stats import (
+    astudent_subject_stats,
+    percentage,
+    recent_marked_attendance,
+    student_subject_stats,
+    subject_totals,
+    teacher_subjects,
+)
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_date
+from django.utils.http import quote_etag
+from django.utils.text import compress_sequence
 
 # Create your views here.
 
@@ -20,18 +52,14 @@ def login_view(request):
                 login(request, user)
                 messages.success(request, 'Login successful!')
                 
-                # Check if user is a teacher or student and redirect accordingly
-                try:
-                    teacher = Teacher.objects.get(user=user)
-                    return redirect('teacher_dashboard')
-                except Teacher.DoesNotExist:
-                    try:
-                        student = Student.objects.get(user=user)
-                        return redirect('student_dashboard')
-                    except Student.DoesNotExist:
-                        # User exists but is neither teacher nor student
-                        messages.warning(request, 'Your account is not properly configured. Please contact administrator.')
-                        return redirect('login')
+                # Check if user is a teacher or student and redirect accordingly;
+                # the role is remembered in the session for later requests
+                role, _ = get_role(request)
+                if role is None:
+                    # User exists but is neither teacher nor student
+                    messages.warning(request, 'Your account is not properly configured. Please contact administrator.')
+                    return redirect('login')
+                return redirect(f'{role}_dashboard')
             else:
                 messages.error(request, 'Invalid username or password.')
         else:
@@ -39,149 +67,311 @@ def login_view(request):
     
     return render(request, 'login.html')
 
-def teacher_dashboard_view(request):
-    if not request.user.is_authenticated:
-        return redirect('login')
-    
+@role_required('teacher', queryset=teacher_with_version)
+def teacher_dashboard_view(request, teacher):
+    version = teacher_version(teacher)
+    response = not_modified(request, version)
+    if response is not None:
+        return response
+
+    def build():
+        # Per-subject counts of attendance marked by this teacher, in one query
+        subjects = list(teacher_subjects(teacher))
+        return teacher_dashboard_context(
+            request,
+            teacher,
+            subjects,
+            subject_totals(subjects),
+            # Cached enrollment counts; the modal fetches each roster itself
+            *subject_rosters(subjects),
+            # Get recent attendance records marked by this teacher
+            recent_marked_attendance(teacher, subjects),
+        )
+
+    # Only evaluated when a dashboard fragment is missing from the cache
+    context = lazy_context(build, TEACHER_FRAGMENT_KEYS)
+    context.update(dashboard_extras(request, teacher, 'teacher', version))
+    return add_validators(render(request, 'teacher_dashboard.html', context), version)
+
+@role_required('teacher', queryset=teacher_with_version)
+async def teacher_dashboard_async_view(request, teacher):
+    """teacher_dashboard_view for ASGI, with independent queries awaited together"""
+    version = await sync_to_async(teacher_version)(teacher)
+    response = not_modified(request, version)
+    if response is not None:
+        return response
+
+    # The fragments are cached under the version, so they are built from the
+    # primary. The totals filter on the teacher's subjects as a subquery, so
+    # none of these waits for another
+    with pin_to_primary():
+        subjects, totals = await asyncio.gather(
+            alist(teacher_subjects(teacher)),
+            alist(subject_totals(teacher.subjects.all())),
+        )
+        sizes, tags = await sync_to_async(subject_rosters)(subjects)
+        recent_attendance = recent_marked_attendance(teacher, subjects)
+        context = teacher_dashboard_context(request, teacher, subjects, totals, sizes, tags, recent_attendance)
+        context.update(dashboard_extras(request, teacher, 'teacher', version))
+        response = await sync_to_async(render)(request, 'teacher_dashboard.html', context)
+    return add_validators(response, version)
+
+def subject_rosters(subjects):
+    """Enrolled student counts and roster cache tags for the subjects, by subject id"""
+    return roster_sizes(subjects), roster_tags(subjects)
+
+def teacher_dashboard_context(request, teacher, subjects, totals, sizes, tags, recent_attendance):
+    totals_by_subject = {row['subject_id']: row for row in totals}
+
+    # Calculate statistics and create subject data with counts
+    subjects_data = []
+    for subject in subjects:
+        subject_total = totals_by_subject.get(subject.id, {'total': 0, 'present': 0})
+        subjects_data.append({
+            'subject': subject,
+            'student_count': sizes[subject.id],
+            'roster_tag': tags[subject.id],
+            'attendance_percentage': percentage(subject_total['present'], subject_total['total']),
+        })
+
+    return {
+        'user': request.user,
+        'teacher': teacher,
+        'subjects': subjects,
+        'subjects_data': subjects_data,
+        'user_type': 'teacher',
+        'total_students': sum(sizes.values()),
+        'total_attendance_marked': sum(subject.marked_count for subject in subjects),
+        'recent_attendance': recent_attendance,
+    }
+
+@role_required('student', queryset=student_with_version)
+def student_dashboard_view(request, student):
+    version = student_version(student)
+    response = not_modified(request, version)
+    if response is not None:
+        return response
+
+    def build():
+        # First page of the history; older pages are fetched by the dashboard on scroll
+        history = history_page(student, limit=10)
+        # Calculate overall and per-subject statistics in one query
+        stats = student_subject_stats(student)
+        return student_dashboard_context(request, student, history, stats)
+
+    context = lazy_context(build, STUDENT_FRAGMENT_KEYS)
+    context.update(dashboard_extras(request, student, 'student', version))
+    return add_validators(render(request, 'student_dashboard.html', context), version)
+
+@role_required('student', queryset=student_with_version)
+async def student_dashboard_async_view(request, student):
+    """student_dashboard_view for ASGI, with independent queries awaited together"""
+    version = await sync_to_async(student_version)(student)
+    response = not_modified(request, version)
+    if response is not None:
+        return response
+
+    # The fragments are cached under the version, so they are built from the primary
+    with pin_to_primary():
+        history, stats = await asyncio.gather(
+            ahistory_page(student, limit=10),
+            astudent_subject_stats(student),
+        )
+        context = student_dashboard_context(request, student, history, stats)
+        context.update(dashboard_extras(request, student, 'student', version))
+        response = await sync_to_async(render)(request, 'student_dashboard.html', context)
+    return add_validators(response, version)
+
+def student_dashboard_context(request, student, history, stats):
+    attendance_records, history_cursor = history
+    subject_stats, totals = stats
+    return {
+        'user': request.user,
+        'student': student,
+        'attendance_records': attendance_records,
+        'user_type': 'student',
+        'total_classes': totals['total_classes'],
+        'present_count': totals['present_count'],
+        'absent_count': totals['absent_count'],
+        'late_count': totals['late_count'],
+        'excused_count': totals['excused_count'],
+        'attendance_percentage': totals['attendance_percentage'],
+        'subject_stats': subject_stats,
+        'history_cursor': history_cursor,
+    }
+
+# Context entries read only inside the cached dashboard fragments
+TEACHER_FRAGMENT_KEYS = (
+    'subjects', 'subjects_data', 'total_students', 'total_attendance_marked', 'recent_attendance',
+)
+STUDENT_FRAGMENT_KEYS = (
+    'attendance_records', 'total_classes', 'present_count', 'absent_count', 'late_count',
+    'excused_count', 'attendance_percentage', 'subject_stats', 'history_cursor',
+)
+
+def dashboard_extras(request, profile, user_type, version):
+    """Context every dashboard renders outside its cached fragments."""
+    return {
+        'user': request.user,
+        user_type: profile,
+        'user_type': user_type,
+        'dashboard_version': version.key,
+        'fragment_timeout': FRAGMENT_TIMEOUT,
+    }
+
+async def alist(queryset):
+    return [row async for row in queryset]
+
+@role_required('teacher', api=True)
+def subject_roster_view(request, subject_id, teacher):
+    """Compact roster of one of the teacher's subjects, fetched when its attendance modal opens"""
+    subject = teacher.subjects.filter(pk=subject_id).first()
+    if subject is None:
+        return JsonResponse({'success': False, 'error': 'Subject not found'}, status=404)
+
+    tag = roster_tags([subject])[subject.pk]
+    etag = quote_etag(f'roster-{subject_id}-{tag}')
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse({
+            'success': True,
+            'subject': subject.code,
+            'version': tag,
+            'students': [[student.roll_number, student.name] for student in get_roster(subject)],
+        })
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@role_required('student', api=True)
+def attendance_history_view(request, student):
+    """Keyset-paginated attendance history for the logged-in student, as JSON"""
+
+    params = request.GET
     try:
-        teacher = Teacher.objects.get(user=request.user)
-        subjects = teacher.subjects.all()
-        
-        # Calculate teacher statistics
-        total_students = 0
-        total_attendance_marked = 0
-        
-        # Calculate statistics and create subject data with counts
-        subjects_data = []
-        classes_data = {}  # For JavaScript attendance modal
-        students = Student.objects.filter(teacher=teacher)
-        for subject in subjects:
-            # For Option B: assume all teacher's students are enrolled in all subjects
-            subject_students = students
-            student_count = subject_students.count()
-            total_students += student_count
-
-            # Count attendance marked by this teacher for this subject
-            total_attendance_marked += subject.attendance_records.filter(marked_by=teacher).count()
-
-            # Prepare subject data
-            subject_data = {
-                'subject': subject,
-                'student_count': student_count,
-                'students': list(subject_students)
-            }
-            subjects_data.append(subject_data)
-
-            # Prepare JS modal data
-            classes_data[subject.code] = [
-                {
-                    'roll': i + 1,
-                    'name': f"{student.user.get_full_name() or student.user.username}",
-                    'student_id': student.roll_number
-                }
-                for i, student in enumerate(subject_students)
-            ]
+        limit = int(params.get('limit', PAGE_SIZE))
+        rows, next_cursor = history_page(
+            student,
+            cursor=params.get('cursor'),
+            limit=limit,
+            subject=params.get('subject'),
+            status=params.get('status'),
+            date_from=params.get('date_from'),
+            date_to=params.get('date_to'),
+        )
+    except (HistoryError, ValueError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, 'results': rows, 'next_cursor': next_cursor})
 
-        
-        # Get recent attendance records marked by this teacher
-        recent_attendance = []
-        for subject in subjects:
-            recent_attendance.extend(
-                subject.attendance_records.filter(marked_by=teacher).order_by('-date')[:5]
-            )
-        recent_attendance = sorted(recent_attendance, key=lambda x: x.date, reverse=True)[:10]
-        for i in subjects_data:
-            print(i)
-        context = {
-            'user': request.user,
-            'teacher': teacher,
-            'subjects': subjects,
-            'subjects_data': subjects_data,
-            'classes_data': classes_data,
-            'user_type': 'teacher',
-            'total_students': total_students,
-            'total_attendance_marked': total_attendance_marked,
-            'recent_attendance': recent_attendance,
-        }
-        return render(request, 'teacher_dashboard.html', context)
-    except Teacher.DoesNotExist:
-        messages.error(request, 'Access denied. Teacher profile not found.')
-        return redirect('login')
+@role_required('teacher', api=True)
+def teacher_analytics_view(request, teacher):
+    """Attendance trend per subject by day, week or month, served from the daily rollups"""
 
-def student_dashboard_view(request):
-    if not request.user.is_authenticated:
-        return redirect('login')
-    
+    params = request.GET
+    period = params.get('period', 'week')
+    if period not in PERIODS:
+        return JsonResponse({'success': False, 'error': f'Invalid period: {period}'}, status=400)
+    dates = {}
+    for name in ('date_from', 'date_to'):
+        if params.get(name):
+            try:
+                dates[name] = parse_date(params[name])
+            except ValueError:
+                dates[name] = None
+            if dates[name] is None:
+                return JsonResponse({'success': False, 'error': f'Invalid {name}: {params[name]}'}, status=400)
+
+    subjects = teacher.subjects.all()
+    if params.get('subject'):
+        subjects = subjects.filter(code=params['subject'])
+    series = {}
+    for row in rollup_series(subjects, period, **dates):
+        series.setdefault(row.pop('subject__code'), []).append(row)
+    return JsonResponse({'success': True, 'period': period, 'series': series})
+
+@role_required('teacher', api=True)
+def teacher_risk_view(request, teacher):
+    """At-risk students, absence streaks and late-arrival trends across the teacher's subjects"""
+
+    params = request.GET
     try:
-        student = Student.objects.get(user=request.user)
-        # Get attendance records for this student
-        attendance_records = student.attendance_records.all()[:10]  # Last 10 records
-        
-        # Calculate attendance statistics
-        all_records = student.attendance_records.all()
-        total_classes = all_records.count()
-        present_count = all_records.filter(status='Present').count()
-        absent_count = all_records.filter(status='Absent').count()
-        late_count = all_records.filter(status='Late').count()
-        excused_count = all_records.filter(status='Excused').count()
-        
-        # Calculate overall attendance percentage
-        if total_classes > 0:
-            attendance_percentage = round((present_count / total_classes) * 100, 1)
-        else:
-            attendance_percentage = 0
-        
-        context = {
-            'user': request.user,
-            'student': student,
-            'attendance_records': attendance_records,
-            'user_type': 'student',
-            'total_classes': total_classes,
-            'present_count': present_count,
-            'absent_count': absent_count,
-            'late_count': late_count,
-            'excused_count': excused_count,
-            'attendance_percentage': attendance_percentage,
-        }
-        return render(request, 'student_dashboard.html', context)
-    except Student.DoesNotExist:
-        messages.error(request, 'Access denied. Student profile not found.')
-        return redirect('login')
+        threshold = float(params.get('threshold', 75))
+        streak = int(params.get('streak', 3))
+        window = int(params.get('window', 10))
+        if streak < 1 or window < 1:
+            raise ValueError('streak and window must be at least 1')
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    try:
+        arrays = analytics.load_arrays(analytics.scope_queryset(teacher=teacher, subject=params.get('subject')))
+        report = analytics.risk_report(arrays, threshold, streak, window)
+    except analytics.AnalyticsUnavailable as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=503)
+    return JsonResponse({'success': True, **report})
 
 def dashboard_view(request):
     """Fallback dashboard - redirects to appropriate dashboard based on user type"""
-    if not request.user.is_authenticated:
+    # Check user type and redirect; usually answered from the session alone
+    role, _ = get_role(request)
+    if role is None:
+        if request.user.is_authenticated:
+            messages.error(request, 'Your account is not properly configured.')
         return redirect('login')
-    
-    # Check user type and redirect
+    return redirect(f'{role}_dashboard')
+
+def metrics_view(request):
+    """Per-route request histograms in Prometheus text format (staff only)"""
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponseForbidden('Staff access required')
+    roster = roster_cache_stats()
+    body = render_prometheus([
+        ('attendancex_roster_cache_hits_total', 'Roster cache hits in this process', roster['hits']),
+        ('attendancex_roster_cache_misses_total', 'Roster cache misses in this process', roster['misses']),
+    ])
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def export_attendance_view(request):
+    """Stream attendance as CSV or JSON Lines, gzipped when the client accepts it (staff only)"""
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponseForbidden('Staff access required')
+
+    export_format = request.GET.get('format', 'csv')
     try:
-        Teacher.objects.get(user=request.user)
-        return redirect('teacher_dashboard')
-    except Teacher.DoesNotExist:
-        try:
-            Student.objects.get(user=request.user)
-            return redirect('student_dashboard')
-        except Student.DoesNotExist:
-            messages.error(request, 'Your account is not properly configured.')
-            return redirect('login')
+        rows = export_rows(
+            subject=request.GET.get('subject'),
+            teacher=request.GET.get('teacher'),
+            student=request.GET.get('student'),
+            date_from=request.GET.get('date_from'),
+            date_to=request.GET.get('date_to'),
+        )
+        stream = export_stream(export_format, rows)
+    except ExportError as e:
+        return HttpResponseBadRequest(str(e))
+
+    filename = f'attendance.{export_format}'
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = StreamingHttpResponse(compress_sequence(stream), content_type=EXPORT_FORMATS[export_format])
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = StreamingHttpResponse(stream, content_type=EXPORT_FORMATS[export_format])
+    patch_vary_headers(response, ['Accept-Encoding'])
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+def static_asset_view(request, path):
+    """Collected static files, precompressed and with long cache lifetimes when hashed"""
+    return assets.serve(request, path)
 
 def logout_view(request):
     logout(request)
     messages.success(request, 'You have been logged out successfully.')
     return redirect('login')
 
-def mark_attendance_view(request,subject_id):
-    
-    if not request.user.is_authenticated:
-        return redirect('login')
-    
-    
-    teacher = Teacher.objects.get(user=request.user)
-    subject = Subject.objects.get(id=subject_id)
-    if subject in teacher.subjects.all():
-        students = Student.objects.filter(teacher=teacher)
-    else:
-        students = Student.objects.none()  
+@role_required('teacher')
+def mark_attendance_view(request, subject_id, teacher):
+    # Unknown subjects and other teachers' subjects are both not found
+    subject = get_object_or_404(teacher.subjects, pk=subject_id)
+    students = get_roster(subject)
     
     context = {
         'user': request.user,
@@ -195,60 +385,50 @@ def mark_attendance_view(request,subject_id):
 from django.views.decorators.csrf import csrf_protect
 from django.http import JsonResponse
 from datetime import date
+from .marking import STATUS_VALUES, session_records, upsert_attendance
+from .sync import SyncError, apply_sessions, parse_batch
 
 
 @csrf_protect
-def save_attendance_view(request):
-    
-    if not request.user.is_authenticated:
-        return JsonResponse({'success': False, 'error': 'Not authenticated'})
-
+@role_required('teacher', api=True)
+def save_attendance_view(request, teacher):
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'Invalid request method'})
 
     try:
-        # Get teacher
-        teacher = Teacher.objects.get(user=request.user)
         data = request.POST
         subject_id = data.get('subject_id')
         
         if not subject_id:
             return HttpResponse('Subject ID not provided', status=400)
 
-        # Get subject
-        try:
-            subject = Subject.objects.get(id=subject_id)
-        except Subject.DoesNotExist:
-            return JsonResponse({'success': False, 'error': 'Subject not found'})
+        # Teachers only mark their own subjects
+        subject = teacher.subjects.filter(pk=subject_id).first()
+        if subject is None:
+            return JsonResponse({'success': False, 'error': 'Subject not found'}, status=404)
 
-        # Option B: get all students under this teacher
-        students = Student.objects.filter(teacher=teacher)
-        if not students.exists():
-            return JsonResponse({'success': False, 'error': 'No students found for this teacher'})
+        on_date = date.today()
+        if data.get('date'):
+            on_date = parse_date(data['date'])
+            if on_date is None:
+                return JsonResponse({'success': False, 'error': 'Invalid date'})
 
-        today = date.today()
-        attendance_created = 0
-        attendance_updated = 0
+        # Only students enrolled in the subject this term can be marked
+        roster = {student.roll_number for student in get_roster(subject)}
+        if not roster:
+            return JsonResponse({'success': False, 'error': 'No students enrolled in this subject'})
 
-        for student in students:
-            status_key = f"status_{student.roll_number}"
-            if status_key not in data:
+        statuses = {}
+        for key, status in data.items():
+            if not key.startswith('status_'):
                 continue
+            if status not in STATUS_VALUES:
+                return JsonResponse({'success': False, 'error': f'Invalid status: {status}'})
+            statuses[key[len('status_'):]] = status
 
-            status = data[status_key]
-
-            # ✅ Save or update attendance record
-            attendance_record, created = Attendance.objects.update_or_create(
-                student=student,
-                subject=subject,
-                date=today,
-                defaults={'status': status, 'marked_by': teacher}
-            )
-
-            if created:
-                attendance_created += 1
-            else:
-                attendance_updated += 1
+        # ✅ Save or update all records in one batched upsert
+        records = session_records(teacher, subject, on_date, statuses, roster)
+        attendance_created, attendance_updated = upsert_attendance(records)
 
         return JsonResponse({
             'success': True,
@@ -256,7 +436,19 @@ def save_attendance_view(request):
                        f'({attendance_created} new, {attendance_updated} updated)',
         })
 
-    except Teacher.DoesNotExist:
-        return JsonResponse({'success': False, 'error': 'Teacher profile not found'})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
+
+
+@csrf_protect
+@role_required('teacher', api=True)
+def sync_attendance_view(request, teacher):
+    """Apply a batch of attendance sessions queued offline by the mark page"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
+
+    try:
+        sessions = parse_batch(request.body)
+    except SyncError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, 'results': apply_sessions(teacher, sessions)})
@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Watermark
+
+
+# ------------------------
+# WATERMARKS
+# ------------------------
+# Incremental jobs (home.rollups, home.alerts) keep how far they got in a
+# Watermark row. Each run reads the rows whose updated_at moved since then
+# and advances the watermark in the same transaction, so a failed run is
+# simply done again.
+
+# Rescan this far behind the watermark to catch transactions that stamped
+# updated_at before the last run but committed after it
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+@contextmanager
+def advance_watermark(name):
+    """Run one pass of the job ``name`` under its locked watermark.
+
+    Yields ``(since, now)``: rows with ``since < updated_at <= now`` are
+    the ones to process, and ``since`` is None on the first run. The
+    watermark moves to ``now`` when the block completes.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        watermark = Watermark.objects.select_for_update().filter(name=name).first()
+        yield (None if watermark is None else watermark.value - WATERMARK_OVERLAP), now
+        Watermark.objects.update_or_create(name=name, defaults={'value': now})